@@ -0,0 +1,162 @@
+"""A cache of parsed modules which is shared between processes.
+
+`init`, `counts` and every worker parse the modules they mutate. With the AST
+cache enabled, the source and parsed AST of each module are pickled into a
+cache directory the first time it's parsed, and loaded from there by every
+process after that.
+
+Each module has one entry, named for the path of its source file. An entry
+starts with a small header recording the modification time, size and content
+hash of the source it was parsed from, so stale entries are found without
+loading their ASTs. The cache is kept to a maximum size by evicting the least
+recently used entries.
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import pickle
+import sys
+
+from .config import get_cache_dir
+
+log = logging.getLogger()
+
+# The default maximum size of the cache, in bytes.
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+_SUFFIX = '.{}.ast'.format(sys.implementation.cache_tag)
+
+
+def get_ast_cache(config):
+    """Get the AST cache used by sessions with config `config`.
+
+    Returns: An `ASTCache`, or None if the AST cache isn't enabled.
+    """
+    if not config.get(('ast-cache', 'enabled'), default=False):
+        return None
+    return ASTCache(os.path.join(get_cache_dir(config), 'ast'),
+                    config.get(('ast-cache', 'max-size'),
+                               default=DEFAULT_MAX_SIZE))
+
+
+class ASTCache:
+    """The AST cache, stored as one file per module in a directory.
+
+    Instances just hold the location and size of the cache, so they can be
+    sent to worker processes.
+
+    Args:
+        directory: The directory containing the cache. It's created if
+            necessary.
+        max_size: The maximum size of the cache, in bytes.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+    def _entry_path(self, filename):
+        key = hashlib.sha256(
+            os.path.abspath(filename).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, filename):
+        """Look up the module in `filename`.
+
+        Returns: A tuple `(source, module_ast)`, or None if the module isn't in
+            the cache or has changed since it was cached.
+        """
+        entry_path = self._entry_path(filename)
+        try:
+            stat = os.stat(filename)
+            with open(entry_path, mode='rb') as handle:
+                header = pickle.load(handle)
+                if header['mtime'] != stat.st_mtime_ns or \
+                        header['size'] != stat.st_size:
+                    # The file has been touched, but may well be unchanged.
+                    with open(filename, mode='rb') as source_file:
+                        source_hash = hashlib.sha256(
+                            source_file.read()).hexdigest()
+                    if source_hash != header['source_hash']:
+                        return None
+                source, module_ast = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                KeyError, TypeError, ValueError):
+            return None
+
+        # Mark the entry as recently used.
+        with contextlib.suppress(OSError):
+            os.utime(entry_path)
+        return source, module_ast
+
+    def put(self, filename, source, module_ast):
+        """Store the `source` and parsed `module_ast` of the module in
+        `filename`, then evict old entries if the cache is too big.
+        """
+        try:
+            with open(filename, mode='rb') as handle:
+                data = handle.read()
+            stat = os.stat(filename)
+        except OSError as exc:
+            log.warning('Unable to cache AST of %s: %s', filename, exc)
+            return
+
+        header = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'source_hash': hashlib.sha256(data).hexdigest(),
+        }
+
+        # Other processes may be storing the same module concurrently, so the
+        # entry is only replaced once it's complete.
+        os.makedirs(self.directory, exist_ok=True)
+        entry_path = self._entry_path(filename)
+        partial = '{}.{}'.format(entry_path, os.getpid())
+        with open(partial, mode='wb') as handle:
+            pickle.dump(header, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump((source, module_ast), handle,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, entry_path)
+
+        self.prune(self.max_size)
+
+    def _entries(self):
+        "The `(mtime, size, path)` of each entry in the cache."
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            with contextlib.suppress(FileNotFoundError):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    @property
+    def size(self):
+        """The total size of the cached entries, in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def prune(self, max_size):
+        """Evict the least recently used entries until the cache is at most
+        `max_size` bytes.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        self.prune(-1)
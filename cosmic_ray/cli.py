@@ -21,26 +21,51 @@ import cosmic_ray.counting
 import cosmic_ray.modules
 import cosmic_ray.plugins
 import cosmic_ray.worker
+from cosmic_ray.ast_cache import get_ast_cache
 from cosmic_ray.config import get_db_name, load_config, serialize_config
+from cosmic_ray.coverage import CoverageCollector
 from cosmic_ray.exit_codes import ExitCode
 from cosmic_ray.progress import report_progress
+from cosmic_ray.result_cache import result_cache_path, use_result_cache
+from cosmic_ray.schemata import get_schemata_dir
 from cosmic_ray.testing.test_runner import TestOutcome
-from cosmic_ray.timing import Timer
+from cosmic_ray.timing import TestTimer, Timer
 from cosmic_ray.util import redirect_stdout
-from cosmic_ray.work_db import use_db, WorkDB
+from cosmic_ray.work_db import copy_work_db, use_db, WorkDB
 from cosmic_ray.version import __version__
 from cosmic_ray.work_item import WorkItemJsonEncoder
 
 log = logging.getLogger()
 
+
+def _find_modules(config):
+    """Find the modules to mutate, as specified in `config`.
+
+    If the `module-discovery` in `config` is "static", the modules are found
+    from the filesystem without importing them.
+    """
+    name = cosmic_ray.modules.fixup_module_name(config['module'])
+    excludes = config.get('exclude-modules', default=None)
+    if config.get('module-discovery', default='import') == 'static':
+        return cosmic_ray.modules.find_static_modules(name, excludes)
+    return cosmic_ray.modules.find_modules(name, excludes)
+
+
 @dsc.command()
 def handle_baseline(args):
-    """usage: cosmic-ray baseline <config-file>
+    """usage: cosmic-ray baseline [options] <config-file>
 
     Run an un-mutated baseline of the specific configuration. This is
     largely like running a "worker" process, with the difference that
     a baseline run doesn't mutate the code.
 
+    If a session file is given, the baseline also records which tests
+    execute each line of the modules under test, and how long each test
+    takes, and stores these in the session.
+
+    options:
+      --session-file=<file>  Record test coverage and durations in this session
+      --no-coverage          Only record test durations in the session
     """
     sys.path.insert(0, '')
 
@@ -50,7 +75,21 @@ def handle_baseline(args):
         config['test-runner', 'name'],
         config['test-runner', 'args'])
 
-    work_item = test_runner()
+    session_file = args['--session-file']
+    if session_file is None:
+        work_item = test_runner()
+    elif args['--no-coverage']:
+        collector = None
+        timer = TestTimer()
+        work_item = test_runner(listener=timer)
+    else:
+        collector = CoverageCollector(
+            path for _, path in cosmic_ray.modules.find_module_paths(
+                cosmic_ray.modules.fixup_module_name(config['module'])))
+        timer = TestTimer(collector)
+        with collector:
+            work_item = test_runner(listener=timer)
+
     # note: test_runner() results are meant to represent
     # status codes when executed against mutants.
     # SURVIVED means that the test suite executed without any error
@@ -64,6 +103,12 @@ def handle_baseline(args):
         print(''.join(work_item.data))
         return 2
 
+    if session_file is not None:
+        with use_db(get_db_name(session_file)) as database:
+            if collector is not None:
+                database.set_coverage(collector.coverage)
+            database.set_test_durations(timer.durations)
+
     return ExitCode.OK
 
 
@@ -82,7 +127,7 @@ def handle_new_config(args):
 
 @dsc.command()
 def handle_init(args):
-    """usage: cosmic-ray init <config-file> <session-file>
+    """usage: cosmic-ray init [options] <config-file> <session-file>
 
     Initialize a mutation testing session from a configuration. This
     primarily creates a session - a database of "work to be done" -
@@ -97,7 +142,20 @@ def handle_init(args):
 
     The `session-file` is the filename for the database in which the
     work order will be stored.
+
+    options:
+      --jobs=<n>     Number of processes to use for finding mutation sites
+                     [default: 1]
+      --incremental  Keep the work items and results of modules which haven't
+                     changed since the session was last initialized
     """
+    try:
+        jobs = int(args['--jobs'])
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise docopt.DocoptExit('--jobs must be a positive integer')
+
     # This lets us import modules from the current directory. Should
     # probably be optional, and needs to also be applied to workers!
     sys.path.insert(0, '')
@@ -106,41 +164,78 @@ def handle_init(args):
 
     config = load_config(config_file)
 
-    if 'timeout' in config:
-        timeout = config['timeout']
-    elif 'baseline' in config:
-        baseline_mult = config['baseline']
+    if 'timeout' not in config and 'baseline' not in config:
+        raise ConfigValueError(
+            "Config must specify either baseline or timeout")
+
+    if config.get('mutation-backend', default='ast') not in ('ast', 'schemata',
+                                                             'text'):
+        raise ConfigValueError(
+            "mutation-backend must be one of ast, schemata or text")
+
+    if config.get('module-discovery', default='import') not in ('import',
+                                                                'static'):
+        raise ConfigValueError(
+            "module-discovery must be either import or static")
 
-        command = 'cosmic-ray baseline {}'.format(
-            args['<config-file>'])
+    db_name = get_db_name(args['<session-file>'])
 
+    # Any coverage and test durations from a previous init are out of date.
+    # If they're needed, the baseline run records them afresh.
+    with use_db(db_name) as database:
+        database.clear_coverage()
+        database.set_test_durations({})
+        database.set_test_overhead(0)
+
+    collect_coverage = config.get('coverage', default=False)
+    time_tests = config.get(('per-test-timeouts', 'enabled'), default=False)
+
+    # Tracing slows the tests down, so coverage is recorded in a separate run
+    # from the one which is timed.
+    if collect_coverage:
+        subprocess.check_call(['cosmic-ray', 'baseline',
+                               '--session-file={}'.format(db_name),
+                               config_file])
+
+    command = ['cosmic-ray', 'baseline']
+    if time_tests:
+        command.extend(['--session-file={}'.format(db_name), '--no-coverage'])
+    command.append(config_file)
+
+    if time_tests or 'timeout' not in config:
         # We run the baseline in a subprocess to more closely emulate the
         # runtime of a worker subprocess.
         with Timer() as timer:
-            subprocess.check_call(command.split())
+            subprocess.check_call(command)
+
+    if time_tests:
+        # Workers take about as long as the baseline to start up and import
+        # the tests, on top of the time the tests themselves take.
+        with use_db(db_name) as database:
+            database.set_test_overhead(max(
+                0,
+                timer.elapsed.total_seconds()
+                - sum(database.test_durations.values())))
 
-        timeout = baseline_mult * timer.elapsed.total_seconds()
+    if 'timeout' in config:
+        timeout = config['timeout']
     else:
-        raise ConfigValueError(
-            "Config must specify either baseline or timeout")
+        timeout = config['baseline'] * timer.elapsed.total_seconds()
 
     log.info('timeout = %f seconds', timeout)
 
-    modules = set(
-        cosmic_ray.modules.find_modules(
-            cosmic_ray.modules.fixup_module_name(config['module']),
-            config.get('exclude-modules', default=None)))
+    modules = set(_find_modules(config))
 
     log.info('Modules discovered: %s', [m.__name__ for m in modules])
 
-    db_name = get_db_name(args['<session-file>'])
-
     with use_db(db_name) as database:
         cosmic_ray.commands.init(
             modules,
             database,
             config,
-            timeout)
+            timeout,
+            jobs=jobs,
+            incremental=args['--incremental'])
 
     return ExitCode.OK
 
@@ -166,10 +261,17 @@ def handle_exec(args):
     Perform the remaining work to be done in the specified session.
     This requires that the rest of your mutation testing
     infrastructure (e.g. worker processes) are already running.
+
+    If more mutants survive than the `max-survivors` config option allows,
+    execution stops early with exit status 3.
     """
     session_file = get_db_name(
         args.get('<session-file>'))
-    cosmic_ray.commands.execute(session_file)
+    try:
+        cosmic_ray.commands.execute(session_file)
+    except cosmic_ray.commands.SurvivorLimitExceeded as exc:
+        print(exc, file=sys.stderr)
+        return ExitCode.TooManySurvivors
 
     return ExitCode.OK
 
@@ -190,6 +292,65 @@ def handle_dump(args):
     return ExitCode.OK
 
 
+@dsc.command()
+def handle_migrate(args):
+    """usage: cosmic-ray migrate <session-file> [<new-session-file>]
+
+    Copy the configuration and work items (including any results) of a
+    session into a new session file. This is primarily for converting
+    legacy JSON sessions into the faster SQLite format.
+
+    The storage format of each session is determined by its extension. If
+    `new-session-file` isn't given, it defaults to `session-file` with a
+    ".sqlite" extension.
+    """
+    session_file = get_db_name(args['<session-file>'])
+    new_session_file = args['<new-session-file>']
+    if new_session_file is None:
+        new_session_file = '{}.sqlite'.format(os.path.splitext(session_file)[0])
+    else:
+        new_session_file = get_db_name(new_session_file)
+
+    with use_db(session_file, WorkDB.Mode.open) as source:
+        with use_db(new_session_file) as dest:
+            copy_work_db(source, dest)
+
+    return ExitCode.OK
+
+
+@dsc.command()
+def handle_cache(args):
+    """usage: cosmic-ray cache [options] <config-file>
+
+    Show the number and total size of the results in the result cache used
+    by sessions with the given config.
+
+    options:
+      --prune=<size>  Evict the least recently used results until the cache
+                      is at most <size> bytes
+      --clear         Remove all results from the cache
+    """
+    config = load_config(args['<config-file>'])
+
+    with use_result_cache(result_cache_path(config)) as result_cache:
+        if args['--clear']:
+            result_cache.clear()
+
+        if args['--prune'] is not None:
+            try:
+                max_size = int(args['--prune'])
+            except ValueError:
+                max_size = -1
+            if max_size < 0:
+                raise docopt.DocoptExit('--prune must be a non-negative integer')
+            result_cache.prune(max_size)
+
+        print('{} results, {} bytes'.format(len(result_cache),
+                                            result_cache.size))
+
+    return ExitCode.OK
+
+
 @dsc.command()
 def handle_counts(args):
     """usage: {program} counts <config-file>
@@ -202,15 +363,12 @@ def handle_counts(args):
 
     sys.path.insert(0, '')
 
-    module = config['module']
-
-    modules = cosmic_ray.modules.find_modules(
-        cosmic_ray.modules.fixup_module_name(module),
-        config.get('exclude-modules', default=[]))
+    modules = _find_modules(config)
 
     operators = cosmic_ray.plugins.operator_names()
 
-    counts = cosmic_ray.counting.count_mutants(modules, operators)
+    counts = cosmic_ray.counting.count_mutants(modules, operators,
+                                               get_ast_cache(config))
 
     print('[Counts]')
     pprint.pprint(counts)
@@ -300,7 +458,9 @@ def handle_worker(args):
                 int(args['<occurrence>']),
                 cosmic_ray.plugins.get_test_runner(
                     config['test-runner', 'name'],
-                    config['test-runner', 'args']))
+                    config['test-runner', 'args']),
+                schemata_dir=get_schemata_dir(config),
+                ast_cache=get_ast_cache(config))
 
     sys.stdout.write(json.dumps(work_item, cls=WorkItemJsonEncoder))
 
@@ -5,6 +5,6 @@ Not all commands are represented here, just the ones which seem big enough to
 justify a separate module.
 """
 
-from .execute import execute  # NOQA
+from .execute import execute, SurvivorLimitExceeded  # NOQA
 from .init import init  # NOQA
 from .new_config import new_config  # NOQA
@@ -1,8 +1,13 @@
 "Implementation of the 'execute' command."
+import contextlib
 import os
 import logging
 
+from cosmic_ray.execution.execution_engine import StopExecution
 from cosmic_ray.progress import reports_progress
+from cosmic_ray.reporting import is_killed
+from cosmic_ray.result_cache import (DEFAULT_MAX_SIZE, ResultKeys,
+                                     result_cache_path, use_result_cache)
 from cosmic_ray.work_db import use_db, WorkDB
 from cosmic_ray.plugins import get_execution_engine
 
@@ -10,6 +15,31 @@ log = logging.getLogger(__name__)
 
 _progress_messages = {}  # pylint: disable=invalid-name
 
+# The most tests we'll ask a worker to run ahead of the others.
+_MAX_PRIORITY_TESTS = 10
+
+# The defaults for per-test timeouts: the multiple of the baseline duration of
+# a worker's tests, and the time (seconds) added to that.
+DEFAULT_TIMEOUT_FACTOR = 10
+DEFAULT_MINIMUM_TIMEOUT = 1
+
+
+class SurvivorLimitExceeded(StopExecution):
+    """Raised when more mutants have survived than the `max-survivors` of the
+    session allows.
+    """
+    def __init__(self, survivors, max_survivors):
+        super().__init__(
+            '{} mutants survived, but at most {} may survive'.format(
+                survivors, max_survivors))
+        self.survivors = survivors
+        self.max_survivors = max_survivors
+
+
+def _is_survivor(work_item):
+    "Determine if `work_item` is a completed mutant which survived."
+    return work_item.worker_outcome is not None and not is_killed(work_item)
+
 
 def _update_progress(work_db):
     pending = work_db.num_pending_work_items
@@ -28,6 +58,93 @@ def _report_progress(stream):
               file=stream)
 
 
+def _select_tests(work_db, work_items):
+    """Set the `test_ids` of each WorkItem to the tests which cover it.
+
+    WorkItems are left to run all tests if the session has no coverage, if the
+    mutated line is executed outside of any test, or if no test executes it at
+    all.
+    """
+    for work_item in work_items:
+        if work_item.filename is not None:
+            test_ids = work_db.covering_tests(work_item.filename,
+                                              work_item.line_number)
+            if test_ids:
+                work_item.test_ids = sorted(test_ids)
+        yield work_item
+
+
+def _assign_timeouts(work_items, durations, timeout, factor, minimum,
+                     overhead=0):
+    """Set the `timeout` of each WorkItem from the baseline durations of the
+    tests it will run.
+
+    Each timeout is `factor` times the total duration of the tests, plus the
+    `overhead` of the baseline run and `minimum`, but never more than the
+    session's `timeout`. WorkItems which run tests with no recorded duration
+    keep the session's timeout.
+    """
+    total_duration = sum(durations.values())
+    for work_item in work_items:
+        if work_item.test_ids is None:
+            duration = total_duration
+        elif all(test_id in durations for test_id in work_item.test_ids):
+            duration = sum(durations[test_id] for test_id in work_item.test_ids)
+        else:
+            duration = None
+
+        if duration is not None:
+            work_item.timeout = min(timeout,
+                                    factor * duration + overhead + minimum)
+        yield work_item
+
+
+def _prioritize_tests(work_db, work_items):
+    """Set the `priority_tests` of each WorkItem from the session's kill history.
+    """
+    for work_item in work_items:
+        if work_item.line_number is not None:
+            killers = work_db.likely_killers(work_item.module,
+                                             work_item.operator,
+                                             work_item.line_number)
+            work_item.priority_tests = killers[:_MAX_PRIORITY_TESTS] or None
+        yield work_item
+
+
+def _use_cached_results(result_cache, result_keys, work_items, on_task_complete):
+    """Complete each WorkItem whose result is in the cache, and generate the
+    others.
+    """
+    hits = 0
+    for work_item in work_items:
+        result = result_cache.get(result_keys(work_item))
+        if result is None:
+            yield work_item
+        else:
+            hits += 1
+            work_item.update(result)
+            on_task_complete(work_item.job_id, work_item)
+    log.info("%s results reused from the result cache", hits)
+
+
+@contextlib.contextmanager
+def _open_result_cache(config):
+    """Open the result cache for a session.
+
+    Yields: A `(result_cache, result_keys)` tuple, or `(None, None)` if the
+        session doesn't use the result cache.
+    """
+    if not config.get(('result-cache', 'enabled'), default=False):
+        yield None, None
+        return
+
+    with use_result_cache(
+            result_cache_path(config),
+            config.get(('result-cache', 'max-size'),
+                       default=DEFAULT_MAX_SIZE)) as result_cache:
+        yield result_cache, ResultKeys(config)
+
+
 @reports_progress(_report_progress)
 def execute(db_name):
     """Execute any pending work in the database stored in `db_name`,
@@ -35,6 +152,28 @@ def execute(db_name):
 
     This looks for any work in `db_name` which has no results, schedules it to
     be executed, and records any results that arrive.
+
+    If the session has test coverage, each mutant is only tested with the tests
+    which execute the mutated line.
+
+    The test which kills each mutant is recorded in the session's kill history.
+    Tests which have killed mutants nearby are run first, and the tests stop at
+    the first failure.
+
+    If the `per-test-timeouts` of the session are enabled, each mutant's
+    worker gets a timeout based on the baseline durations of the tests it will
+    run (see `_assign_timeouts`), rather than the session's timeout.
+
+    If the session uses the result cache, work whose result is already in the
+    cache is completed without being run, and new results are added to it.
+
+    If the session's config has a `max-survivors` and more mutants than that
+    survive (including those which survived in earlier executions of the
+    session), execution stops as soon as that happens, cancelling any
+    outstanding work.
+
+    Raises:
+        SurvivorLimitExceeded: If more than `max-survivors` mutants survived.
     """
     try:
         with use_db(db_name, mode=WorkDB.Mode.open) as work_db:
@@ -43,17 +182,63 @@ def execute(db_name):
             engine_config = config['execution-engine']
             executor = get_execution_engine(engine_config['name'])
 
-            def on_task_complete(task_id, work_item):
-                work_db.update_work_item(work_item)
-                _update_progress(work_db)
-                log.info("Job %s complete", work_item.job_id)
-
-            log.info("Beginning execution")
-            work_items = executor(timeout,
-                                  work_db.pending_work_items,
-                                  config,
-                                  on_task_complete=on_task_complete)
-            log.info("Execution finished")
+            max_survivors = config.get('max-survivors', default=None)
+            survivors = 0
+            if max_survivors is not None:
+                survivors = sum(1 for work_item in work_db.work_items
+                                if _is_survivor(work_item))
+                if survivors > max_survivors:
+                    raise SurvivorLimitExceeded(survivors, max_survivors)
+
+            with _open_result_cache(config) as (result_cache, result_keys):
+                def on_task_complete(task_id, work_item):
+                    nonlocal survivors
+                    work_db.update_work_item(work_item)
+                    if work_item.killing_test is not None:
+                        work_db.add_kills([(work_item.module,
+                                            work_item.operator,
+                                            work_item.line_number,
+                                            work_item.killing_test)])
+                    if result_cache is not None:
+                        result_cache.put(result_keys(work_item), work_item)
+                    _update_progress(work_db)
+                    log.info("Job %s complete", work_item.job_id)
+
+                    if max_survivors is not None and _is_survivor(work_item):
+                        survivors += 1
+                        if survivors > max_survivors:
+                            raise SurvivorLimitExceeded(survivors,
+                                                        max_survivors)
+
+                log.info("Beginning execution")
+                pending_work_items = work_db.pending_work_items
+                if result_cache is not None:
+                    pending_work_items = _use_cached_results(
+                        result_cache, result_keys, pending_work_items,
+                        on_task_complete)
+                if work_db.has_coverage:
+                    pending_work_items = _select_tests(work_db,
+                                                       pending_work_items)
+                durations = work_db.test_durations
+                if durations and config.get(('per-test-timeouts', 'enabled'),
+                                            default=False):
+                    pending_work_items = _assign_timeouts(
+                        pending_work_items,
+                        durations,
+                        timeout,
+                        config.get(('per-test-timeouts', 'factor'),
+                                   default=DEFAULT_TIMEOUT_FACTOR),
+                        config.get(('per-test-timeouts', 'minimum'),
+                                   default=DEFAULT_MINIMUM_TIMEOUT),
+                        work_db.test_overhead)
+                pending_work_items = _prioritize_tests(work_db,
+                                                       pending_work_items)
+
+                work_items = executor(timeout,
+                                      pending_work_items,
+                                      config,
+                                      on_task_complete=on_task_complete)
+                log.info("Execution finished")
 
     except FileNotFoundError as exc:
         raise FileNotFoundError(str(exc).replace(
@@ -7,7 +7,8 @@ import xml.etree.ElementTree
 import docopt
 from yattag import Doc
 
-from cosmic_ray.reporting import create_report, is_killed, survival_rate
+from cosmic_ray.diffs import mutation_diff
+from cosmic_ray.reporting import create_report, estimate_survival_rate, is_killed
 from cosmic_ray.testing.test_runner import TestOutcome
 from cosmic_ray.util import pairwise, index_of_first_difference
 from cosmic_ray.work_item import WorkItem, WorkItemJsonDecoder
@@ -25,10 +26,16 @@ def format_survival_rate():
 
 Usage: cr-rate
 
-Read JSON work-records from stdin and print the survival rate.
+Read JSON work-records from stdin and print the survival rate. For a sampled
+session, this prints the estimated survival rate followed by the bounds of its
+95% confidence interval.
 """
     records = (WorkItem(json.loads(line, cls=WorkItemJsonDecoder)) for line in sys.stdin)
-    print('{:.2f}'.format(survival_rate(records)))
+    estimate = estimate_survival_rate(records)
+    if estimate.interval is None:
+        print('{:.2f}'.format(estimate.rate))
+    else:
+        print('{:.2f} {:.2f} {:.2f}'.format(estimate.rate, *estimate.interval))
 
 
 def report():
@@ -69,11 +76,14 @@ def _create_element_from_item(work_item):
     elif outcome == WorkerOutcome.EXCEPTION:
         error_elem = xml.etree.ElementTree.SubElement(sub_elem, 'error')
         error_elem.set('message', "Worker has encountered exception")
-        error_elem.text = str(data) + "\n".join(work_item.diff)
+        error_elem.text = str(data) + "\n".join(mutation_diff(work_item) or [])
+    elif outcome == WorkerOutcome.NO_COVERAGE:
+        failure_elem = xml.etree.ElementTree.SubElement(sub_elem, 'failure')
+        failure_elem.set('message', "Mutant is not covered by your unit tests")
     elif _evaluation_success(outcome, work_item):
         failure_elem = xml.etree.ElementTree.SubElement(sub_elem, 'failure')
         failure_elem.set('message', "Mutant has survived your unit tests")
-        failure_elem.text = str(data) + "\n".join(work_item.diff)
+        failure_elem.text = str(data) + "\n".join(mutation_diff(work_item) or [])
 
     return sub_elem
 
@@ -169,7 +179,13 @@ def report_html():
                 with tag('div', klass='container work-item'):
                     with tag('h4', klass='job_id'):
                         text('{} : job ID {}'.format(index, work_item.job_id))
-                    if work_item.test_outcome == TestOutcome.SURVIVED:
+                    if work_item.worker_outcome == WorkerOutcome.NO_COVERAGE:
+                        with tag('div', klass='alert alert-danger test-outcome', role='alert'):
+                            text('Survived! (not covered by any test)')
+                    elif work_item.worker_outcome == WorkerOutcome.EQUIVALENT:
+                        with tag('div', klass='alert alert-info test-outcome', role='alert'):
+                            text('Equivalent to the original code.')
+                    elif work_item.test_outcome == TestOutcome.SURVIVED:
                         with tag('div', klass='alert alert-danger test-outcome', role='alert'):
                             text('Survived!')
                     elif work_item.test_outcome == TestOutcome.INCOMPETENT:
@@ -192,8 +208,9 @@ def report_html():
                                 work_item.line_number,
                                 work_item.col_offset
                             ))
-                    if work_item.diff:
-                        diff = markup_character_level_diff(diff_without_header(work_item.diff))
+                    diff = mutation_diff(work_item)
+                    if diff:
+                        diff = markup_character_level_diff(diff_without_header(diff))
                         with tag('pre', klass='diff'):
                             text('\n'.join(diff))
 
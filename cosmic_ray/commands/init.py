@@ -1,35 +1,71 @@
 "Implementation of the 'init' command."
+import functools
+import importlib
+import itertools
 import logging
+import multiprocessing
 import uuid
 
 import cosmic_ray.modules
-from cosmic_ray.parsing import get_ast
+from cosmic_ray.ast_cache import get_ast_cache
+from cosmic_ray.config import serialize_config
+from cosmic_ray.dispatching import dispatch
+from cosmic_ray.mutating import find_node_paths
+from cosmic_ray.parsing import get_ast, get_source_hash
 from cosmic_ray.plugins import get_interceptor, interceptor_names, get_operator
+from cosmic_ray.schemata import get_schemata_dir, write_schema
+from cosmic_ray.text_edits import find_text_edits
 from cosmic_ray.util import get_col_offset, get_line_number
 from cosmic_ray.work_item import WorkItem
 
 
 log = logging.getLogger()
 
+# The interceptors which are applied after all the others, in order. Sampling
+# only draws from the mutants which the others leave pending, and checking for
+# equivalent mutants (which compiles each one) is only done for the mutants
+# which are still going to be run.
+LATE_INTERCEPTORS = ('sampling', 'equivalence')
+
 
 class WorkDBInitCore:
-    """Operator core that initializes a WorkDB for a specific module and operator.
+    """Operator core that collects WorkItems for a specific module and operator.
 
     The idea is to walk the AST looking for nodes that the operator can mutate.
-    As they're found, `visit_mutation_site` is called and this core adds new
-    WorkItems to the WorkDB. Use this core to populate a WorkDB by creating one
-    for each operator-module pair and running it over the module's AST.
+    As they're found, `visit_mutation_site` is called and this core records a
+    new WorkItem in `work_items`. Use this core to find the work for a WorkDB
+    by creating one for each operator-module pair and running it over the
+    module's AST.
+
+    The WorkItems are only buffered here; it's up to the caller to add them to
+    the WorkDB. This lets `init` commit all of its work in a single bulk
+    transaction rather than writing to the database for each mutation site.
+
+    If `node_paths` (as found by `cosmic_ray.mutating.find_node_paths`) is
+    given, each WorkItem records the path to its mutation site, so that
+    workers can mutate it without traversing the whole AST. `source_hash` is
+    the hash of the module's source.
     """
-    def __init__(self, module, op_name, work_db):
+    def __init__(self, module, op_name, node_paths=None, source_hash=None):
         self.module = module
         self.op_name = op_name
-        self.work_db = work_db
         self.occurrence = 0
+        self.work_items = []
+        self._node_paths = node_paths or {}
+        self._source_hash = source_hash
+
+    def _node_path(self, node, index):
+        path = self._node_paths.get(id(node))
+        if path is None:
+            return None
+        return {'path': list(path),
+                'index': index,
+                'source_hash': self._source_hash}
 
     def visit_mutation_site(self, node, _, count):
-        """Adds work items to the WorkDB as mutatable nodes are found.
+        """Records work items as mutatable nodes are found.
         """
-        self.work_db.add_work_items(
+        self.work_items.extend(
             WorkItem(
                 job_id=uuid.uuid4().hex,
                 module=self.module.__name__,
@@ -37,7 +73,8 @@ class WorkDBInitCore:
                 occurrence=self.occurrence + c,
                 filename=self.module.__file__,
                 line_number=get_line_number(node),
-                col_offset=get_col_offset(node))
+                col_offset=get_col_offset(node),
+                node_path=self._node_path(node, c))
             for c in range(count))
 
         self.occurrence += count
@@ -45,41 +82,203 @@ class WorkDBInitCore:
         return node
 
 
+def _module_work_items(module, operators, schemata_dir=None, text_edits=False,
+                       ast_cache=None):
+    """Generate the WorkItems for every operator applied to `module`.
+
+    The module is parsed once and all operators are applied in a single
+    traversal of its AST. The WorkItems are generated grouped by operator, in
+    the order of `operators`.
+
+    Args:
+      module: The module object to be mutated.
+      operators: A sequence of operator plugin names.
+      schemata_dir: If not None, the module's mutant schema is written to this
+        directory.
+      text_edits: Whether to find the text edit for each WorkItem.
+      ast_cache: The `ASTCache` to parse the module with, or None.
+    """
+    module_ast = get_ast(module, ast_cache)
+    node_paths = find_node_paths(module_ast)
+    source_hash = get_source_hash(module.__file__)
+    cores = [WorkDBInitCore(module, op_name, node_paths, source_hash)
+             for op_name in operators]
+    dispatch(module_ast,
+             [get_operator(core.op_name)(core) for core in cores])
+
+    if schemata_dir is not None:
+        write_schema(schemata_dir, module.__name__, module_ast,
+                     module.__file__, operators)
+
+    if text_edits:
+        find_text_edits(module.__file__,
+                        [item for core in cores for item in core.work_items],
+                        {core.op_name: get_operator(core.op_name)
+                         for core in cores})
+
+    for core in cores:
+        yield from core.work_items
+
+
+def _named_module_work_items(module_name, operators, schemata_dir=None,
+                             text_edits=False, ast_cache=None):
+    """Find the WorkItems for the module named `module_name`.
+
+    This is the entry point for the processes used by parallel `init`. It
+    returns a list rather than a generator so that the results can be sent
+    back to the parent process.
+    """
+    module = importlib.import_module(module_name)
+    return list(_module_work_items(module, operators, schemata_dir,
+                                   text_edits, ast_cache))
+
+
+def _static_module_work_items(name_and_path, operators, schemata_dir=None,
+                              text_edits=False, ast_cache=None):
+    """Find the WorkItems for a module found by static discovery, given as a
+    `(module_name, path)` tuple.
+
+    This is just like `_named_module_work_items()`, except that the module
+    isn't imported.
+    """
+    module = cosmic_ray.modules.static_module(*name_and_path)
+    return list(_module_work_items(module, operators, schemata_dir,
+                                   text_edits, ast_cache))
+
+
+def _parallel_work_items(modules, operators, jobs, schemata_dir=None,
+                         text_edits=False, ast_cache=None, static=False):
+    """Generate the WorkItems for `modules` using a pool of `jobs` processes.
+
+    The WorkItems are generated in the order of `modules`, regardless of which
+    process finishes first. If `static` is true, the modules were found by
+    static discovery, and the processes don't import them either.
+    """
+    if static:
+        find_work_items = _static_module_work_items
+        module_args = ((module.__name__, module.__file__)
+                       for module in modules)
+    else:
+        find_work_items = _named_module_work_items
+        module_args = (module.__name__ for module in modules)
+
+    enumerate_module = functools.partial(find_work_items,
+                                         operators=operators,
+                                         schemata_dir=schemata_dir,
+                                         text_edits=text_edits,
+                                         ast_cache=ast_cache)
+    with multiprocessing.Pool(jobs) as pool:
+        for work_items in pool.imap(enumerate_module, module_args):
+            yield from work_items
+
+
+def _has_config(work_db, config):
+    "Determine if `config` is the configuration of the session in `work_db`."
+    try:
+        session_config, _ = work_db.get_config()
+    except ValueError:
+        return False
+    return serialize_config(session_config) == serialize_config(config)
+
+
 def init(modules,
          work_db,
          config,
-         timeout):
+         timeout,
+         jobs=1,
+         incremental=False):
     """Clear and initialize a work-db with work items.
 
     Any existing data in the work-db will be cleared and replaced with entirely
     new work orders. In particular, this means that any results in the db are
     removed.
 
+    The hash of each module's source is recorded in the work-db. If
+    `incremental` is true, only the work items for modules whose source has
+    changed since they were recorded (or which are no longer being mutated)
+    are replaced, and the work items and results for all other modules are
+    kept. If the session's configuration has changed, or it has no module
+    hashes, everything is replaced as usual.
+
+    The work items for all modules are added to the work-db with a single call
+    to `add_work_items()`, so backends which support it can store them in one
+    transaction.
+
+    If `jobs` is greater than 1, the modules are parsed and their mutation
+    sites enumerated in a pool of `jobs` worker processes. The WorkItems are
+    streamed back to this process, which stores them in the work-db. Modules
+    are always processed in order of their names, so the resulting work-db is
+    the same for any number of jobs. The processes import the modules unless
+    the `module-discovery` in `config` is "static".
+
+    If the `mutation-backend` in `config` is "schemata", the mutant schema for
+    each module is compiled and stored in the cache directory as well (see
+    `cosmic_ray.schemata`). If it's "text", the text edit which makes each
+    mutant is found and recorded in its WorkItem (see `cosmic_ray.text_edits`).
+
     Args:
       modules: iterable of module objects to be mutated.
       work_db: A `WorkDB` instance into which the work orders will be saved.
       config: The configuration for the new session.
       timeout: The timeout to apply to the work in the session.
+      jobs: The number of processes to use for finding mutation sites.
+      incremental: Whether to keep the work items of unchanged modules.
     """
     operators = cosmic_ray.plugins.operator_names()
+    modules = sorted(modules, key=lambda module: module.__name__)
+    module_hashes = {module.__name__: get_source_hash(module.__file__)
+                     for module in modules}
+
+    previous_hashes = work_db.module_hashes
+    if incremental and previous_hashes and _has_config(work_db, config):
+        changed = {name for name, module_hash in module_hashes.items()
+                   if previous_hashes.get(name) != module_hash}
+        removed = set(previous_hashes) - set(module_hashes)
+        work_db.clear_work_items(changed | removed)
+        modules = [module for module in modules if module.__name__ in changed]
+        log.info('Modules changed: %s', sorted(changed))
+    else:
+        work_db.clear_work_items()
+
     work_db.set_config(
         config=config,
         timeout=timeout)
+    work_db.set_module_hashes(module_hashes)
+
+    schemata_dir = get_schemata_dir(config)
+    text_edits = config.get('mutation-backend', default='ast') == 'text'
+    ast_cache = get_ast_cache(config)
 
-    work_db.clear_work_items()
+    if jobs > 1:
+        static = config.get('module-discovery', default='import') == 'static'
+        work_items = _parallel_work_items(modules, operators, jobs,
+                                          schemata_dir, text_edits, ast_cache,
+                                          static)
+    else:
+        work_items = itertools.chain.from_iterable(
+            _module_work_items(module, operators, schemata_dir, text_edits,
+                               ast_cache)
+            for module in modules)
 
-    for module in modules:
-        for op_name in operators:
-            core = WorkDBInitCore(module, op_name, work_db)
-            operator = get_operator(op_name)(core)
-            module_ast = get_ast(module)
-            operator.visit(module_ast)
+    work_db.add_work_items(work_items)
 
     apply_interceptors(work_db)
 
 
+def _interceptor_order(name):
+    "The key by which the interceptor `name` is ordered."
+    try:
+        return (LATE_INTERCEPTORS.index(name) + 1, name)
+    except ValueError:
+        return (0, name)
+
+
 def apply_interceptors(work_db):
-    """Apply each registered interceptor to the WorkDB."""
-    for name in interceptor_names():
+    """Apply each registered interceptor to the WorkDB.
+
+    The interceptors in `LATE_INTERCEPTORS` are applied last, in that order,
+    and the others are applied before them in order of their names.
+    """
+    for name in sorted(interceptor_names(), key=_interceptor_order):
         interceptor = get_interceptor(name)
         interceptor(work_db)
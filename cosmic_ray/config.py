@@ -1,6 +1,7 @@
 """Configuration module."""
 from contextlib import contextmanager
 import logging
+import os
 import sys
 
 import kfg.config
@@ -36,6 +37,13 @@ class Config(kfg.config.Config):
 
         self.set_transform('timeout', float)
         self.set_transform('baseline', self._positive_float)
+        self.set_transform(('execution-engine', 'workers'), self._positive_int)
+        self.set_transform(('result-cache', 'max-size'), self._positive_int)
+        self.set_transform(('ast-cache', 'max-size'), self._positive_int)
+        self.set_transform(('sampling', 'fraction'), self._fraction)
+        self.set_transform('max-survivors', self._non_negative_int)
+        self.set_transform(('per-test-timeouts', 'factor'), self._positive_float)
+        self.set_transform(('per-test-timeouts', 'minimum'), self._positive_float)
 
     @staticmethod
     def _positive_float(x):
@@ -44,6 +52,27 @@ class Config(kfg.config.Config):
             raise ValueError('positive float expected. value={}'.format(x))
         return x
 
+    @staticmethod
+    def _fraction(x):
+        x = float(x)
+        if not 0 < x <= 1:
+            raise ValueError('fraction in (0, 1] expected. value={}'.format(x))
+        return x
+
+    @staticmethod
+    def _positive_int(x):
+        x = int(x)
+        if x <= 0:
+            raise ValueError('positive integer expected. value={}'.format(x))
+        return x
+
+    @staticmethod
+    def _non_negative_int(x):
+        x = int(x)
+        if x < 0:
+            raise ValueError('non-negative integer expected. value={}'.format(x))
+        return x
+
 
 def load_config(filename=None):
     """Load a configuration from a file or stdin.
@@ -71,10 +100,28 @@ def serialize_config(config):
 def get_db_name(session_name):
     """Determines the filename for a session.
 
-    Basically, if `session_name` ends in ".json" this return `session_name`
-    unchanged. Otherwise it return `session_name` with ".json" added to the
-    end.
+    If `session_name` ends in ".sqlite" or ".json" this returns `session_name`
+    unchanged. Otherwise, if a legacy "<session_name>.json" session exists, that
+    is returned. Failing that, ".sqlite" is added to the end of
+    `session_name`.
+
+    The extension determines the storage backend for the session (see
+    `cosmic_ray.work_db.use_db`).
     """
-    if session_name.endswith('.json'):
+    if session_name.endswith(('.sqlite', '.json')):
         return session_name
-    return '{}.json'.format(session_name)
+
+    legacy_name = '{}.json'.format(session_name)
+    if os.path.exists(legacy_name):
+        return legacy_name
+
+    return '{}.sqlite'.format(session_name)
+
+
+def get_cache_dir(config):
+    """Determines the directory in which Cosmic Ray caches data between runs.
+
+    This is the `cache-dir` key of `config`, which defaults to
+    ".cosmic-ray-cache" (relative to the current directory).
+    """
+    return config.get('cache-dir', default='.cosmic-ray-cache')
@@ -3,6 +3,7 @@ Facilities for counting how many mutants will be created in a
 cross-product of operators and modules.
 """
 
+from .dispatching import dispatch
 from .parsing import get_ast
 from .plugins import get_operator
 
@@ -27,31 +28,35 @@ class _CountingCore:
         return []
 
 
-def _count(module_ast, op_name):
-    """Count mutants for a single module-operator pair."""
-    core = _CountingCore()
-    operator = get_operator(op_name)(core)
-    operator.visit(module_ast)
-    return core.count
+def _count(module_ast, operators):
+    """Count mutants for each operator applied to a single module.
+
+    Returns: A dict of the form `{operator-name: count}` containing only the
+        operators with a non-zero count.
+    """
+    cores = [(op_name, _CountingCore()) for op_name in operators]
+    dispatch(module_ast,
+             [get_operator(op_name)(core) for op_name, core in cores])
+    return {op_name: core.count
+            for op_name, core in cores
+            if core.count > 0}
 
 
-def count_mutants(modules, operators):
+def count_mutants(modules, operators, ast_cache=None):
     """Count how many mutations each operator will peform on each module.
 
+    Each module is parsed once, and all of the operators are counted in a
+    single traversal of its AST.
+
     Args:
         modules: A sequence of module objects
         operators: A sequence of operator plugin names (not operator instances)
+        ast_cache: The `ASTCache` to parse the modules with, or None.
 
     Returns: A dict of the form `{ module-object: {operator-name: count} }`,
         giving a per-operator count for each module.
     """
     return {
-        mod: dict(
-            filter(
-                lambda t: t[1] > 0,
-                ((op, _count(mod_ast, op))
-                 for op in operators)))
-        for (mod, mod_ast)
-        in ((m, get_ast(m))
-            for m in modules)
+        mod: _count(get_ast(mod, ast_cache), operators)
+        for mod in modules
     }
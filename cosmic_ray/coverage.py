@@ -0,0 +1,106 @@
+"""Collection of per-test line coverage.
+
+This is what lets Cosmic Ray run only the tests which could possibly kill a
+mutant. During the baseline run we trace the modules under test and record,
+for each line, the IDs of the tests which executed it. A mutant on a line can
+then only be killed by the tests which cover that line.
+
+Lines executed outside of any test are recorded with a test ID of `None`.
+Mutants on these lines need the full test suite. This includes all code run at
+import time (module and class bodies, and anything they call), even if the
+import happens during a test, since its effects are visible to every test that
+runs afterwards.
+"""
+
+import inspect
+import os
+import sys
+import threading
+
+
+class CoverageCollector:
+    """Records which tests execute each line in a set of source files.
+
+    Use this as a context manager around the test run, and pass it as the
+    `listener` to the `TestRunner` so that it knows which test is running::
+
+        collector = CoverageCollector(filenames)
+        with collector:
+            test_runner(listener=collector)
+
+    Args:
+        filenames: The paths of the source files to record coverage for.
+    """
+
+    def __init__(self, filenames):
+        self._filenames = {os.path.abspath(f) for f in filenames}
+        # Maps each `co_filename` we've seen to its absolute path if we're
+        # recording it, or to None if we're not.
+        self._tracked = {}
+        self._test_id = None
+        self._import_depth = 0
+        self._coverage = {}
+
+    @property
+    def coverage(self):
+        """The coverage collected so far.
+
+        A dict mapping `(filename, line_number)` to the set of IDs of the tests
+        which executed that line. The set includes `None` if the line was
+        executed outside of a test.
+        """
+        return self._coverage
+
+    def test_started(self, test_id):
+        "Called by the test runner as each test starts."
+        self._test_id = test_id
+
+    def test_finished(self, test_id):  # pylint: disable=unused-argument
+        "Called by the test runner as each test finishes."
+        self._test_id = None
+
+    def __enter__(self):
+        threading.settrace(self._trace)
+        sys.settrace(self._trace)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.settrace(None)
+        threading.settrace(None)
+
+    def _tracked_filename(self, co_filename):
+        try:
+            return self._tracked[co_filename]
+        except KeyError:
+            filename = os.path.abspath(co_filename)
+            if filename not in self._filenames:
+                filename = None
+            self._tracked[co_filename] = filename
+            return filename
+
+    def _trace(self, frame, event, arg):  # pylint: disable=unused-argument
+        "The global trace function, which is called for each new frame."
+        if event != 'call':
+            return None
+
+        filename = self._tracked_filename(frame.f_code.co_filename)
+        if filename is None:
+            return None
+
+        # Module and class bodies are the only code objects which don't get
+        # new locals. They run at import time.
+        importing = not frame.f_code.co_flags & inspect.CO_NEWLOCALS
+        if importing:
+            self._import_depth += 1
+
+        coverage = self._coverage
+
+        def trace_lines(frame, event, arg):  # pylint: disable=unused-argument
+            if event == 'line':
+                test_id = None if self._import_depth else self._test_id
+                coverage.setdefault((filename, frame.f_lineno), set()).add(test_id)
+            elif event == 'return' and importing:
+                self._import_depth -= 1
+            return trace_lines
+
+        return trace_lines
@@ -0,0 +1,195 @@
+"""Rendering the diffs of mutants for reports.
+
+Workers don't produce diffs, since unparsing and diffing a whole module for
+every mutant can take longer than running the tests. Instead, reports render
+the diff of each mutant on demand from the location recorded in its WorkItem.
+
+Where the WorkItem has a `text_edit` (see `cosmic_ray.text_edits`) which
+matches the current source of the module, the diff is of exactly the source
+lines which the edit changes. Otherwise, where the WorkItem has a `node_path`
+which matches the current source of the module, only the statement enclosing
+the mutation site is mutated, unparsed and diffed, and failing that the whole
+module is. Either way the diff is of the
+current source of the module, so it may not match the mutant which was tested
+if the module has changed since.
+"""
+
+import ast
+import copy
+import difflib
+import functools
+import hashlib
+import logging
+
+import astunparse
+
+from .mutating import MutatingCore
+from .parsing import get_source_hash
+from .plugins import get_operator
+from .text_edits import decode_source, edit_diff
+
+log = logging.getLogger()
+
+DIFF_HEADER = '--- mutation diff ---'
+
+
+@functools.lru_cache(maxsize=None)
+def _operator(name):
+    "The (cached) operator class called `name`."
+    return get_operator(name)
+
+
+@functools.lru_cache(maxsize=16)
+def _module(filename):
+    """The (cached) source hash and AST of the module in `filename`.
+
+    The AST must not be modified.
+    """
+    with open(filename, mode='rt') as handle:
+        source = handle.read()
+    return get_source_hash(filename), ast.parse(source, filename)
+
+
+@functools.lru_cache(maxsize=16)
+def _source(filename):
+    "The (cached) source hash and decoded source of the module in `filename`."
+    with open(filename, mode='rb') as handle:
+        data = handle.read()
+    return hashlib.sha256(data).hexdigest(), decode_source(data)
+
+
+@functools.lru_cache(maxsize=1024)
+def _unparse_original(filename, path):
+    """The (cached) unparsed source of the node at `path` in the original
+    module in `filename`, split into lines.
+    """
+    return _unparse(_node_at(_module(filename)[1], path))
+
+
+def _unparse(nodes):
+    "Unparse a node or a list of nodes into a list of lines."
+    if not isinstance(nodes, list):
+        nodes = [nodes]
+    source = ''.join(astunparse.unparse(node) for node in nodes)
+    return source.strip('\n').split('\n') if source.strip() else []
+
+
+def _node_at(tree, path):
+    "The node at `path` in `tree`."
+    node = tree
+    for step in path:
+        node = node[step] if isinstance(step, int) else getattr(node, step)
+    return node
+
+
+def _statement_path(tree, path):
+    """The path to the innermost statement in `tree` which encloses the node at
+    `path`, or None if there isn't one.
+    """
+    node = tree
+    statement_path = None
+    for length, step in enumerate(path, start=1):
+        node = node[step] if isinstance(step, int) else getattr(node, step)
+        if isinstance(node, ast.stmt):
+            statement_path = tuple(path[:length])
+    return statement_path
+
+
+def _statement_diff(work_item, operator):
+    """The diff of the statement enclosing the mutation site, or None if it
+    can't be found from the WorkItem's `node_path`.
+    """
+    node_path = work_item.node_path
+    if node_path is None:
+        return None
+
+    source_hash, tree = _module(work_item.filename)
+    if source_hash != node_path['source_hash']:
+        return None
+
+    path = tuple(node_path['path'])
+    statement_path = _statement_path(tree, path)
+    if statement_path is None:
+        return None
+
+    # Mutate a copy of just the statement, wrapped in a module so that the
+    # operator can replace or remove it.
+    wrapper = ast.Module(
+        body=[copy.deepcopy(_node_at(tree, statement_path))],
+        type_ignores=[])
+    core = MutatingCore(work_item.occurrence)
+    core.visit_path(wrapper,
+                    ('body', 0) + path[len(statement_path):],
+                    node_path['index'],
+                    operator(core))
+    if not core.activation_record:
+        return None
+
+    return _unparse_original(work_item.filename, statement_path), \
+        _unparse(wrapper.body)
+
+
+def _text_edit_diff(work_item):
+    """The exact diff of the source lines changed by the WorkItem's
+    `text_edit`, or None if it doesn't have one for the current source.
+    """
+    text_edit = work_item.text_edit
+    if text_edit is None:
+        return None
+
+    source_hash, source = _source(work_item.filename)
+    if source_hash != text_edit['source_hash']:
+        return None
+
+    return edit_diff(source, text_edit, work_item.filename)
+
+
+def _module_diff(work_item, operator):
+    "The diff of the whole module, found by traversing its AST."
+    _, tree = _module(work_item.filename)
+    core = MutatingCore(work_item.occurrence)
+    mutant = operator(core).visit(copy.deepcopy(tree))
+    if not core.activation_record:
+        return None
+    return _unparse_original(work_item.filename, ()), _unparse(mutant)
+
+
+def mutation_diff(work_item):
+    """Get the diff showing how a WorkItem's mutant changes the code.
+
+    If the WorkItem has a `diff` (e.g. from a mutant schema), that's used.
+    Otherwise it's rendered from the current source of the mutated module.
+
+    Returns: A list of lines, starting with `DIFF_HEADER` and followed by a
+        unified diff, or None if the diff can't be rendered.
+    """
+    if work_item.diff is not None:
+        return work_item.diff
+
+    if work_item.filename is None or work_item.operator is None:
+        return None
+
+    try:
+        diff = _text_edit_diff(work_item)
+        if diff is not None:
+            return [DIFF_HEADER] + diff
+
+        operator = _operator(work_item.operator)
+        sources = _statement_diff(work_item, operator) or \
+            _module_diff(work_item, operator)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.warning('Unable to render the diff for job %s: %s',
+                    work_item.job_id, exc)
+        return None
+
+    if sources is None:
+        return None
+
+    original, mutant = sources
+    diff = [DIFF_HEADER]
+    diff.extend(difflib.unified_diff(original,
+                                     mutant,
+                                     fromfile='a' + work_item.filename,
+                                     tofile='b' + work_item.filename,
+                                     lineterm=''))
+    return diff
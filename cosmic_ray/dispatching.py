@@ -0,0 +1,101 @@
+"""Facilities for applying many operators to an AST in a single traversal.
+
+Running each operator as its own `NodeTransformer` means walking the entire AST
+once per operator, and there are well over a hundred core operators. Most of
+them only care about one or two node types, so instead we walk the AST once and
+route each node to just the operators that declare a visitor for its type.
+
+The routing preserves the traversal semantics of `ast.NodeTransformer`: nodes
+are visited depth-first in field order, and once an operator's `visit_<Type>`
+method has handled a node, that operator doesn't see the node's descendants
+(since operators don't call `generic_visit()` themselves). As a result each
+operator sees exactly the same sequence of mutation sites, and so produces the
+same occurrence numbering, as it would when run on its own.
+
+This only works for operators whose cores don't modify the AST, e.g. the cores
+used for initialization and counting.
+"""
+
+import ast
+
+# The visitor methods which `ast.NodeVisitor.visit_Constant` delegates to on
+# Python versions that parse all literals into `Constant` nodes.
+_CONSTANT_VISITORS = frozenset(('visit_Num', 'visit_Str', 'visit_Bytes',
+                                'visit_NameConstant', 'visit_Ellipsis'))
+
+
+def _handled_node_types(operator):
+    """The names of the AST node types for which `operator` declares visitors.
+    """
+    op_class = type(operator)
+    visitors = {
+        name for name in dir(op_class)
+        if name.startswith('visit_')
+        if name != 'visit_mutation_site'
+        if getattr(op_class, name) is not getattr(ast.NodeTransformer, name, None)
+    }
+
+    node_types = {name[len('visit_'):] for name in visitors}
+    if visitors & _CONSTANT_VISITORS:
+        node_types.add('Constant')
+    return node_types
+
+
+def _is_dispatchable(operator):
+    """Determine if `operator` uses the standard `NodeTransformer` traversal.
+
+    Operators that customize `visit()` or `generic_visit()` can't be routed
+    node-by-node, so they get a traversal of their own.
+    """
+    op_class = type(operator)
+    return (op_class.visit is ast.NodeVisitor.visit and
+            op_class.generic_visit is ast.NodeTransformer.generic_visit)
+
+
+def _walk(node, routes, finished):
+    """Route `node` and its descendants to the operators in `routes`.
+
+    Args:
+        node: The AST node to visit.
+        routes: A dict mapping node type names to lists of operators.
+        finished: The set of operators which have already handled an ancestor
+            of `node`.
+    """
+    handlers = [op for op in routes.get(type(node).__name__, ())
+                if op not in finished]
+    for operator in handlers:
+        operator.visit(node)
+
+    if handlers:
+        finished = finished.union(handlers)
+
+    for _, value in ast.iter_fields(node):
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, ast.AST):
+                    _walk(item, routes, finished)
+        elif isinstance(value, ast.AST):
+            _walk(value, routes, finished)
+
+
+def dispatch(module_ast, operators):
+    """Apply each of `operators` to `module_ast` in a single traversal.
+
+    Each operator calls into its core for every mutation site it finds, just as
+    if `operator.visit(module_ast)` had been called for each operator in turn.
+
+    Args:
+        module_ast: The AST to visit.
+        operators: An iterable of operator instances. Their cores must not
+            modify the AST.
+    """
+    routes = {}
+    for operator in operators:
+        if not _is_dispatchable(operator):
+            operator.visit(module_ast)
+            continue
+
+        for node_type in _handled_node_types(operator):
+            routes.setdefault(node_type, []).append(operator)
+
+    _walk(module_ast, routes, frozenset())
@@ -3,6 +3,14 @@
 import abc
 
 
+class StopExecution(Exception):
+    """Raised by `on_task_complete` to stop the execution of a session early.
+
+    Execution engines should cancel any outstanding jobs and let the
+    exception propagate to their caller.
+    """
+
+
 class ExecutionEngine(metaclass=abc.ABCMeta):
     "Base class for execution engine plugins."
     @abc.abstractmethod
@@ -11,5 +19,9 @@ class ExecutionEngine(metaclass=abc.ABCMeta):
 
         Spend no more than `timeout` seconds for
         a single job, using `config` to control the work.
+
+        If `on_task_complete` raises an exception (in particular,
+        `StopExecution`), outstanding jobs are cancelled and the exception is
+        propagated.
         """
         pass
@@ -1,7 +1,11 @@
-"Implementation of the local execution engine."
+"Implementation of the local execution engines."
+
+import multiprocessing
+import multiprocessing.connection
+import time
 
 from .execution_engine import ExecutionEngine
-from ..worker import execute_work_item
+from ..worker import execute_work_item, work_item_timeout, WorkerProcess
 
 
 class LocalExecutionEngine(ExecutionEngine):
@@ -10,3 +14,58 @@ class LocalExecutionEngine(ExecutionEngine):
         for work_item in pending_work_items:
             work_item = execute_work_item(work_item, timeout, config)
             on_task_complete(work_item.job_id, work_item)
+
+
+class LocalParallelExecutionEngine(ExecutionEngine):
+    """Execution engine that runs several jobs at once on the local machine.
+
+    The number of concurrent workers is set with the `workers` key of the
+    execution-engine config. It defaults to the number of CPUs.
+
+    Each job runs in its own worker process, just like with the local engine.
+    Results are passed to `on_task_complete` as each worker finishes, in
+    whatever order that happens.
+    """
+    def __call__(self, timeout, pending_work_items, config, on_task_complete):
+        num_workers = config.get(('execution-engine', 'workers'),
+                                 default=multiprocessing.cpu_count())
+        pending_work_items = iter(pending_work_items)
+
+        # Maps each worker's connection to
+        # `(worker_process, timeout, deadline)`.
+        running = {}
+        try:
+            while True:
+                while len(running) < num_workers:
+                    work_item = next(pending_work_items, None)
+                    if work_item is None:
+                        break
+                    worker_timeout = work_item_timeout(work_item, timeout)
+                    worker_process = WorkerProcess(work_item, config)
+                    running[worker_process.connection] = (
+                        worker_process, worker_timeout,
+                        time.monotonic() + worker_timeout)
+
+                if not running:
+                    break
+
+                next_deadline = min(deadline for _, _, deadline in running.values())
+                ready = multiprocessing.connection.wait(
+                    list(running),
+                    max(0, next_deadline - time.monotonic()))
+
+                now = time.monotonic()
+                for connection, (worker_process, worker_timeout, deadline) \
+                        in list(running.items()):
+                    if connection in ready:
+                        work_item = worker_process.complete()
+                    elif deadline <= now:
+                        work_item = worker_process.time_out(worker_timeout)
+                    else:
+                        continue
+
+                    del running[connection]
+                    on_task_complete(work_item.job_id, work_item)
+        finally:
+            for worker_process, _, _ in running.values():
+                worker_process.terminate()
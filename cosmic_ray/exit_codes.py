@@ -10,6 +10,10 @@ class ExitCode(IntEnum):
     # successful termination
     OK = 0
 
+    # execution stopped because too many mutants survived (see the
+    # max-survivors config option)
+    TooManySurvivors = 3
+
     # command line usage error
     Usage = 64
 
@@ -58,6 +58,64 @@ class ASTFinder(MetaPathFinder):
                               ASTLoader(self._ast, fullname))
 
 
+class CodeLoader:
+
+    """
+    An `importlib.abc.Loader` which loads a compiled code object for a
+    particular name.
+
+    This is like `ASTLoader`, except that the code has already been compiled.
+    Cosmic Ray uses this to load mutant schemata.
+    """
+
+    def __init__(self, code):
+        self._code = code
+
+    def create_module(self,  # pylint: disable=no-self-use
+                      spec):  # pylint: disable=unused-argument
+        "Default module creation semantics."
+        return None
+
+    def exec_module(self, mod):
+        "Execute the code into `mod`."
+        exec(self._code, mod.__dict__)  # pylint:disable=exec-used
+
+
+class CodeFinder(MetaPathFinder):
+
+    """
+    An `importlib.abc.MetaPathFinder` that associates a module name with a
+    compiled code object.
+    """
+
+    def __init__(self, fullname, code):
+        self._fullname = fullname
+        self._code = code
+
+    def find_spec(self, fullname,
+                  path, target=None):  # pylint:disable=unused-argument
+        "Find modules matching `self._fullname`."
+        if fullname == self._fullname:
+            return ModuleSpec(fullname,
+                              CodeLoader(self._code))
+
+
+def remove_modules(names):
+    """Remove the modules called `names` from `sys.modules`.
+
+    Each module is also removed from its parent package, if the parent stays
+    loaded, since importing a submodule makes it an attribute of its parent.
+    Otherwise e.g. `from pkg import mod` would still find the removed module.
+    """
+    removed = {name: sys.modules.pop(name, None) for name in names}
+    for name, module in removed.items():
+        parent_name, _, child = name.rpartition('.')
+        parent = sys.modules.get(parent_name)
+        if module is not None and parent is not None and \
+                getattr(parent, child, None) is module:
+            delattr(parent, child)
+
+
 @contextlib.contextmanager
 def preserve_modules():
     """Remember the state of sys.modules on enter and reset it on exit.
@@ -66,9 +124,7 @@ def preserve_modules():
     try:
         yield
     finally:
-        del_mods = {m for m in sys.modules if m not in original_mods}
-        for mod in del_mods:
-            del sys.modules[mod]
+        remove_modules([m for m in sys.modules if m not in original_mods])
 
 
 @contextlib.contextmanager
@@ -91,3 +147,18 @@ def using_ast(module_name, module_ast):
         yield finder
     finally:
         sys.meta_path.remove(finder)
+
+
+@contextlib.contextmanager
+def using_code(module_name, code):
+    """Create a new CodeFinder as a context-manager.
+
+    This is just like `using_ast()`, except that the finder loads the compiled
+    code object `code` when `module_name` is requested.
+    """
+    finder = CodeFinder(module_name, code)
+    sys.meta_path = [finder] + sys.meta_path
+    try:
+        yield finder
+    finally:
+        sys.meta_path.remove(finder)
@@ -0,0 +1,96 @@
+"""An interceptor that uses test coverage to find mutations which no test can
+kill.
+"""
+import ast
+import itertools
+import logging
+
+from cosmic_ray.parsing import get_source_hash
+from cosmic_ray.worker import WorkerOutcome
+
+log = logging.getLogger()
+
+
+def _statement_lines(tree, path):
+    """The line numbers of the innermost statement containing the node at
+    `path` in `tree`, or None if there's no such statement with an end line.
+    """
+    statement = None
+    node = tree
+    for step in path:
+        node = node[step] if isinstance(step, int) else getattr(node, step)
+        if isinstance(node, ast.stmt):
+            statement = node
+
+    if getattr(statement, 'end_lineno', None) is None:
+        return None
+    return range(statement.lineno, statement.end_lineno + 1)
+
+
+def _parse(filename):
+    """Parse the source in `filename`.
+
+    Returns: A tuple of the AST and the hash of the source, or `(None, None)`
+        if the file can't be parsed.
+    """
+    try:
+        with open(filename, mode='rb') as handle:
+            tree = ast.parse(handle.read(), filename)
+        return tree, get_source_hash(filename)
+    except (OSError, SyntaxError, ValueError):
+        return None, None
+
+
+def _is_covered(work_db, item, lines):
+    "Determine if a test (or code outside of any test) executes any of `lines`."
+    return any(work_db.covering_tests(item.filename, line) != set()
+               for line in lines)
+
+
+def intercept(work_db):
+    """Mark WorkItems in `work_db` on statements which no test executes.
+
+    These mutants are certain to survive, so there's no point in running the
+    tests for them. They're marked with the NO_COVERAGE outcome, which counts
+    as surviving.
+
+    A mutant is covered if any line of the innermost statement containing it
+    is executed, found from its `node_path`. The compiler folds constants on
+    the continuation lines of an expression (e.g. `3 * 4` in a multi-line
+    expression) into the statement's other lines, so those lines are never
+    traced even when the statement runs. WorkItems without a `node_path` for
+    the current source only count the mutated line.
+
+    This does nothing if the session has no test coverage (see the `coverage`
+    config option).
+    """
+    if not work_db.has_coverage:
+        return
+
+    def filename(item):
+        return item.filename or ''
+
+    uncovered = []
+    items = sorted(work_db.pending_work_items, key=filename)
+    for name, file_items in itertools.groupby(items, key=filename):
+        if not name:
+            continue
+
+        parsed = False
+        for item in file_items:
+            lines = [item.line_number]
+            if item.node_path is not None:
+                if not parsed:
+                    tree, source_hash = _parse(name)
+                    parsed = True
+                if tree is not None and \
+                        item.node_path['source_hash'] == source_hash:
+                    lines.extend(_statement_lines(
+                        tree, item.node_path['path']) or ())
+
+            if not _is_covered(work_db, item, lines):
+                item.worker_outcome = WorkerOutcome.NO_COVERAGE
+                log.info('no coverage for %s', item)
+                uncovered.append(item)
+
+    work_db.update_work_items(uncovered)
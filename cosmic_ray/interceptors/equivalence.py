@@ -0,0 +1,251 @@
+"""An interceptor that finds mutants which compile to the same bytecode as the
+original code.
+"""
+import __future__
+import ast
+import copy
+import itertools
+import logging
+import types
+import warnings
+
+from cosmic_ray.mutating import MutatingCore
+from cosmic_ray.parsing import get_source_hash
+from cosmic_ray.plugins import get_operator
+from cosmic_ray.worker import WorkerOutcome
+
+log = logging.getLogger()
+
+# The attributes of code objects which determine their behaviour. Line numbers
+# and column offsets are left out, since mutated nodes don't always have the
+# same locations as the nodes they replace.
+_CODE_ATTRS = tuple(
+    attr for attr in ('co_argcount', 'co_posonlyargcount',
+                      'co_kwonlyargcount', 'co_flags', 'co_code', 'co_names',
+                      'co_varnames', 'co_freevars', 'co_cellvars',
+                      'co_exceptiontable')
+    if hasattr(types.CodeType, attr))
+
+
+def _const_key(value):
+    """A key for a constant which only matches constants of the same type and
+    value.
+
+    Plain equality isn't good enough since e.g. `1 == 1.0 == True` and
+    `0.0 == -0.0`.
+    """
+    if isinstance(value, types.CodeType):
+        return _code_key(value)
+    if isinstance(value, (tuple, frozenset)):
+        items = (_const_key(item) for item in value)
+        if isinstance(value, frozenset):
+            items = sorted(items, key=repr)
+        return (type(value), tuple(items))
+    return (type(value), repr(value))
+
+
+def _code_key(code):
+    "A key for a code object which matches code objects with the same behaviour."
+    return (tuple(getattr(code, attr) for attr in _CODE_ATTRS),
+            tuple(_const_key(const) for const in code.co_consts))
+
+
+def _compile_key(tree, filename, flags=0):
+    """Compile `tree` and return the key of the resulting code object.
+
+    Returns: The key, or None if the tree can't be compiled.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', SyntaxWarning)
+            return _code_key(compile(tree, filename, 'exec', flags=flags,
+                                     dont_inherit=True))
+    except (SyntaxError, TypeError, ValueError):
+        return None
+
+
+def _future_flags(tree):
+    "The compiler flags for the `__future__` imports at the start of `tree`."
+    flags = 0
+    for node in tree.body:
+        if not isinstance(node, ast.ImportFrom) or node.module != '__future__':
+            break
+        for alias in node.names:
+            feature = getattr(__future__, alias.name, None)
+            flags |= getattr(feature, 'compiler_flag', 0)
+    return flags
+
+
+def _unit_path(tree, path):
+    """The path to the part of `tree` which is compiled to check a mutant of
+    the node at `path`.
+
+    This is the innermost function definition containing the node or, if
+    there isn't one, the top-level statement containing it.
+    """
+    unit_path = path[:2]
+    node = tree
+    for length, step in enumerate(path[:-1], start=1):
+        node = node[step] if isinstance(step, int) else getattr(node, step)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            unit_path = path[:length]
+    return unit_path
+
+
+def _unit_module(unit_path, statements):
+    """A module holding just `statements`, which are (or replace) the node at
+    `unit_path`.
+
+    A placeholder goes first if that node is a top-level statement other than
+    the first, so that a string expression isn't compiled as a docstring.
+    """
+    if unit_path[1] != 0 and len(unit_path) == 2:
+        statements = [ast.Pass()] + statements
+    return ast.fix_missing_locations(
+        ast.Module(body=statements, type_ignores=[]))
+
+
+def _node_at(tree, path):
+    "The node at `path` in `tree`."
+    node = tree
+    for step in path:
+        node = node[step] if isinstance(step, int) else getattr(node, step)
+    return node
+
+
+class _Module:
+    """A module parsed once, from which the mutants of its WorkItems are
+    compiled.
+
+    Where a WorkItem has a `node_path` for the current source, only the
+    innermost function (or else top-level statement) containing the mutation
+    site is copied, mutated and compiled on its own, and compared with the
+    original function compiled the same way. Its surroundings only affect how
+    its names are looked up, which is the same for the original and the
+    mutant, so this finds the same mutants as compiling the whole module while
+    only compiling one function per mutant. Other WorkItems fall back to
+    mutating and compiling the whole module.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, mode='rb') as handle:
+            self.source = handle.read()
+        self.tree = ast.parse(self.source, filename)
+        self.source_hash = get_source_hash(filename)
+        self.flags = _future_flags(self.tree)
+        self._unit_keys = {}
+        self._module_key = None
+
+    def _original_key(self, unit_path):
+        "The key of the node at `unit_path`, compiled alone."
+        try:
+            return self._unit_keys[unit_path]
+        except KeyError:
+            key = self._unit_keys[unit_path] = _compile_key(
+                _unit_module(unit_path, [_node_at(self.tree, unit_path)]),
+                self.filename, self.flags)
+            return key
+
+    def is_equivalent(self, item, operator):
+        "Whether the mutant of `item` compiles to the same code as the original."
+        node_path = item.node_path
+        if node_path is None or node_path['source_hash'] != self.source_hash:
+            return self._is_equivalent_module(item, operator)
+
+        path = tuple(node_path['path'])
+        if len(path) < 2:
+            return self._is_equivalent_module(item, operator)
+
+        unit_path = _unit_path(self.tree, path)
+        original = self._original_key(unit_path)
+        if original is None:
+            return False
+
+        # Mutate a copy of just the unit, wrapped in a list so that the
+        # operator can replace or remove it.
+        wrapper = ast.Module(
+            body=[copy.deepcopy(_node_at(self.tree, unit_path))],
+            type_ignores=[])
+        core = MutatingCore(item.occurrence)
+        core.visit_path(wrapper,
+                        ('body', 0) + path[len(unit_path):],
+                        node_path['index'],
+                        operator(core))
+        if core.activation_record is None:
+            return False
+
+        return _compile_key(_unit_module(unit_path, wrapper.body),
+                            self.filename, self.flags) == original
+
+    def _is_equivalent_module(self, item, operator):
+        "Whether the mutant of `item` is equivalent, compiling the whole module."
+        if self._module_key is None:
+            self._module_key = _compile_key(self.tree, self.filename)
+        if self._module_key is None:
+            return False
+
+        core = MutatingCore(item.occurrence)
+        mutated = operator(core).visit(ast.parse(self.source, self.filename))
+        if core.activation_record is None:
+            return False
+
+        return _compile_key(mutated, self.filename) == self._module_key
+
+
+def _equivalent_items(filename, items, operators):
+    """Find the WorkItems in `items` whose mutants of `filename` compile to the
+    same bytecode as the original.
+
+    Args:
+        filename: The source file of the module.
+        items: The WorkItems for the module.
+        operators: A dict caching operator classes by name.
+    """
+    module = _Module(filename)
+    for item in items:
+        try:
+            operator = operators[item.operator]
+        except KeyError:
+            operator = operators[item.operator] = get_operator(item.operator)
+
+        if module.is_equivalent(item, operator):
+            yield item
+
+
+def intercept(work_db):
+    """Mark pending WorkItems in `work_db` whose mutants are equivalent to the
+    original code as EQUIVALENT.
+
+    Each mutant is compiled and its code objects compared with those of the
+    original module. Mutants with identical bytecode and constants, such as
+    those of constants which the compiler discards, can't be killed by any
+    test.
+
+    This does nothing unless the `bytecode-equivalence` config option is true.
+    """
+    config, _ = work_db.get_config()
+    if not config.get('bytecode-equivalence', default=False):
+        return
+
+    def filename(item):
+        return item.filename or ''
+
+    operators = {}
+    equivalent = []
+    items = sorted(work_db.pending_work_items, key=filename)
+    for name, file_items in itertools.groupby(items, key=filename):
+        if not name:
+            continue
+
+        try:
+            equivalent.extend(
+                _equivalent_items(name, file_items, operators))
+        except (OSError, SyntaxError) as exc:
+            log.warning('Unable to compile mutants of %s: %s', name, exc)
+
+    for item in equivalent:
+        item.worker_outcome = WorkerOutcome.EQUIVALENT
+
+    log.info('%s mutants are equivalent to the original code', len(equivalent))
+    work_db.update_work_items(equivalent)
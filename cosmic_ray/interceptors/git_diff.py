@@ -0,0 +1,135 @@
+"""An interceptor that skips mutations on lines which haven't changed since a
+git revision.
+"""
+import logging
+import os
+import re
+import subprocess
+
+from cosmic_ray.worker import WorkerOutcome
+
+log = logging.getLogger()
+
+# Matches the range of new lines in a hunk header, e.g. "@@ -10,2 +12,3 @@".
+_HUNK_RE = re.compile(r'^@@ -\S+ \+(\d+)(?:,(\d+))? @@')
+
+
+# The characters git escapes in quoted paths, other than with octal escapes.
+_ESCAPES = {'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r',
+            't': '\t', 'v': '\v', '"': '"', '\\': '\\'}
+
+
+def _unquote(path):
+    """Undo git's C-style quoting of a path, if it's quoted.
+
+    Paths containing unusual characters (e.g. quotes, backslashes or control
+    characters) are put in double quotes, with those characters escaped. Bytes
+    which aren't printable ASCII are escaped in octal unless `core.quotepath`
+    is off.
+    """
+    if len(path) < 2 or path[0] != '"' or path[-1] != '"':
+        return path
+
+    unquoted = bytearray()
+    chars = iter(path[1:-1])
+    for char in chars:
+        if char != '\\':
+            unquoted.extend(char.encode('utf-8'))
+            continue
+
+        char = next(chars, '')
+        if char and char in '01234567':
+            digits = char + next(chars, '') + next(chars, '')
+            unquoted.append(int(digits, 8))
+        else:
+            unquoted.extend(_ESCAPES.get(char, char).encode('utf-8'))
+    return unquoted.decode('utf-8', errors='surrogateescape')
+
+
+def _parse_diff(diff, root):
+    """Find the changed lines in the output of `git diff -U0`.
+
+    The diff must use the default "a/" and "b/" prefixes on paths.
+
+    Args:
+        diff: The output of `git diff`.
+        root: The root directory of the repository.
+
+    Returns: A dict mapping the real path of each changed file to the set of
+        changed (or added) line numbers in its new version.
+    """
+    changed = {}
+    lines = None
+    for line in diff.splitlines():
+        if line.startswith('+++ '):
+            # Git adds a tab after paths which contain spaces.
+            path = _unquote(line[4:].rstrip('\t'))
+            if path.startswith('b/'):
+                lines = changed.setdefault(
+                    os.path.realpath(os.path.join(root, path[2:])), set())
+            else:
+                # The file was deleted.
+                lines = None
+            continue
+
+        match = _HUNK_RE.match(line)
+        if match and lines is not None:
+            start = int(match.group(1))
+            count = 1 if match.group(2) is None else int(match.group(2))
+            lines.update(range(start, start + count))
+    return changed
+
+
+def _changed_lines(base):
+    """Find the lines in the working tree which have changed since `base`.
+
+    Returns: A dict as produced by `_parse_diff`.
+
+    Raises:
+        subprocess.CalledProcessError: If `git` fails, e.g. if the current
+            directory isn't in a git repository or `base` doesn't exist.
+    """
+    root = subprocess.check_output(
+        ['git', 'rev-parse', '--show-toplevel'],
+        universal_newlines=True).strip()
+    # The prefixes are given explicitly, since the user's config can change
+    # them (e.g. with diff.noprefix or diff.mnemonicPrefix).
+    diff = subprocess.check_output(
+        ['git', '-c', 'core.quotepath=off', 'diff', '--no-color',
+         '--no-ext-diff', '--src-prefix=a/', '--dst-prefix=b/', '-U0', base,
+         '--'],
+        universal_newlines=True)
+    return _parse_diff(diff, root)
+
+
+def intercept(work_db):
+    """Mark pending WorkItems in `work_db` on unchanged lines as SKIPPED.
+
+    A line counts as changed if `git diff` shows it as changed or added
+    between the revision in the `base` key of the `git-diff` config and the
+    working tree. This is useful for only testing the mutants in a pull
+    request, for example. Note that untracked files are not considered
+    changed.
+
+    This does nothing if the `git-diff` config has no `base`.
+    """
+    config, _ = work_db.get_config()
+    base = config.get(('git-diff', 'base'), default=None)
+    if base is None:
+        return
+
+    changed = _changed_lines(base)
+
+    skipped = []
+    for item in work_db.pending_work_items:
+        if item.filename is None:
+            continue
+
+        lines = changed.get(os.path.realpath(item.filename), ())
+        if item.line_number not in lines:
+            item.worker_outcome = WorkerOutcome.SKIPPED
+            skipped.append(item)
+
+    log.info('skipping %s mutants on lines unchanged since %s',
+             len(skipped), base)
+    work_db.update_work_items(skipped)
@@ -0,0 +1,84 @@
+"""An interceptor that skips mutations on lines with a `# pragma: no mutate`
+comment.
+"""
+import fnmatch
+import itertools
+import logging
+import re
+import tokenize
+
+from cosmic_ray.worker import WorkerOutcome
+
+log = logging.getLogger()
+
+# Matches a pragma comment, optionally followed by operator name patterns,
+# e.g. "# pragma: no mutate" or "# pragma: no mutate: core/NumberReplacer".
+_PRAGMA_RE = re.compile(r'#\s*pragma:\s*no\s+mutate\b(?:\s*:(.*))?')
+
+
+def _pragma_lines(filename):
+    """Find the lines in `filename` with a `no mutate` pragma.
+
+    Returns: A dict mapping line numbers to the operator name patterns in the
+        pragma on that line, or to None if the pragma applies to all
+        operators.
+    """
+    lines = {}
+    with tokenize.open(filename) as handle:
+        for token in tokenize.generate_tokens(handle.readline):
+            if token.type != tokenize.COMMENT:
+                continue
+
+            match = _PRAGMA_RE.search(token.string)
+            if match is None:
+                continue
+
+            patterns = (match.group(1) or '').replace(',', ' ').split()
+            lines[token.start[0]] = patterns or None
+    return lines
+
+
+def _is_excluded(operator, patterns):
+    "Whether a pragma with operator name `patterns` excludes `operator`."
+    return patterns is None or any(
+        fnmatch.fnmatchcase(operator, pattern) for pattern in patterns)
+
+
+def intercept(work_db):
+    """Mark pending WorkItems in `work_db` on lines with a `no mutate` pragma
+    as SKIPPED.
+
+    A `# pragma: no mutate` comment excludes all mutations on its line. The
+    pragma can be limited to some operators by following it with a colon and
+    a list of operator name patterns, e.g. `# pragma: no mutate:
+    core/NumberReplacer, core/ReplaceComparisonOperator_*`.
+
+    Each file is only tokenized once, and the skipped WorkItems are updated in
+    a single write.
+    """
+    def filename(item):
+        return item.filename or ''
+
+    skipped = []
+    items = sorted(work_db.pending_work_items, key=filename)
+    for name, file_items in itertools.groupby(items, key=filename):
+        if not name:
+            continue
+
+        try:
+            pragmas = _pragma_lines(name)
+        except (OSError, SyntaxError, tokenize.TokenError) as exc:
+            log.warning('Unable to read pragmas from %s: %s', name, exc)
+            continue
+
+        if not pragmas:
+            continue
+
+        for item in file_items:
+            if item.line_number in pragmas and _is_excluded(
+                    item.operator, pragmas[item.line_number]):
+                item.worker_outcome = WorkerOutcome.SKIPPED
+                skipped.append(item)
+
+    log.info('skipping %s mutants with no mutate pragmas', len(skipped))
+    work_db.update_work_items(skipped)
@@ -0,0 +1,63 @@
+"""An interceptor that only keeps a random sample of the mutants in a session.
+"""
+import logging
+
+from kfg.config import ConfigValueError
+
+from cosmic_ray.sampling import (SAMPLED_OUT, STRATIFY_FIELDS, is_sampled_out,
+                                 sample)
+from cosmic_ray.worker import WorkerOutcome
+
+log = logging.getLogger()
+
+
+def intercept(work_db):
+    """Mark the WorkItems in `work_db` which aren't in a random sample as
+    SKIPPED, and those which are as `sampled`.
+
+    The sample is configured by the `sampling` config: `fraction` is the
+    fraction of the WorkItems to sample, `seed` seeds the random number
+    generator (0 by default), and `stratify` is a list of the fields by which
+    to stratify the sample ("module" and/or "operator", none by default). See
+    `cosmic_ray.sampling.sample` for details.
+
+    The sample is only drawn from pending WorkItems in modules which haven't
+    already been sampled. WorkItems which already have an outcome (e.g. results
+    kept by an incremental init) are left alone, and the WorkItems of unchanged
+    modules aren't sampled again.
+
+    This does nothing if the `sampling` config has no `fraction`.
+    """
+    config, _ = work_db.get_config()
+    fraction = config.get(('sampling', 'fraction'), default=None)
+    if fraction is None:
+        return
+
+    stratify = config.get(('sampling', 'stratify'), default=[])
+    if isinstance(stratify, str):
+        stratify = [stratify]
+    for field in stratify:
+        if field not in STRATIFY_FIELDS:
+            raise ConfigValueError(
+                'sampling can only be stratified by {}'.format(
+                    ' and '.join(STRATIFY_FIELDS)))
+
+    sampled_modules = {item.module for item in work_db.work_items
+                       if is_sampled_out(item)}
+    sampled, sampled_out = sample(
+        (item for item in work_db.pending_work_items
+         if item.module not in sampled_modules),
+        fraction,
+        seed=config.get(('sampling', 'seed'), default=0),
+        stratify=stratify)
+
+    for item in sampled:
+        item.sampled = True
+    for item in sampled_out:
+        item.worker_outcome = WorkerOutcome.SKIPPED
+        item.test_outcome = None
+        item.data = {SAMPLED_OUT: list(stratify)}
+
+    log.info('sampled %s of %s mutants', len(sampled),
+             len(sampled) + len(sampled_out))
+    work_db.update_work_items(sampled + sampled_out)
@@ -1,6 +1,7 @@
 """An interceptor that uses spor metadata to determine when specific mutations
 should be skipped.
 """
+import itertools
 import logging
 
 from spor.repo import find_anchors
@@ -10,23 +11,51 @@ from cosmic_ray.worker import WorkerOutcome
 log = logging.getLogger()
 
 
+def _skipped_lines(filename):
+    """Find the lines in `filename` with anchors whose metadata contains
+    `{mutate: False}`.
+
+    Returns: A set of line numbers, or None if there's no spor repository for
+        the file.
+    """
+    try:
+        anchors = tuple(find_anchors(filename))
+    except ValueError:
+        log.info('No spor repository for %s', filename)
+        return None
+
+    return {anchor.line_number
+            for anchor in anchors
+            if not anchor.metadata.get('mutate', True)}
+
+
 def intercept(work_db):
     """Look for WorkItems in `work_db` that should not be mutated due to spor metadata.
 
-    For each WorkItem, find anchors for the item's file/line/columns. If an
-    anchor exists with metadata containing `{mutate: False}` then the WorkItem
-    is marked as SKIPPED.
+    For each file, find the anchors in its spor repository. If an anchor exists
+    on a pending WorkItem's line with metadata containing `{mutate: False}`
+    then the WorkItem is marked as SKIPPED.
+
+    The anchors are only loaded once per file, and the skipped WorkItems are
+    updated in a single write.
     """
-    for item in work_db.work_items:
-        try:
-            anchors = tuple(find_anchors(item.filename))
-        except ValueError:
-            log.info('No spor repository for %s', item.filename)
+    def filename(item):
+        return item.filename or ''
+
+    skipped = []
+    items = sorted(work_db.pending_work_items, key=filename)
+    for name, file_items in itertools.groupby(items, key=filename):
+        if not name:
             continue
 
-        for anchor in anchors:
-            metadata = anchor.metadata
-            if item.line_number == anchor.line_number and not metadata.get('mutate', True):
+        lines = _skipped_lines(name)
+        if not lines:
+            continue
+
+        for item in file_items:
+            if item.line_number in lines:
                 item.worker_outcome = WorkerOutcome.SKIPPED
                 log.info('skipping %s', item)
-                work_db.update_work_item(item)
+                skipped.append(item)
+
+    work_db.update_work_items(skipped)
@@ -1,10 +1,14 @@
 """Functions related to finding modules for testing."""
 
+import ast
 import importlib
+import importlib.machinery
+import importlib.util
 import logging
 import os
 import pkgutil
 import re
+import types
 
 log = logging.getLogger()
 
@@ -74,3 +78,188 @@ def find_modules(name, excludes=None):
             log.exception(
                 'Unable to import %s',
                 module_name)
+
+
+def _find_spec(name):
+    """Find the spec for the module called `name` without importing anything.
+
+    `importlib.util.find_spec()` imports the parent packages of dotted names,
+    so the parents are instead searched for on the path of their own parents.
+
+    Returns: The `ModuleSpec`, or None if the module can't be found.
+    """
+    top, *parts = name.split('.')
+    spec = importlib.util.find_spec(top)
+    for idx, _ in enumerate(parts, start=1):
+        if spec is None or not spec.submodule_search_locations:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(
+            '.'.join([top] + parts[:idx]),
+            list(spec.submodule_search_locations))
+    return spec
+
+
+def find_module_paths(name):
+    """Generate `(module_name, path)` pairs for NAME and all of its submodules.
+
+    Unlike `find_modules()`, this locates the source files without importing
+    any modules. Only modules with Python source files are reported, and as
+    with `pkgutil`, only directories containing an `__init__.py` are treated
+    as packages.
+
+    Returns: An iterable of `(module_name, path)` tuples.
+    """
+    spec = _find_spec(name)
+    if spec is None or not spec.has_location or not spec.origin.endswith('.py'):
+        return
+
+    yield name, spec.origin
+
+    for location in spec.submodule_search_locations or ():
+        for dirpath, dirnames, filenames in os.walk(location):
+            if '__init__.py' not in filenames:
+                dirnames[:] = []
+                continue
+
+            rel_path = os.path.relpath(dirpath, location)
+            prefix = name if rel_path == os.curdir else '.'.join(
+                [name] + rel_path.split(os.sep))
+            if prefix != name:
+                yield prefix, os.path.join(dirpath, '__init__.py')
+
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith('.py') and filename != '__init__.py':
+                    yield ('{}.{}'.format(prefix, filename[:-3]),
+                           os.path.join(dirpath, filename))
+
+
+def static_module(name, path):
+    """Create a stand-in for the module called `name` with source file `path`,
+    without importing it.
+
+    The stand-in is an empty module object with the module's `__name__` and
+    `__file__` (and `__path__` if it's a package), which is all that `init`
+    and `counts` need.
+    """
+    module = types.ModuleType(name)
+    module.__file__ = path
+    if os.path.basename(path) == '__init__.py':
+        module.__path__ = [os.path.dirname(path)]
+    return module
+
+
+def find_static_modules(name, excludes=None):
+    """Generate stand-ins for NAME and all of its submodules, without
+    importing any of them.
+
+    This finds the same modules as `find_modules()`, as long as they're all
+    Python source files, but from the filesystem (see `find_module_paths()`)
+    rather than by importing them. So no module code is executed, and modules
+    which fail to import are still found. `excludes` is treated just as it is
+    by `find_modules()`.
+
+    Returns: An iterable of module objects created by `static_module()`.
+    """
+    exclude_patterns = [re.compile(ex) for ex in excludes or []]
+    parts = name.split('.')
+    for module_name, path in find_module_paths(name):
+        # A module is excluded if it or any of the packages above it (up to
+        # NAME) is excluded.
+        module_parts = module_name.split('.')
+        prefixes = ('.'.join(module_parts[:idx])
+                    for idx in range(len(parts), len(module_parts) + 1))
+        if any(pattern.match(prefix)
+               for prefix in prefixes
+               for pattern in exclude_patterns):
+            continue
+
+        yield static_module(module_name, path)
+
+
+def _imported_names(module_name, is_package, module_ast):
+    """Generate the names of the modules imported by a module.
+
+    Names in `from X import Y` statements are reported both as `X` and as
+    `X.Y`, since `Y` may be a submodule. Relative imports are resolved against
+    `module_name`.
+    """
+    for node in ast.walk(module_ast):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                parts = module_name.split('.')
+                if not is_package:
+                    parts = parts[:-1]
+                parts = parts[:len(parts) - (node.level - 1)]
+                base = '.'.join(parts + ([node.module] if node.module else []))
+
+            yield base
+            for alias in node.names:
+                yield '{}.{}'.format(base, alias.name)
+
+
+def import_graph(name):
+    """Build the graph of imports between NAME and its submodules.
+
+    This is a static analysis of the source code, so imports made dynamically
+    (e.g. with `importlib.import_module()`) aren't found. Importing `a.b.c`
+    counts as importing `a` and `a.b` as well, and each submodule is also
+    treated as importing its parent package.
+
+    Returns: A dict mapping each module name to the set of names of the modules
+        in the package which it imports.
+    """
+    paths = dict(find_module_paths(name))
+    graph = {}
+    for module_name, path in paths.items():
+        try:
+            with open(path, mode='rb') as handle:
+                module_ast = ast.parse(handle.read(), path, 'exec')
+        except (OSError, SyntaxError, ValueError):
+            log.warning('Unable to parse %s for imports', path)
+            module_ast = ast.Module(body=[])
+
+        is_package = os.path.basename(path) == '__init__.py'
+        imports = set()
+        for imported in _imported_names(module_name, is_package, module_ast):
+            parts = imported.split('.')
+            imports.update('.'.join(parts[:idx])
+                           for idx in range(1, len(parts) + 1))
+
+        parent = module_name.rpartition('.')[0]
+        if parent:
+            imports.add(parent)
+
+        graph[module_name] = {m for m in imports
+                              if m in paths and m != module_name}
+    return graph
+
+
+def dependent_modules(graph, module_name):
+    """Find the modules which transitively import `module_name`.
+
+    Args:
+        graph: An import graph as produced by `import_graph()`.
+        module_name: The name of the module to find dependents of.
+
+    Returns: The set of names of the dependent modules, including
+        `module_name` itself.
+    """
+    importers = {}
+    for importer, imports in graph.items():
+        for imported in imports:
+            importers.setdefault(imported, set()).add(importer)
+
+    dependents = {module_name}
+    pending = [module_name]
+    while pending:
+        for importer in importers.get(pending.pop(), ()):
+            if importer not in dependents:
+                dependents.add(importer)
+                pending.append(importer)
+    return dependents
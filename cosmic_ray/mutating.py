@@ -9,6 +9,33 @@ import cosmic_ray.util
 log = logging.getLogger()
 
 
+def find_node_paths(tree):
+    """Find the path to each node in an AST.
+
+    A path is a tuple of the steps from the root of the AST to a node. Each
+    step is either the name of a field or, for fields which hold lists, an
+    index into the list. For example, the path of the value of the first
+    statement in a module is `('body', 0, 'value')`.
+
+    Returns: A dict mapping the `id()` of each node to its path.
+    """
+    paths = {id(tree): ()}
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        path = paths[id(node)]
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    if isinstance(item, ast.AST):
+                        paths[id(item)] = path + (field, index)
+                        pending.append(item)
+            elif isinstance(value, ast.AST):
+                paths[id(value)] = path + (field,)
+                pending.append(value)
+    return paths
+
+
 def _full_module_name(obj):
     return '{}.{}'.format(
         obj.__class__.__module__,
@@ -70,6 +97,52 @@ class MutatingCore:
         self._count += num_mutations
         return node
 
+    def visit_path(self, tree, path, index, operator):
+        """Mutate the node at `path` in `tree` directly, rather than
+        traversing the whole tree to find the target.
+
+        This only visits the one node, so it's up to the caller to make sure
+        that the target really is the `index`-th mutation the operator makes
+        at that node, e.g. by finding the path and index with
+        `find_node_paths()` when the tree was parsed from the same source.
+
+        Args:
+            tree: The AST to mutate (in place).
+            path: The path to the node, as found by `find_node_paths()`.
+            index: The index of the target among the mutations at the node.
+            operator: The operator using this core.
+
+        Returns: The mutated `tree`. The `activation_record` is still None if
+            the operator didn't mutate the node.
+        """
+        if not path:
+            return operator.visit(tree)
+
+        parent = tree
+        for step in path[:-1]:
+            parent = parent[step] if isinstance(step, int) else getattr(parent, step)
+
+        step = path[-1]
+        node = parent[step] if isinstance(step, int) else getattr(parent, step)
+
+        self._count = self._target - index
+        new_node = operator.visit(node)
+
+        # Put the new node in place, as `ast.NodeTransformer` would.
+        if isinstance(step, int):
+            if new_node is None:
+                del parent[step]
+            elif isinstance(new_node, list):
+                parent[step:step + 1] = new_node
+            else:
+                parent[step] = new_node
+        elif new_node is None:
+            delattr(parent, step)
+        else:
+            setattr(parent, step, new_node)
+
+        return tree
+
     def repr_args(self):
         "Extra arguments to display in operator reprs."
         return [('target', self._target)]
@@ -1,6 +1,7 @@
 """Facilities for generating ASTs from modules."""
 
 import ast
+import hashlib
 import inspect
 import logging
 
@@ -11,15 +12,28 @@ log = logging.getLogger()
 # Right now we only really handle normal source-code, text-file modules.
 
 
-def get_ast(module):
+def get_ast(module, cache=None):
     """Generate an AST from a module object.
 
     This will be the AST for the contents of the module.
 
+    If `cache` (a `cosmic_ray.ast_cache.ASTCache`) is given, the AST is loaded
+    from it if the module's source file hasn't changed since it was cached.
+    Otherwise the module is parsed and its AST stored in the cache. Either way
+    the caller gets its own copy of the AST, which it's free to modify.
+
     Raises:
         OSError: If the source code for `module` can't be found.
         TypeError: If the source file for `module` can't be found.
     """
+    # Modules loaded from source have their source file as `__file__`, so
+    # cache hits don't need to look for it.
+    filename = getattr(module, '__file__', None)
+    if cache is not None and filename is not None and filename.endswith('.py'):
+        cached = cache.get(filename)
+        if cached is not None:
+            return cached[1]
+
     try:
         source_file = inspect.getsourcefile(module)
     except TypeError:
@@ -40,4 +54,17 @@ def get_ast(module):
             with open(source_file, mode='rt') as handle:
                 source = handle.read()
 
-    return ast.parse(source, source_file, 'exec')
+    module_ast = ast.parse(source, source_file, 'exec')
+    if cache is not None:
+        cache.put(source_file, source, module_ast)
+    return module_ast
+
+
+def get_source_hash(filename):
+    """The hash of the contents of a source file.
+
+    This is used to tell whether information derived from a module's source
+    (e.g. its work items or its mutant schema) is out of date.
+    """
+    with open(filename, mode='rb') as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
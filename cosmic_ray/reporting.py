@@ -1,6 +1,11 @@
 """Functions for calculate certain kinds of reports.
 """
 
+import collections
+import math
+
+from cosmic_ray.diffs import mutation_diff
+from cosmic_ray.sampling import SAMPLED_OUT, is_sampled_out, stratum
 from cosmic_ray.testing.test_runner import TestOutcome
 from cosmic_ray.worker import WorkerOutcome
 
@@ -26,12 +31,18 @@ def _print_item(work_item, full_report):
             ret_val = []
     elif work_item.worker_outcome == WorkerOutcome.SKIPPED and not full_report:
         ret_val = []
+    elif work_item.worker_outcome == WorkerOutcome.EQUIVALENT and not full_report:
+        ret_val = []
+    elif work_item.worker_outcome == WorkerOutcome.NO_COVERAGE:
+        ret_val.append('no test covers {}:{}'.format(
+            work_item.filename, work_item.line_number))
     elif work_item.worker_outcome in {WorkerOutcome.NORMAL,
                                       WorkerOutcome.EXCEPTION}:
         ret_val += data
 
-        if work_item.diff is not None:
-            ret_val += work_item.diff
+        diff = mutation_diff(work_item)
+        if diff is not None:
+            ret_val += diff
 
     # for presentation purposes only
     if ret_val:
@@ -42,8 +53,14 @@ def _print_item(work_item, full_report):
 
 def is_killed(record):
     """Determines if a WorkItem should be considered "killed".
+
+    Note that mutants which no test covers (i.e. with the NO_COVERAGE worker
+    outcome) are never killed. Mutants which are equivalent to the original
+    code can't be killed, so like skipped mutants they aren't counted as
+    survivors.
     """
-    if record.worker_outcome in {WorkerOutcome.TIMEOUT, WorkerOutcome.SKIPPED}:
+    if record.worker_outcome in {WorkerOutcome.TIMEOUT, WorkerOutcome.SKIPPED,
+                                 WorkerOutcome.EQUIVALENT}:
         return True
     elif record.worker_outcome in {WorkerOutcome.ABNORMAL, WorkerOutcome.NORMAL}:
         if record.test_outcome == TestOutcome.KILLED:
@@ -61,15 +78,13 @@ def create_report(records, show_pending, full_report=False):
       show_pending: Show output for records which are pending.
       full_report: Whether to report on mutants that were killed.
     """
+    records = list(records)
     total_jobs = 0
     pending_jobs = 0
-    kills = 0
     for item in records:
         total_jobs += 1
         if item.worker_outcome is None:
             pending_jobs += 1
-        if is_killed(item):
-            kills += 1
         if (item.worker_outcome is not None) or show_pending:
             yield from _print_item(item, full_report)
 
@@ -80,30 +95,152 @@ def create_report(records, show_pending, full_report=False):
     if completed_jobs > 0:
         yield 'complete: {} ({:.2f}%)'.format(
             completed_jobs, completed_jobs / total_jobs * 100)
-        yield 'survival rate: {:.2f}%'.format(
-            (1 - kills / completed_jobs) * 100)
+        estimate = estimate_survival_rate(records)
+        if estimate.interval is None:
+            yield 'survival rate: {:.2f}%'.format(estimate.rate)
+        else:
+            yield 'estimated survival rate: {:.2f}% (95% CI: {:.2f}%-{:.2f}%)'.format(
+                estimate.rate, *estimate.interval)
     else:
         yield 'no jobs completed'
 
 
-def survival_rate(records):
-    """Calcuate the survival rate for a series of WorkItems.
+# The coefficients of Acklam's rational approximation of the inverse of the
+# standard normal CDF.
+_QUANTILE_A = (-3.969683028665376e+01, 2.209460984245205e+02,
+               -2.759285104469687e+02, 1.383577518672690e+02,
+               -3.066479806614716e+01, 2.506628277459239e+00)
+_QUANTILE_B = (-5.447609879822406e+01, 1.615858368580409e+02,
+               -1.556989798598866e+02, 6.680131188771972e+01,
+               -1.328068155288572e+01)
+_QUANTILE_C = (-7.784894002430293e-03, -3.223964580411365e-01,
+               -2.400758277161838e+00, -2.549732539343734e+00,
+               4.374664141464968e+00, 2.938163982698783e+00)
+_QUANTILE_D = (7.784695709041462e-03, 3.224671290700398e-01,
+               2.445134137142996e+00, 3.754408661907416e+00)
+
+
+def _polynomial(coefficients, x):
+    "Evaluate the polynomial with `coefficients`, highest power first, at `x`."
+    result = 0
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+def _normal_quantile(p):
+    """The inverse of the standard normal CDF at `p`, with a relative error of
+    less than 1.15e-9.
     """
-    total_jobs = 0
-    pending_jobs = 0
-    kills = 0
+    if not 0 < p < 1:
+        raise ValueError('p must be between 0 and 1')
+
+    if p < 0.02425 or p > 1 - 0.02425:
+        q = math.sqrt(-2 * math.log(min(p, 1 - p)))
+        x = (_polynomial(_QUANTILE_C, q)
+             / (_polynomial(_QUANTILE_D, q) * q + 1))
+        return x if p < 0.5 else -x
+
+    q = p - 0.5
+    r = q * q
+    return (_polynomial(_QUANTILE_A, r) * q
+            / (_polynomial(_QUANTILE_B, r) * r + 1))
+
+
+class SurvivalRate(collections.namedtuple('SurvivalRate',
+                                          ['rate', 'interval'])):
+    """A survival rate, as a percentage.
+
+    Attributes:
+        rate: The survival rate, or its estimate for a sampled session.
+        interval: A tuple `(lower, upper)` with the confidence interval of the
+            estimate for a sampled session, and None otherwise.
+    """
+
+
+def estimate_survival_rate(records, confidence=0.95):
+    """Calculate the survival rate of a session, estimating it if the session
+    is sampled.
+
+    For a sampled session, each stratum is split in two. WorkItems which got
+    an outcome without being sampled (e.g. skipped by another interceptor, or
+    not covered by any test) are counted as they are. The survival rate of
+    the rest of the stratum, its *sampling frame* of the sampled-out and
+    sampled WorkItems, is estimated from the sampled WorkItems which have
+    completed. The confidence interval is based on the normal approximation,
+    with the finite population correction for each sampling frame. Strata
+    with no completed WorkItems, and sampling frames with no completed sampled
+    WorkItems, are left out of the estimate.
+
+    Args:
+        records: An iterable of WorkItems.
+        confidence: The confidence level of the interval.
+
+    Returns: A `SurvivalRate`.
+    """
+    records = list(records)
+    stratify = next((item.data[SAMPLED_OUT] for item in records
+                     if is_sampled_out(item)), None)
+
+    if stratify is None:
+        completed = [item for item in records
+                     if item.worker_outcome is not None]
+        if not completed:
+            return SurvivalRate(0, None)
+        survived = sum(not is_killed(item) for item in completed)
+        return SurvivalRate(survived / len(completed) * 100, None)
+
+    # [census, census survived, frame, sampled completed, sampled survived]
+    # for each stratum
+    strata = collections.defaultdict(lambda: [0, 0, 0, 0, 0])
     for item in records:
-        total_jobs += 1
-        if item.worker_outcome is None:
-            pending_jobs += 1
-        if is_killed(item):
-            kills += 1
+        counts = strata[stratum(item, stratify)]
+        if is_sampled_out(item):
+            counts[2] += 1
+        elif item.sampled:
+            counts[2] += 1
+            if item.worker_outcome is not None:
+                counts[3] += 1
+                counts[4] += not is_killed(item)
+        elif item.worker_outcome is not None:
+            counts[0] += 1
+            counts[1] += not is_killed(item)
+
+    population = 0
+    survivors = 0
+    frames = []
+    for census, census_survived, frame, completed, survived in \
+            strata.values():
+        population += census
+        survivors += census_survived
+        if completed:
+            population += frame
+            proportion = survived / completed
+            survivors += frame * proportion
+            frames.append((frame, completed, proportion))
+
+    if not population:
+        return SurvivalRate(0, None)
+
+    rate = survivors / population
+    variance = 0
+    for frame, completed, proportion in frames:
+        if completed > 1:
+            variance += (frame ** 2
+                         * (1 - completed / frame)
+                         * proportion * (1 - proportion) / (completed - 1))
+    variance /= population ** 2
+
+    margin = _normal_quantile((1 + confidence) / 2) * math.sqrt(variance)
+    return SurvivalRate(rate * 100,
+                        (max(0, rate - margin) * 100,
+                         min(1, rate + margin) * 100))
 
-    completed_jobs = total_jobs - pending_jobs
 
-    if not completed_jobs:
-        rate = 0
-    else:
-        rate = (1 - kills / completed_jobs) * 100
+def survival_rate(records):
+    """Calculate the survival rate for a series of WorkItems.
 
-    return rate
+    For a sampled session, this is an estimate of the survival rate (see
+    `estimate_survival_rate`).
+    """
+    return estimate_survival_rate(records).rate
@@ -0,0 +1,283 @@
+"""A cache of mutation testing results which is shared between sessions.
+
+Each result is stored under a key which is a hash of everything the result
+depends on: the source of the mutated module (along with the modules in its
+package which import it, and everything they import from the package), the
+operator and occurrence, the test sources, the
+test-runner configuration and the versions of Python and Cosmic Ray. When a
+session is executed, any pending work whose key is in the cache gets the cached
+result rather than being run again.
+
+Only results from workers which finished normally are cached, since timeouts
+depend on the timeout of the session that recorded them.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from .config import get_cache_dir
+from .modules import (dependent_modules, find_module_paths, fixup_module_name,
+                      import_graph)
+from .version import __version__
+from .worker import WorkerOutcome
+
+log = logging.getLogger()
+
+# The default maximum size of the cache, in bytes.
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+# How many results are stored between prunings of the cache.
+_PRUNE_INTERVAL = 100
+
+# The WorkItem fields which make up a result.
+_RESULT_FIELDS = ('data', 'test_outcome', 'worker_outcome', 'diff',
+                  'line_number', 'killing_test')
+
+
+def result_cache_path(config):
+    "The path of the result cache used by sessions with config `config`."
+    return os.path.join(get_cache_dir(config), 'results.sqlite')
+
+
+class ResultCache:
+    """The result cache, stored in an SQLite database.
+
+    The cache is kept to at most `max_size` bytes of results by evicting the
+    least recently used results. It's pruned every `_PRUNE_INTERVAL` puts and
+    when it's closed, so it may briefly grow beyond `max_size`.
+
+    Args:
+        path: The path to the cache file. It's created if necessary.
+        max_size: The maximum size of the cache, in bytes.
+    """
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS results ('
+        '    key TEXT PRIMARY KEY,'
+        '    result TEXT NOT NULL,'
+        '    size INTEGER NOT NULL,'
+        '    last_used REAL NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS results_last_used'
+        '    ON results (last_used)',
+    )
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._max_size = max_size
+        self._puts = 0
+        # Several sessions may share the cache, so wait for each other.
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._conn:
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+
+    def close(self):
+        """Prune and close the cache."""
+        if self._puts:
+            self.prune(self._max_size)
+        self._conn.close()
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    @property
+    def size(self):
+        """The total size of the cached results, in bytes."""
+        return self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+    def get(self, key):
+        """Look up a result.
+
+        Returns: A dict of WorkItem fields, or None if `key` isn't in the cache.
+        """
+        row = self._conn.execute(
+            'SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        with self._conn:
+            self._conn.execute(
+                'UPDATE results SET last_used = ? WHERE key = ?',
+                (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, work_item):
+        """Store the result in a completed WorkItem.
+
+        Nothing is stored unless the worker finished normally.
+        """
+        if work_item.worker_outcome != WorkerOutcome.NORMAL:
+            return
+
+        result = json.dumps({field: work_item[field] for field in _RESULT_FIELDS})
+        with self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, result, size, last_used) '
+                'VALUES (?, ?, ?, ?)',
+                (key, result, len(result), time.time()))
+
+        self._puts += 1
+        if self._puts % _PRUNE_INTERVAL == 0:
+            self.prune(self._max_size)
+
+    def prune(self, max_size):
+        """Evict the least recently used results until the cache is at most
+        `max_size` bytes.
+        """
+        total = self.size
+        if total <= max_size:
+            return
+
+        evicted = []
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM results ORDER BY last_used'):
+            if total <= max_size:
+                break
+            evicted.append((key,))
+            total -= size
+
+        with self._conn:
+            self._conn.executemany('DELETE FROM results WHERE key = ?', evicted)
+
+    def clear(self):
+        """Remove all results from the cache."""
+        with self._conn:
+            self._conn.execute('DELETE FROM results')
+
+
+@contextlib.contextmanager
+def use_result_cache(path, max_size=DEFAULT_MAX_SIZE):
+    """Open the result cache in file `path` as a context manager.
+
+    On exiting the context the cache will be automatically closed.
+    """
+    cache = ResultCache(path, max_size)
+    try:
+        yield cache
+    finally:
+        cache.close()
+
+
+def _hash_files(digest, paths):
+    """Add the names (relative to the current directory) and contents of the
+    files in `paths` to `digest`.
+    """
+    for path in sorted({os.path.abspath(path) for path in paths}):
+        digest.update(os.path.relpath(path).encode('utf-8'))
+        with open(path, mode='rb') as handle:
+            digest.update(hashlib.sha256(handle.read()).digest())
+
+
+def _test_source_paths(roots, excluded):
+    """Find the Python source files under `roots`, except those in `excluded`.
+
+    Hidden directories and virtual environments are skipped.
+    """
+    for root in roots:
+        if os.path.isfile(root):
+            yield os.path.normpath(root)
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [
+                name for name in dirnames
+                if not name.startswith('.')
+                if name != '__pycache__'
+                if not os.path.exists(os.path.join(dirpath, name, 'pyvenv.cfg'))
+            ]
+            for filename in filenames:
+                path = os.path.normpath(os.path.join(dirpath, filename))
+                if filename.endswith('.py') and os.path.abspath(path) not in excluded:
+                    yield path
+
+
+class ResultKeys:
+    """Computes the result cache keys for the WorkItems of a session.
+
+    The test sources are the Python files found under the paths in the
+    `test-sources` key of the `result-cache` config (by default the current
+    directory), excluding the modules of the package under test.
+
+    Args:
+        config: The configuration of the session.
+    """
+
+    def __init__(self, config):
+        package = fixup_module_name(config['module']).split('.')[0]
+
+        # Modules are imported from the current directory, as by the workers.
+        sys.path.insert(0, '')
+        try:
+            self._paths = dict(find_module_paths(package))
+            self._graph = import_graph(package)
+        finally:
+            sys.path.remove('')
+
+        test_sources = config.get(('result-cache', 'test-sources'),
+                                  default=[os.curdir])
+        if isinstance(test_sources, str):
+            test_sources = [test_sources]
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps([
+            __version__,
+            sys.version,
+            config['test-runner', 'name'],
+            config['test-runner', 'args'],
+        ]).encode('utf-8'))
+        _hash_files(digest, _test_source_paths(
+            test_sources,
+            {os.path.abspath(path) for path in self._paths.values()}))
+        self._context = digest.hexdigest()
+
+        self._module_hashes = {}
+
+    def _module_hash(self, module_name, filename):
+        """The hash of a module's source along with that of every module in its
+        package which imports it, and every module which those import from the
+        package.
+
+        The modules which import the mutated module are included because the
+        tests may only reach the mutant through them.
+        """
+        try:
+            return self._module_hashes[module_name]
+        except KeyError:
+            pass
+
+        modules = dependent_modules(self._graph, module_name)
+        pending = list(modules)
+        while pending:
+            for imported in self._graph.get(pending.pop(), ()):
+                if imported not in modules:
+                    modules.add(imported)
+                    pending.append(imported)
+
+        paths = {self._paths[name] for name in modules if name in self._paths}
+        if filename is not None:
+            paths.add(filename)
+
+        digest = hashlib.sha256()
+        _hash_files(digest, paths)
+        self._module_hashes[module_name] = digest.hexdigest()
+        return self._module_hashes[module_name]
+
+    def __call__(self, work_item):
+        """The result cache key for a WorkItem."""
+        return hashlib.sha256(json.dumps([
+            self._context,
+            self._module_hash(work_item.module, work_item.filename),
+            work_item.operator,
+            work_item.occurrence,
+        ]).encode('utf-8')).hexdigest()
@@ -0,0 +1,71 @@
+"""Support for testing a random sample of the mutants in a session.
+
+When sampling, the `sampling` interceptor keeps a seeded random sample of the
+WorkItems in a session and marks the rest as SKIPPED, with a marker in their
+`data` recording that they were sampled out. The sample may be stratified by
+module and/or operator, in which case the same fraction of each stratum is
+sampled.
+
+The survival rate of a sampled session is estimated from the sample, along
+with a confidence interval (see `cosmic_ray.reporting.estimate_survival_rate`).
+"""
+
+import collections
+import random
+
+from .worker import WorkerOutcome
+
+# The key in the `data` of sampled-out WorkItems. Its value is the list of
+# WorkItem fields by which the sample was stratified.
+SAMPLED_OUT = 'sampled-out'
+
+# The WorkItem fields by which a sample can be stratified.
+STRATIFY_FIELDS = ('module', 'operator')
+
+
+def is_sampled_out(work_item):
+    "Determine if `work_item` was left out of the session's sample."
+    return (work_item.worker_outcome == WorkerOutcome.SKIPPED
+            and isinstance(work_item.data, dict)
+            and SAMPLED_OUT in work_item.data)
+
+
+def stratum(work_item, stratify):
+    "The values of the `stratify` fields of `work_item`."
+    return tuple(work_item[field] for field in stratify)
+
+
+def sample(work_items, fraction, seed=0, stratify=()):
+    """Choose a random sample of `work_items`.
+
+    The sample is drawn separately from each stratum (i.e. each group of
+    WorkItems with the same values for the `stratify` fields), with at least
+    one WorkItem from every stratum. Each stratum's sample only depends on
+    `seed` and the WorkItems in the stratum, so it's unaffected by changes to
+    other strata.
+
+    Args:
+        work_items: An iterable of WorkItems.
+        fraction: The fraction of WorkItems to sample, between 0 and 1.
+        seed: The seed for the random number generators.
+        stratify: A sequence of fields in `STRATIFY_FIELDS`.
+
+    Returns: A tuple `(sampled, sampled_out)` of lists of WorkItems.
+    """
+    strata = collections.defaultdict(list)
+    for item in work_items:
+        strata[stratum(item, stratify)].append(item)
+
+    sampled = []
+    sampled_out = []
+    for key, items in strata.items():
+        items.sort(key=lambda item: (item.module or '',
+                                     item.operator or '',
+                                     item.occurrence or 0))
+        size = max(1, round(fraction * len(items)))
+        chosen = set(random.Random('{}:{!r}'.format(seed, key)).sample(
+            range(len(items)), size))
+        for index, item in enumerate(items):
+            (sampled if index in chosen else sampled_out).append(item)
+
+    return sampled, sampled_out
@@ -0,0 +1,380 @@
+"""Mutant schemata: all of the mutants of a module compiled into one module.
+
+Normally each worker parses the module under test, applies a single mutation
+to its AST and compiles the result. With the schemata mutation backend, `init`
+instead compiles each module just once, with every mutation site guarded by a
+check of which mutant is active::
+
+    x = a - b if __cosmic_ray_mutant__ == 3 else a + b
+
+The worker then only has to set the active mutant (a builtin, like
+`CosmicRayTestingException`) and run the tests against the compiled schema.
+
+Wherever possible only the part of a node which a mutation changes is guarded
+(e.g. just the test of an `if` statement, or the exception type of an
+`except` clause). Otherwise expressions are guarded with a conditional
+expression and statements with an `if` statement. Mutants which can't be
+guarded either way (e.g. those in `match` patterns) are left out of the schema,
+and workers fall back to mutating the AST for them.
+
+Schemata are stored in a cache directory, one file per module, and are ignored
+once the module's source changes.
+"""
+
+import ast
+import builtins
+import contextlib
+import copy
+import difflib
+import importlib.util
+import logging
+import marshal
+import os
+import sys
+import warnings
+
+import astunparse
+
+from .config import get_cache_dir
+from .dispatching import dispatch
+from .importing import using_code
+from .parsing import get_source_hash
+from .plugins import get_operator
+from .util import get_line_number
+
+log = logging.getLogger()
+
+# The builtin which holds the ID of the active mutant.
+_SWITCH = '__cosmic_ray_mutant__'
+
+# What a guarded field means when the original node doesn't have a value for
+# it.
+_FIELD_DEFAULTS = {
+    (ast.ExceptHandler, 'type'): 'BaseException',
+}
+
+# Mutants inside match patterns can't be guarded, since patterns can't contain
+# arbitrary expressions.
+_UNGUARDABLE = tuple(
+    getattr(ast, name) for name in ('pattern',) if hasattr(ast, name))
+
+
+def _operator_key(operator):
+    "The name under which mutants made by the operator class are stored."
+    return '{}.{}'.format(operator.__module__, operator.__name__)
+
+
+def _same(first, second):
+    "Determine if two AST field values are the same."
+    if isinstance(first, ast.AST) and isinstance(second, ast.AST):
+        return ast.dump(first) == ast.dump(second)
+    if isinstance(first, list) and isinstance(second, list):
+        return (len(first) == len(second) and
+                all(_same(a, b) for a, b in zip(first, second)))
+    return first == second
+
+
+def _guardable_field(node, field, value):
+    "Determine if a field of `node` can be replaced with `value` by a guard."
+    original = getattr(node, field, None)
+    if original is None:
+        original = _FIELD_DEFAULTS.get((type(node), field))
+        return original is not None and isinstance(value, ast.expr)
+    return isinstance(original, ast.expr) and isinstance(value, ast.expr)
+
+
+def _unparse(node):
+    return astunparse.unparse(node).strip('\n').split('\n')
+
+
+class _Mutant:
+    """A mutation of a single node.
+
+    Attributes:
+        key: The `(operator-key, occurrence)` identifying the mutant.
+        line_number: The line number of the mutated node.
+        diff: The diff of the mutated node's source.
+        fields: A dict mapping field names to their mutated values, if the
+            mutant can be applied by guarding individual fields of the node.
+        node: Otherwise, the mutated node.
+    """
+
+    def __init__(self, key, original, mutant, filename):
+        self.key = key
+        self.line_number = get_line_number(original)
+        self.fields = None
+        self.node = mutant
+
+        if type(mutant) is type(original):  # pylint: disable=unidiomatic-typecheck
+            fields = {
+                field: getattr(mutant, field, None)
+                for field in original._fields
+                if not _same(getattr(original, field, None),
+                             getattr(mutant, field, None))
+            }
+            if all(_guardable_field(original, field, value)
+                   for field, value in fields.items()):
+                self.fields = fields
+
+        self.diff = ["--- mutation diff ---"]
+        self.diff.extend(difflib.unified_diff(
+            _unparse(original),
+            _unparse(mutant) if mutant is not None else [],
+            fromfile="a" + filename,
+            tofile="b" + filename,
+            lineterm=""))
+
+
+class _SchemaCore:
+    """An operator core which records every mutation an operator can make.
+
+    The mutations are made to copies of the mutation sites, so this doesn't
+    modify the AST.
+    """
+
+    def __init__(self, operator_key, filename, sites):
+        self._operator_key = operator_key
+        self._filename = filename
+        self._sites = sites
+        self._count = 0
+
+    def visit_mutation_site(self, node, op, num_mutations):
+        "Called when a mutation site is reached."
+        for idx in range(num_mutations):
+            mutant = op.mutate(copy.deepcopy(node), idx)
+            if mutant is not None:
+                ast.copy_location(mutant, node)
+                ast.fix_missing_locations(mutant)
+
+            _, mutants = self._sites.setdefault(id(node), (node, []))
+            mutants.append(_Mutant((self._operator_key, self._count + idx),
+                                   node, mutant, self._filename))
+
+        self._count += num_mutations
+        return node
+
+    @staticmethod
+    def repr_args():
+        "Extra arguments to display in operator reprs."
+        return []
+
+
+def _switch(mutant_id, node):
+    "An expression which is true when mutant `mutant_id` is active."
+    return ast.copy_location(
+        ast.Compare(left=ast.Name(id=_SWITCH, ctx=ast.Load()),
+                    ops=[ast.Eq()],
+                    comparators=[ast.Num(n=mutant_id)]),
+        node)
+
+
+class _SchemaTransformer(ast.NodeTransformer):
+    """Guards each recorded mutation site with its mutants.
+
+    Mutants are given IDs in the order in which they're added to the schema.
+
+    Args:
+        sites: A dict mapping `id(node)` to `(node, mutants)` for each mutation
+            site.
+    """
+
+    def __init__(self, sites):
+        self._sites = sites
+        self.mutants = {}
+
+    def _add(self, mutant):
+        mutant_id = len(self.mutants)
+        self.mutants[mutant.key] = (mutant_id, mutant.line_number,
+                                    tuple(mutant.diff))
+        return mutant_id
+
+    def visit(self, node):
+        if isinstance(node, _UNGUARDABLE):
+            return node
+
+        node = self.generic_visit(node)
+        if id(node) not in self._sites:
+            return node
+
+        _, mutants = self._sites[id(node)]
+
+        for mutant in mutants:
+            if mutant.fields is None:
+                continue
+            mutant_id = self._add(mutant)
+            for field, value in mutant.fields.items():
+                orelse = getattr(node, field, None)
+                if orelse is None:
+                    orelse = ast.copy_location(
+                        ast.Name(id=_FIELD_DEFAULTS[type(node), field],
+                                 ctx=ast.Load()),
+                        node)
+                setattr(node, field, ast.copy_location(
+                    ast.IfExp(test=_switch(mutant_id, node),
+                              body=value,
+                              orelse=orelse),
+                    node))
+
+        for mutant in mutants:
+            if mutant.fields is not None:
+                continue
+            if isinstance(node, ast.expr) and isinstance(mutant.node, ast.expr):
+                node = ast.copy_location(
+                    ast.IfExp(test=_switch(self._add(mutant), node),
+                              body=mutant.node,
+                              orelse=node),
+                    node)
+            elif isinstance(node, ast.stmt) and isinstance(mutant.node, (ast.stmt, type(None))):
+                body = mutant.node or ast.copy_location(ast.Pass(), node)
+                node = ast.copy_location(
+                    ast.If(test=_switch(self._add(mutant), node),
+                           body=[body],
+                           orelse=[node]),
+                    node)
+
+        return node
+
+
+class Schema:
+    """All of the mutants of a module, compiled into a single code object.
+
+    Args:
+        source_hash: The hash of the source the schema was compiled from.
+        code: The compiled code object.
+        mutants: A dict mapping `(operator-key, occurrence)` to
+            `(mutant-id, line-number, diff)` for each mutant in the schema.
+    """
+
+    def __init__(self, source_hash, code, mutants):
+        self.source_hash = source_hash
+        self.code = code
+        self.mutants = mutants
+
+    def mutant(self, operator, occurrence):
+        """Find a mutant in the schema.
+
+        Args:
+            operator: The operator class which makes the mutant.
+            occurrence: The occurrence of the mutant.
+
+        Returns: A `(mutant-id, line-number, diff)` tuple, or None if the
+            mutant isn't in the schema.
+        """
+        return self.mutants.get((_operator_key(operator), occurrence))
+
+    def save(self, path):
+        "Write the schema to the file `path`."
+        with open(path, mode='wb') as handle:
+            marshal.dump((self.source_hash, self.code, self.mutants), handle)
+
+    @classmethod
+    def load(cls, path):
+        "Read a schema written by `save()`."
+        with open(path, mode='rb') as handle:
+            return cls(*marshal.load(handle))
+
+
+def build_schema(module_ast, filename, operators):
+    """Build the schema for a module.
+
+    Note that this modifies `module_ast`.
+
+    Args:
+        module_ast: The AST of the module.
+        filename: The name of the module's source file.
+        operators: A sequence of operator plugin names.
+
+    Returns: A `Schema`.
+
+    Raises:
+        SyntaxError, ValueError: If the schema can't be compiled.
+    """
+    sites = {}
+    op_classes = [get_operator(name) for name in operators]
+    dispatch(module_ast,
+             [op_class(_SchemaCore(_operator_key(op_class), filename, sites))
+              for op_class in op_classes])
+
+    transformer = _SchemaTransformer(sites)
+    module_ast = ast.fix_missing_locations(transformer.visit(module_ast))
+    with warnings.catch_warnings():
+        # Mutants often compare with literals using `is`, etc.
+        warnings.simplefilter('ignore', SyntaxWarning)
+        code = compile(module_ast, filename, 'exec')
+    return Schema(get_source_hash(filename), code, transformer.mutants)
+
+
+def get_schemata_dir(config):
+    """The directory in which the schemata for a session are stored.
+
+    Returns: The directory, or None if the `mutation-backend` in `config`
+        isn't "schemata".
+    """
+    if config.get('mutation-backend', default='ast') != 'schemata':
+        return None
+    return os.path.join(get_cache_dir(config), 'schemata')
+
+
+def schema_path(schemata_dir, module_name):
+    "The path of the file in which the schema for a module is stored."
+    return os.path.join(
+        schemata_dir,
+        '{}.{}.schema'.format(module_name, sys.implementation.cache_tag))
+
+
+def write_schema(schemata_dir, module_name, module_ast, filename, operators):
+    """Build the schema for a module and store it in `schemata_dir`.
+
+    If the schema can't be compiled, any existing schema for the module is
+    removed, and workers will mutate its AST instead.
+
+    See `build_schema` for the arguments.
+    """
+    os.makedirs(schemata_dir, exist_ok=True)
+    path = schema_path(schemata_dir, module_name)
+    try:
+        schema = build_schema(module_ast, filename, operators)
+    except (SyntaxError, ValueError) as exc:
+        log.warning('Unable to compile schema for %s: %s', module_name, exc)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return
+
+    log.info('Schema for %s: %s mutants', module_name, len(schema.mutants))
+    schema.save(path)
+
+
+def load_schema(schemata_dir, module_name):
+    """Load the schema for a module.
+
+    Returns: The `Schema`, or None if there's no schema for the module or the
+        module has changed since its schema was written.
+    """
+    path = schema_path(schemata_dir, module_name)
+    if not os.path.exists(path):
+        return None
+
+    schema = Schema.load(path)
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None or not os.path.exists(spec.origin):
+        return None
+
+    if get_source_hash(spec.origin) != schema.source_hash:
+        log.info('Schema for %s is out of date', module_name)
+        return None
+
+    return schema
+
+
+@contextlib.contextmanager
+def using_schema(module_name, schema, mutant_id):
+    """Load `module_name` from `schema` with mutant `mutant_id` active.
+
+    Like `using_ast()`, this doesn't adjust `sys.modules`.
+    """
+    setattr(builtins, _SWITCH, mutant_id)
+    try:
+        with using_code(module_name, schema.code):
+            yield
+    finally:
+        delattr(builtins, _SWITCH)
@@ -48,6 +48,10 @@ class TestRunner(metaclass=abc.ABCMeta):
 
     def __init__(self, test_args):
         self._test_args = test_args
+        self._test_ids = None
+        self._priorities = {}
+        self._listener = None
+        self._killing_test = None
 
     @property
     def test_args(self):
@@ -58,6 +62,59 @@ class TestRunner(metaclass=abc.ABCMeta):
         """
         return self._test_args
 
+    @property
+    def test_ids(self):
+        """The IDs of the tests to run, or `None` to run all of the tests.
+
+        Implementations of `_run()` which can select individual tests should
+        only run these tests. The IDs are the same ones which the
+        implementation reports to `_test_started()`.
+        """
+        return self._test_ids
+
+    @property
+    def priority_tests(self):
+        """The IDs of tests to run before any others, in order.
+
+        These are the tests which are most likely to kill the mutant being
+        tested. Implementations of `_run()` which can reorder tests should run
+        these first, in this order, and then the remaining tests in their
+        usual order.
+        """
+        return tuple(self._priorities)
+
+    def _test_started(self, test_id):
+        """Report that the test `test_id` is about to run.
+
+        Implementations of `_run()` should call this (and `_test_finished()`)
+        for each test they run if they can. This is what lets Cosmic Ray work
+        out which tests cover which lines of code.
+        """
+        if self._listener is not None:
+            self._listener.test_started(test_id)
+
+    def _test_finished(self, test_id):
+        "Report that the test `test_id` has finished."
+        if self._listener is not None:
+            self._listener.test_finished(test_id)
+
+    def _test_failed(self, test_id):
+        """Report that the test `test_id` failed (or raised an error).
+
+        The first test reported like this is recorded as the test which killed
+        the mutant.
+        """
+        if self._killing_test is None:
+            self._killing_test = test_id
+
+    def _sort_key(self, test_id):
+        """A key for sorting tests so that the `priority_tests` come first.
+
+        Sorting with this key is stable for the tests which aren't prioritized,
+        so they keep their usual order.
+        """
+        return self._priorities.get(test_id, len(self._priorities))
+
     @abc.abstractmethod
     def _run(self):
         """Run all of the tests and return the results.
@@ -69,12 +126,29 @@ class TestRunner(metaclass=abc.ABCMeta):
         """
         pass
 
-    def __call__(self):
+    def __call__(self, test_ids=None, listener=None, priority_tests=None):
         """Call `_run()` and return a `WorkItem` with the results.
 
+        Args:
+            test_ids: The IDs of the tests to run, or `None` to run all of the
+                tests. Test runners which can't select tests run all of them.
+            listener: An optional object whose `test_started(test_id)` and
+                `test_finished(test_id)` methods are called around each test,
+                for test runners which support it.
+            priority_tests: An optional sequence of the IDs of tests to run
+                before any others, for test runners which support it.
+
         Returns: A `WorkItem` with the `test_outcome` and `data` fields
-            filled in.
+            filled in. If the tests failed, `killing_test` is the ID of the
+            first failing test (if the test runner reports it).
         """
+        self._test_ids = None if test_ids is None else frozenset(test_ids)
+        # Maps each priority test to its position in the running order.
+        self._priorities = {}
+        for test_id in priority_tests or ():
+            self._priorities.setdefault(test_id, len(self._priorities))
+        self._listener = listener
+        self._killing_test = None
         try:
             test_result = self._run()
             if test_result[0]:
@@ -83,8 +157,13 @@ class TestRunner(metaclass=abc.ABCMeta):
                     data=test_result[1])
             return WorkItem(
                 test_outcome=TestOutcome.KILLED,
-                data=test_result[1])
+                data=test_result[1],
+                killing_test=self._killing_test)
         except Exception:  # pylint: disable=broad-except
             return WorkItem(
                 test_outcome=TestOutcome.INCOMPETENT,
                 data=traceback.format_exception(*sys.exc_info()))
+        finally:
+            self._test_ids = None
+            self._priorities = {}
+            self._listener = None
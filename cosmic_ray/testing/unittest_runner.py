@@ -6,6 +6,56 @@ from itertools import chain
 from .test_runner import TestRunner
 
 
+class _ReportingResult(unittest.TestResult):
+    "A TestResult which reports the start and end of each test to a runner."
+    def __init__(self, test_runner):
+        super().__init__()
+        self._test_runner = test_runner
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._test_runner._test_started(test.id())  # pylint: disable=protected-access
+
+    def stopTest(self, test):
+        self._test_runner._test_finished(test.id())  # pylint: disable=protected-access
+        super().stopTest(test)
+
+    def addError(self, test, err):
+        self._test_runner._test_failed(test.id())  # pylint: disable=protected-access
+        super().addError(test, err)
+
+    def addFailure(self, test, err):
+        self._test_runner._test_failed(test.id())  # pylint: disable=protected-access
+        super().addFailure(test, err)
+
+
+def _iter_tests(suite):
+    "Generate the individual tests in a (possibly nested) test suite."
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_tests(test)
+        else:
+            yield test
+
+
+def _select_tests(suite, test_ids):
+    """Build a suite of the tests in `suite` whose IDs are in `test_ids`.
+
+    Placeholder tests reporting errors from discovery (e.g. a test module which
+    fails to import) are always selected.
+    """
+    failed_test = getattr(unittest.loader, '_FailedTest', ())
+    return unittest.TestSuite(
+        test for test in _iter_tests(suite)
+        if test.id() in test_ids or isinstance(test, failed_test))
+
+
+def _sort_tests(suite, key):
+    "Build a suite of the tests in `suite`, sorted by their IDs with `key`."
+    return unittest.TestSuite(
+        sorted(_iter_tests(suite), key=lambda test: key(test.id())))
+
+
 class UnittestRunner(TestRunner):
     """A TestRunner using `unittest`'s discovery mechanisms.
 
@@ -14,11 +64,17 @@ class UnittestRunner(TestRunner):
 
     All elements in `test_args` after the first are ignored.
 
+    Tests are identified by their `unittest.TestCase.id()`.
     """
 
     def _run(self):
         suite = unittest.TestLoader().discover(self.test_args)
-        result = unittest.TestResult()
+        if self.test_ids is not None:
+            suite = _select_tests(suite, self.test_ids)
+        if self.priority_tests:
+            suite = _sort_tests(suite, self._sort_key)
+
+        result = _ReportingResult(self)
         result.failfast = True
         suite.run(result)
 
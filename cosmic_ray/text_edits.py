@@ -0,0 +1,460 @@
+"""Mutants as minimal edits of a module's source text.
+
+With the text mutation backend, `init` finds each mutant as a small edit of
+the module's source, e.g. replacing the `+` in `x = a + b` with `-`. The
+mutated node is unparsed and spliced over the original node's text (found from
+its `lineno`/`col_offset` and end positions), and the edit is then trimmed to
+the tokens which actually differ, so the rest of the module keeps its original
+text. An edit is only kept if the edited statement parses to exactly the AST
+the operator produces; otherwise workers mutate the AST as usual.
+
+Workers then just apply the edit to the source and compile it. Since the edit
+and the hash of the original source identify the mutant, the compiled code is
+cached under a key derived from them, and reports can show the exact diff of
+the source lines which the mutant changes.
+"""
+
+import ast
+import copy
+import hashlib
+import io
+import logging
+import marshal
+import os
+import sys
+import tokenize
+import warnings
+
+import astunparse
+
+from .config import get_cache_dir
+from .mutating import MutatingCore
+
+log = logging.getLogger()
+
+# Tokens which don't matter when comparing the original and mutated text.
+_IGNORED_TOKENS = frozenset((tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+                             tokenize.INDENT, tokenize.DEDENT,
+                             tokenize.ENDMARKER))
+
+
+def get_text_edits_dir(config):
+    """The directory in which the compiled mutants for a session are cached.
+
+    Returns: The directory, or None if the `mutation-backend` in `config`
+        isn't "text".
+    """
+    if config.get('mutation-backend', default='ast') != 'text':
+        return None
+    return os.path.join(get_cache_dir(config), 'text-edits')
+
+
+def decode_source(data):
+    """Decode the contents of a source file, as `tokenize.open()` would.
+
+    The offsets in text edits are of characters in the decoded source.
+    """
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    return io.TextIOWrapper(io.BytesIO(data), encoding).read()
+
+
+def apply_edit(source, text_edit):
+    "Apply `text_edit` to `source`, returning the mutated source."
+    return (source[:text_edit['start']] +
+            text_edit['replacement'] +
+            source[text_edit['end']:])
+
+
+def edit_diff(source, text_edit, filename):
+    """The unified diff of the lines of `source` changed by `text_edit`.
+
+    Returns: A list of lines.
+    """
+    start, end = text_edit['start'], text_edit['end']
+    first = source.rfind('\n', 0, start) + 1
+    last = source.find('\n', end)
+    if last == -1:
+        last = len(source)
+
+    original = source[first:last].split('\n')
+    mutant = (source[first:start] + text_edit['replacement'] +
+              source[end:last]).split('\n')
+    line = source.count('\n', 0, first) + 1
+    return [
+        '--- a' + filename,
+        '+++ b' + filename,
+        '@@ -{},{} +{},{} @@'.format(line, len(original), line, len(mutant)),
+    ] + ['-' + text for text in original] + ['+' + text for text in mutant]
+
+
+def _line_starts(source):
+    "The offset in `source` of the start of each line."
+    starts = [0]
+    for line in source.splitlines(keepends=True):
+        starts.append(starts[-1] + len(line))
+    return starts
+
+
+def _offset(source, line_starts, lineno, col_offset):
+    """The offset in `source` of a position in the AST.
+
+    `col_offset` counts UTF-8 bytes, which needn't be the same as characters.
+    """
+    start = line_starts[lineno - 1]
+    line = source[start:line_starts[lineno]].encode('utf-8')
+    return start + len(line[:col_offset].decode('utf-8'))
+
+
+def _span(source, line_starts, node):
+    """The `(start, end)` offsets of the text of `node` in `source`, or None if
+    the node doesn't have a location.
+
+    The span of a decorated definition includes its decorators.
+    """
+    if getattr(node, 'end_lineno', None) is None:
+        return None
+
+    lineno = node.lineno
+    decorators = getattr(node, 'decorator_list', None)
+    if decorators:
+        lineno = decorators[0].lineno
+
+    return (_offset(source, line_starts, lineno, node.col_offset),
+            _offset(source, line_starts, node.end_lineno, node.end_col_offset))
+
+
+def _unparse(node):
+    "Unparse `node`, with as few parentheses as possible."
+    if hasattr(ast, 'unparse'):
+        return ast.unparse(node)
+    return astunparse.unparse(node).strip('\n')
+
+
+def _replacements(node, indent):
+    """The candidate texts for `node`, to replace a node whose text starts
+    at column `indent`.
+
+    Depending on where it is, an expression may or may not need to be in
+    parentheses, so it's tried both ways.
+    """
+    text = _unparse(node).replace('\n', '\n' + ' ' * indent)
+    if not isinstance(node, ast.expr):
+        yield text
+    elif text.startswith('(') and text.endswith(')'):
+        yield text[1:-1]
+        yield text
+    else:
+        yield text
+        yield '(' + text + ')'
+
+
+def _tokens(text, indent):
+    """The significant tokens in `text`, whose first line starts at column
+    `indent`, as `(type, string, start, end)` tuples with offsets into `text`.
+
+    Returns: The list of tokens, or None if `text` can't be tokenized.
+    """
+    padded = ' ' * indent + text
+    line_starts = _line_starts(padded)
+    try:
+        tokens = [
+            (token.type, token.string,
+             line_starts[token.start[0] - 1] + token.start[1] - indent,
+             line_starts[token.end[0] - 1] + token.end[1] - indent)
+            for token in tokenize.generate_tokens(io.StringIO(padded).readline)
+            if token.type not in _IGNORED_TOKENS
+        ]
+    except (tokenize.TokenError, SyntaxError):
+        return None
+    return tokens
+
+
+def _same_token(first, second):
+    "Determine if two tokens have the same meaning."
+    if first[0] != second[0]:
+        return False
+    if first[1] == second[1]:
+        return True
+    if first[0] not in (tokenize.NUMBER, tokenize.STRING):
+        return False
+    try:
+        first_value = ast.literal_eval(first[1])
+        second_value = ast.literal_eval(second[1])
+    except (SyntaxError, ValueError):
+        return False
+    return (type(first_value) is type(second_value) and
+            repr(first_value) == repr(second_value))
+
+
+def _trimmed_edits(source, start, end, text, indent):
+    """Generate edits which replace only the tokens in `source[start:end]`
+    which differ from those in `text`.
+
+    The first edit replaces just the differing tokens, and the second also
+    replaces the whitespace around them. Nothing is generated if either text
+    can't be tokenized.
+    """
+    old = _tokens(source[start:end], indent)
+    new = _tokens(text, indent)
+    if old is None or new is None:
+        return
+
+    prefix = 0
+    while (prefix < min(len(old), len(new)) and
+           _same_token(old[prefix], new[prefix])):
+        prefix += 1
+
+    suffix = 0
+    while (suffix < min(len(old), len(new)) - prefix and
+           _same_token(old[-1 - suffix], new[-1 - suffix])):
+        suffix += 1
+
+    def region(tokens, length, tight):
+        lower = tokens[prefix - 1][3] if prefix else 0
+        upper = tokens[len(tokens) - suffix][2] if suffix else length
+        if tight and prefix < len(tokens) - suffix:
+            lower = tokens[prefix][2]
+            upper = tokens[len(tokens) - suffix - 1][3]
+        return lower, upper
+
+    for tight in (True, False):
+        old_lower, old_upper = region(old, end - start, tight)
+        new_lower, new_upper = region(new, len(text), tight)
+        yield (start + old_lower, start + old_upper,
+               text[new_lower:new_upper])
+
+
+def _parses_to(text, prefix, filename, expected):
+    """Determine if the statement in `text` parses to a statement whose dump is
+    `expected`.
+
+    `prefix` is the text before the statement on its first line. If there is
+    any, the statement is parsed as the body of an `if`, so that it can be
+    indented. The `If` node of an `elif` is parsed as an `if`.
+    """
+    if text.startswith('elif'):
+        text = text[2:]
+    if prefix:
+        if not prefix.isspace():
+            prefix = ' ' * len(prefix)
+        text = 'if 1:\n' + prefix + text
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', SyntaxWarning)
+            body = ast.parse(text, filename).body
+    except (SyntaxError, ValueError):
+        return False
+    if prefix and len(body) == 1:
+        body = body[0].body
+    return len(body) == 1 and ast.dump(body[0]) == expected
+
+
+def _node_at(tree, path):
+    """The parent of the node at `path` in `tree`, the node itself, and the
+    innermost statement which contains it (which may be the node).
+    """
+    parent = None
+    node = tree
+    statement = None
+    for step in path:
+        parent = node
+        node = node[step] if isinstance(step, int) else getattr(node, step)
+        if isinstance(node, ast.stmt):
+            statement = node
+    return parent, node, statement
+
+
+def _narrow(node, mutated):
+    """Find the smallest part of `node` which differs from `mutated`.
+
+    While the only difference between the nodes is in one of their child
+    nodes, the search moves on to that child, as long as it has a location.
+
+    Returns: A tuple of the original and mutated versions of the part.
+    """
+    while type(node) is type(mutated):
+        children = []
+        for field, value in ast.iter_fields(node):
+            other = getattr(mutated, field, None)
+            if isinstance(value, list) and isinstance(other, list) and \
+                    len(value) == len(other):
+                children.extend(zip(value, other))
+            else:
+                children.append((value, other))
+
+        differences = [
+            (child, other) for child, other in children
+            if not (isinstance(child, ast.AST) and isinstance(other, ast.AST)
+                    and ast.dump(child) == ast.dump(other))
+            and child != other
+        ]
+        if len(differences) != 1:
+            break
+
+        child, other = differences[0]
+        if not (isinstance(child, ast.AST) and isinstance(other, ast.AST)) or \
+                getattr(child, 'end_lineno', None) is None:
+            break
+
+        node, mutated = child, other
+
+    return node, mutated
+
+
+def _find_edit(source, line_starts, filename, tree, operator, work_item):
+    """Find the text edit which makes the mutant described by `work_item`.
+
+    Returns: A tuple `(start, end, replacement)`, or None if there's no edit
+        which produces exactly the mutated AST.
+    """
+    path = tuple(work_item.node_path['path'])
+    if not path:
+        return None
+
+    parent, node, statement = _node_at(tree, path)
+    span = _span(source, line_starts, node)
+    if span is None:
+        return None
+
+    # Mutate a copy of just the node, wrapped in a module so that the
+    # operator can replace it. Edits can't remove or add nodes.
+    wrapper = ast.Module(body=[copy.deepcopy(node)], type_ignores=[])
+    core = MutatingCore(work_item.occurrence)
+    core.visit_path(wrapper, ('body', 0), work_item.node_path['index'],
+                    operator(core))
+    if not core.activation_record or len(wrapper.body) != 1:
+        return None
+
+    # Edits are checked by parsing just the statement containing the node, so
+    # the cost of each check doesn't grow with the size of the module. The
+    # dump of the mutated statement is found by temporarily putting the
+    # mutated node in place of the original.
+    step = path[-1]
+    if isinstance(step, int):
+        parent[step] = wrapper.body[0]
+    else:
+        setattr(parent, step, wrapper.body[0])
+    try:
+        expected = ast.dump(
+            wrapper.body[0] if statement is node else statement)
+    finally:
+        if isinstance(step, int):
+            parent[step] = node
+        else:
+            setattr(parent, step, node)
+
+    statement_start, statement_end = _span(source, line_starts, statement)
+    prefix = source[line_starts[source.count('\n', 0, statement_start)]:
+                    statement_start]
+
+    node, mutated = _narrow(node, wrapper.body[0])
+    start, end = _span(source, line_starts, node)
+    indent = start - line_starts[source.count('\n', 0, start)]
+    for text in _replacements(mutated, indent):
+        candidates = list(_trimmed_edits(source, start, end, text, indent))
+        candidates.append((start, end, text))
+        for edit in candidates:
+            mutant = (source[statement_start:edit[0]] + edit[2] +
+                      source[edit[1]:statement_end])
+            if _parses_to(mutant, prefix, filename, expected):
+                return edit
+
+    return None
+
+
+def find_text_edits(filename, work_items, operators):
+    """Find the text edit for each of `work_items`, which are mutants of the
+    module in `filename`.
+
+    The `text_edit` of each WorkItem for which an edit is found is set to a
+    dict with the `start` and `end` offsets of the replaced text, its
+    `replacement` and the `source_hash` of the module. WorkItems need a
+    `node_path` to have an edit.
+
+    Args:
+        filename: The source file of the module.
+        work_items: The WorkItems for the module.
+        operators: A mapping from operator names to operator classes.
+    """
+    with open(filename, mode='rb') as handle:
+        data = handle.read()
+
+    source_hash = hashlib.sha256(data).hexdigest()
+    source = decode_source(data)
+    line_starts = _line_starts(source)
+    tree = ast.parse(source, filename)
+
+    found = 0
+    for item in work_items:
+        if item.node_path is None or \
+                item.node_path['source_hash'] != source_hash:
+            continue
+
+        edit = _find_edit(source, line_starts, filename, tree,
+                          operators[item.operator], item)
+        if edit is None:
+            continue
+
+        start, end, replacement = edit
+        item.text_edit = {
+            'start': start,
+            'end': end,
+            'replacement': replacement,
+            'source_hash': source_hash,
+        }
+        found += 1
+
+    log.info('Text edits for %s: %s of %s mutants',
+             filename, found, len(work_items))
+
+
+def _code_path(text_edits_dir, filename, text_edit):
+    "The path of the cached code for the mutant made by `text_edit`."
+    key = hashlib.sha256(repr((
+        filename,
+        text_edit['source_hash'],
+        text_edit['start'],
+        text_edit['end'],
+        text_edit['replacement'],
+    )).encode('utf-8')).hexdigest()
+    return os.path.join(
+        text_edits_dir,
+        '{}.{}.code'.format(key, sys.implementation.cache_tag))
+
+
+def load_mutant_code(text_edits_dir, filename, text_edit):
+    """Get the compiled code of the mutant made by applying `text_edit` to the
+    module in `filename`.
+
+    The code is compiled from the edited source the first time it's needed,
+    and cached in `text_edits_dir` after that.
+
+    Returns: The code object, or None if the module has changed since the edit
+        was found.
+    """
+    with open(filename, mode='rb') as handle:
+        data = handle.read()
+    if hashlib.sha256(data).hexdigest() != text_edit['source_hash']:
+        return None
+
+    path = _code_path(text_edits_dir, filename, text_edit)
+    try:
+        with open(path, mode='rb') as handle:
+            return marshal.load(handle)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    with warnings.catch_warnings():
+        # Mutants often compare with literals using `is`, etc.
+        warnings.simplefilter('ignore', SyntaxWarning)
+        code = compile(apply_edit(decode_source(data), text_edit),
+                       filename, 'exec', dont_inherit=True)
+
+    # Workers may be compiling the same mutant concurrently, so the cache file
+    # is only replaced once it's complete.
+    os.makedirs(text_edits_dir, exist_ok=True)
+    partial = '{}.{}'.format(path, os.getpid())
+    with open(partial, mode='wb') as handle:
+        marshal.dump(code, handle)
+    os.replace(partial, path)
+    return code
@@ -5,6 +5,7 @@ generic functionality.
 """
 
 import datetime
+import time
 
 
 class Timer:
@@ -40,3 +41,45 @@ class Timer:
 
     def __exit__(self, ex_type, ex_value, ex_traceback):
         pass
+
+
+class TestTimer:
+    """A test runner listener which records how long each test takes.
+
+    Pass it as the `listener` to a `TestRunner`::
+
+        timer = TestTimer()
+        test_runner(listener=timer)
+        print(timer.durations)
+
+    Args:
+        listener: Another listener to pass each test's start and finish on
+            to, or None.
+    """
+
+    def __init__(self, listener=None):
+        self._listener = listener
+        self._started = {}
+        self._durations = {}
+
+    @property
+    def durations(self):
+        """A dict mapping the ID of each test which has finished to its
+        duration, in seconds.
+        """
+        return self._durations
+
+    def test_started(self, test_id):
+        "Called by the test runner as each test starts."
+        if self._listener is not None:
+            self._listener.test_started(test_id)
+        self._started[test_id] = time.perf_counter()
+
+    def test_finished(self, test_id):
+        "Called by the test runner as each test finishes."
+        started = self._started.pop(test_id, None)
+        if started is not None:
+            self._durations[test_id] = (self._durations.get(test_id, 0)
+                                        + time.perf_counter() - started)
+        if self._listener is not None:
+            self._listener.test_finished(test_id)
@@ -1,8 +1,11 @@
 """Implementation of the WorkDB."""
 
+import abc
 import contextlib
 from io import StringIO
+import json
 import os
+import sqlite3
 from enum import Enum
 
 # This db may well not scale very well. We need to be ready to switch it out
@@ -14,12 +17,19 @@ from .config import Config
 from .work_item import WorkItem
 
 
-class WorkDB:
+# How many lines either side of a mutation we look at for kill history.
+_KILL_HISTORY_NEIGHBOURHOOD = 10
+
+
+class WorkDB(metaclass=abc.ABCMeta):
     """WorkDB is the database that keeps track of mutation testing work progress.
 
     Essentially, there's a row in the DB for each mutation that needs to be
     executed in some run. These initially start off with no results, and
     results are added as they're completed.
+
+    This is the interface shared by the storage backends. Use `use_db()` to
+    open a session; it picks the backend based on the file extension.
     """
     class Mode(Enum):
         "Modes in which a WorkDB may be opened."
@@ -47,11 +57,10 @@ class WorkDB:
                 'Requested file {} not found'.format(path))
 
         self._path = path
-        self._db = tinydb.TinyDB(path)
 
+    @abc.abstractmethod
     def close(self):
         """Close the database."""
-        self._db.close()
 
     @property
     def name(self):
@@ -61,6 +70,258 @@ class WorkDB:
         """
         return self._path
 
+    @abc.abstractmethod
+    def set_config(self, config, timeout):
+        """Set (replace) the configuration for the session.
+
+        Args:
+          config: Configuration object
+          timeout: The timeout for tests.
+        """
+
+    @abc.abstractmethod
+    def get_config(self):
+        """Get the work parameters (if set) for the session.
+
+        Returns: a tuple of `(config, timeout)`.
+
+        Raises:
+          ValueError: If is no config set for the session.
+        """
+
+    @abc.abstractmethod
+    def add_work_items(self, work_items):
+        """Add a sequence of WorkItems.
+
+        Args:
+          work_items: An iterable of WorkItems.
+        """
+
+    @abc.abstractmethod
+    def clear_work_items(self, modules=None):
+        """Clear work items from the session.
+
+        This removes any associated results as well.
+
+        Args:
+          modules: The names of the modules whose work items should be
+            removed, or None to remove all work items.
+        """
+
+    @property
+    @abc.abstractmethod
+    def work_items(self):
+        """The sequence of WorkItems in the session.
+
+        This include both complete and incomplete items.
+
+        Each work item is a dict with the keys `module-name`, `op-name`, and
+        `occurrence`. Items with results will also have the keys `results-type`
+        and `results-data`.
+        """
+
+    @property
+    @abc.abstractmethod
+    def num_work_items(self):
+        """The number of WorkItems."""
+
+    @abc.abstractmethod
+    def update_work_item(self, work_item):
+        """Updates an existing WorkItem by job_id.
+
+        Args:
+            work_item: A WorkItem representing the new state of a job.
+
+        Raises:
+            KeyError: If there is no existing record with the same job_id.
+        """
+
+    @abc.abstractmethod
+    def update_work_items(self, work_items):
+        """Update several existing WorkItems by job_id.
+
+        This is equivalent to calling `update_work_item()` for each WorkItem,
+        but backends can do it much more efficiently.
+
+        Args:
+            work_items: An iterable of WorkItems representing the new states
+                of their jobs.
+
+        Raises:
+            KeyError: If there is no existing record for one of the job_ids.
+        """
+
+    @property
+    @abc.abstractmethod
+    def pending_work_items(self):
+        """The sequence of pending WorkItems in the session."""
+
+    @property
+    @abc.abstractmethod
+    def num_pending_work_items(self):
+        """The number of pending WorkItems in the session."""
+
+    @property
+    @abc.abstractmethod
+    def module_hashes(self):
+        """The hashes of the sources of the modules in the session.
+
+        A dict mapping module names to hashes, as recorded by
+        `set_module_hashes()`.
+        """
+
+    @abc.abstractmethod
+    def set_module_hashes(self, module_hashes):
+        """Set (replace) the hashes of the sources of the modules in the session.
+
+        Args:
+          module_hashes: A dict mapping module names to hashes.
+        """
+
+    @abc.abstractmethod
+    def set_coverage(self, coverage):
+        """Set (replace) the test coverage for the session.
+
+        Args:
+          coverage: A dict mapping `(filename, line_number)` to the set of IDs
+            of the tests which execute that line. A test ID of `None` means
+            the line is executed outside of any test. See
+            `cosmic_ray.coverage.CoverageCollector`.
+        """
+
+    @abc.abstractmethod
+    def clear_coverage(self):
+        """Remove all test coverage from the session."""
+
+    @property
+    @abc.abstractmethod
+    def coverage(self):
+        """The test coverage for the session.
+
+        This is a dict in the same form as passed to `set_coverage()`.
+        """
+
+    @abc.abstractmethod
+    def set_test_durations(self, durations):
+        """Set (replace) the durations of the tests in the baseline run.
+
+        Args:
+          durations: A dict mapping test IDs to durations in seconds. See
+            `cosmic_ray.timing.TestTimer`.
+        """
+
+    @property
+    @abc.abstractmethod
+    def test_durations(self):
+        """The durations of the tests in the baseline run.
+
+        This is a dict in the same form as passed to `set_test_durations()`.
+        """
+
+    @abc.abstractmethod
+    def set_test_overhead(self, overhead):
+        """Set (replace) the overhead of the baseline run.
+
+        Args:
+          overhead: The time in seconds which the baseline run took beyond the
+            durations of its tests, e.g. to start up and import the tests.
+        """
+
+    @property
+    @abc.abstractmethod
+    def test_overhead(self):
+        """The overhead of the baseline run in seconds, or 0 if it isn't known.
+        """
+
+    @abc.abstractmethod
+    def add_kills(self, kills):
+        """Record tests which killed mutants.
+
+        The kill history is kept for the lifetime of the session. Unlike the
+        WorkItems, it isn't cleared when the session is re-initialized.
+
+        Args:
+          kills: An iterable of `(module, operator, line_number, test_id)`
+            tuples, each recording that the test `test_id` killed a mutant
+            produced by `operator` at `line_number` in `module`.
+        """
+
+    @property
+    @abc.abstractmethod
+    def kills(self):
+        """The kill history of the session.
+
+        A list of `(module, operator, line_number, test_id)` tuples as passed
+        to `add_kills()`.
+        """
+
+    @abc.abstractmethod
+    def _kills_near(self, module, first_line, last_line):
+        """The kills in `module` between two lines (inclusive).
+
+        Returns: An iterable of `(operator, line_number, test_id)` tuples.
+        """
+
+    def likely_killers(self, module, operator, line_number):
+        """Find the tests most likely to kill a mutant, based on kill history.
+
+        Each test is scored by the kills it has made nearby in the same module.
+        Kills on the same line count most, and each kill counts double if it
+        was of a mutant produced by the same operator.
+
+        Args:
+          module: The name of the mutated module.
+          operator: The name of the operator producing the mutant.
+          line_number: The line number of the mutation.
+
+        Returns: A list of test IDs, most likely killer first.
+        """
+        scores = {}
+        for kill_operator, kill_line, test_id in self._kills_near(
+                module,
+                line_number - _KILL_HISTORY_NEIGHBOURHOOD,
+                line_number + _KILL_HISTORY_NEIGHBOURHOOD):
+            score = 1 / (1 + abs(kill_line - line_number))
+            if kill_operator == operator:
+                score *= 2
+            scores[test_id] = scores.get(test_id, 0) + score
+
+        return sorted(scores, key=lambda test_id: (-scores[test_id], test_id))
+
+    @property
+    @abc.abstractmethod
+    def has_coverage(self):
+        """Whether test coverage has been recorded for the session."""
+
+    @abc.abstractmethod
+    def covering_tests(self, filename, line_number):
+        """Find the tests which execute a line of code.
+
+        Args:
+          filename: The name of the source file.
+          line_number: The line number in `filename`.
+
+        Returns: A set of test IDs, or `None` if the line can be affected by
+          code outside of any test (or no coverage has been recorded), in
+          which case all tests should be run. The set is empty if no test
+          executes the line.
+        """
+
+
+class TinyWorkDB(WorkDB):
+    """A WorkDB stored as JSON using TinyDB.
+
+    This is the original session format. It's convenient to inspect, but every
+    write re-serializes the entire file, so it gets slow for large sessions.
+    """
+
+    def __init__(self, path, mode):
+        super().__init__(path, mode)
+        self._db = tinydb.TinyDB(path)
+
+    def close(self):
+        self._db.close()
+
     @property
     def _config(self):
         """The table of work parameters."""
@@ -84,12 +345,6 @@ class WorkDB:
         return pending
 
     def set_config(self, config, timeout):
-        """Set (replace) the configuration for the session.
-
-        Args:
-          config: Configuration object
-          timeout: The timeout for tests.
-        """
         table = self._config
         table.purge()
         table.insert({
@@ -98,13 +353,6 @@ class WorkDB:
         })
 
     def get_config(self):
-        """Get the work parameters (if set) for the session.
-
-        Returns: a tuple of `(config, timeout)`.
-
-        Raises:
-          ValueError: If is no config set for the session.
-        """
         table = self._config
 
         try:
@@ -116,61 +364,423 @@ class WorkDB:
                 record['timeout'])
 
     def add_work_items(self, work_items):
-        """Add a sequence of WorkItems.
-
-        Args:
-          work_items: An iterable of WorkItems.
-        """
         self._work_items.insert_multiple(work_item.as_dict() for work_item in work_items)
 
-    def clear_work_items(self):
-        """Clear all work items from the session.
-
-        This removes any associated results as well.
-        """
-        self._work_items.purge()
+    def clear_work_items(self, modules=None):
+        if modules is None:
+            self._work_items.purge()
+        else:
+            modules = set(modules)
+            self._work_items.remove(
+                tinydb.Query().module.test(lambda module: module in modules))
 
     @property
     def work_items(self):
-        """The sequence of WorkItems in the session.
-
-        This include both complete and incomplete items.
-
-        Each work item is a dict with the keys `module-name`, `op-name`, and
-        `occurrence`. Items with results will also have the keys `results-type`
-        and `results-data`.
-        """
         return (WorkItem(vals=r) for r in self._work_items)
 
     @property
     def num_work_items(self):
-        """The number of WorkItems."""
         return len(self._work_items)
 
     def update_work_item(self, work_item):
-        """Updates an existing WorkItem by job_id.
-
-        Args:
-            work_item: A WorkItem representing the new state of a job.
-
-        Raises:
-            KeyError: If there is no existing record with the same job_id.
-        """
-        self._work_items.update(
+        updated = self._work_items.update(
             work_item.as_dict(),
             tinydb.Query().job_id == work_item.job_id
         )
+        if not updated:
+            raise KeyError('No work item with job_id {}'.format(work_item.job_id))
+
+    def update_work_items(self, work_items):
+        updates = {item.job_id: item.as_dict() for item in work_items}
+        updated = self._work_items.update(
+            lambda record: record.update(updates[record['job_id']]),
+            tinydb.Query().job_id.test(lambda job_id: job_id in updates))
+        if len(updated) != len(updates):
+            raise KeyError('No work items with some of job_ids {}'.format(
+                sorted(updates)))
 
     @property
     def pending_work_items(self):
-        """The sequence of pending WorkItems in the session."""
         return (WorkItem(vals=r) for r in self._pending)
 
     @property
     def num_pending_work_items(self):
-        """The number of pending WorkItems in the session."""
         return len(self._pending)
 
+    @property
+    def _module_hashes(self):
+        """The table of module source hashes."""
+        return self._db.table('module-hashes')
+
+    @property
+    def module_hashes(self):
+        return {r['module']: r['hash'] for r in self._module_hashes}
+
+    def set_module_hashes(self, module_hashes):
+        table = self._module_hashes
+        table.purge()
+        table.insert_multiple(
+            {'module': module, 'hash': module_hash}
+            for module, module_hash in module_hashes.items())
+
+    @property
+    def _coverage(self):
+        """The table of test coverage, with one record per line."""
+        return self._db.table('coverage')
+
+    def set_coverage(self, coverage):
+        table = self._coverage
+        table.purge()
+        table.insert_multiple(
+            {
+                'filename': filename,
+                'line_number': line_number,
+                'test_ids': None if None in test_ids else sorted(test_ids),
+            }
+            for (filename, line_number), test_ids in coverage.items())
+
+    def clear_coverage(self):
+        self._coverage.purge()
+
+    @property
+    def coverage(self):
+        return {
+            (r['filename'], r['line_number']):
+            {None} if r['test_ids'] is None else set(r['test_ids'])
+            for r in self._coverage
+        }
+
+    @property
+    def has_coverage(self):
+        return len(self._coverage) > 0
+
+    @property
+    def _test_durations(self):
+        """The table of test durations."""
+        return self._db.table('test-durations')
+
+    def set_test_durations(self, durations):
+        table = self._test_durations
+        table.purge()
+        table.insert_multiple(
+            {'test_id': test_id, 'duration': duration}
+            for test_id, duration in durations.items())
+
+    @property
+    def test_durations(self):
+        return {r['test_id']: r['duration'] for r in self._test_durations}
+
+    @property
+    def _test_overhead(self):
+        """The table containing the overhead of the baseline run."""
+        return self._db.table('test-overhead')
+
+    def set_test_overhead(self, overhead):
+        table = self._test_overhead
+        table.purge()
+        table.insert({'overhead': overhead})
+
+    @property
+    def test_overhead(self):
+        return next((r['overhead'] for r in self._test_overhead), 0)
+
+    @property
+    def _kills(self):
+        """The table of kill history."""
+        return self._db.table('kills')
+
+    def add_kills(self, kills):
+        self._kills.insert_multiple(
+            {
+                'module': module,
+                'operator': operator,
+                'line_number': line_number,
+                'test_id': test_id,
+            }
+            for module, operator, line_number, test_id in kills)
+
+    @property
+    def kills(self):
+        return [(r['module'], r['operator'], r['line_number'], r['test_id'])
+                for r in self._kills]
+
+    def _kills_near(self, module, first_line, last_line):
+        kill = tinydb.Query()
+        return ((r['operator'], r['line_number'], r['test_id'])
+                for r in self._kills.search(
+                    (kill.module == module) &
+                    (kill.line_number >= first_line) &
+                    (kill.line_number <= last_line)))
+
+    def covering_tests(self, filename, line_number):
+        if not self.has_coverage:
+            return None
+
+        line = tinydb.Query()
+        record = self._coverage.get(
+            (line.filename == os.path.abspath(filename)) &
+            (line.line_number == line_number))
+        if record is None:
+            return set()
+        if record['test_ids'] is None:
+            return None
+        return set(record['test_ids'])
+
+
+class SQLiteWorkDB(WorkDB):
+    """A WorkDB stored in an SQLite database.
+
+    Work items are stored as JSON documents keyed by `job_id`, and the
+    `worker_outcome` is kept in its own indexed column so that finding pending
+    work doesn't require a full scan.
+    """
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS config (config TEXT, timeout REAL)',
+        'CREATE TABLE IF NOT EXISTS work_items ('
+        '    job_id TEXT PRIMARY KEY,'
+        '    worker_outcome TEXT,'
+        '    work_item TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS work_items_worker_outcome'
+        '    ON work_items (worker_outcome)',
+        # A NULL test_id means the line is executed outside of any test.
+        'CREATE TABLE IF NOT EXISTS coverage ('
+        '    filename TEXT NOT NULL,'
+        '    line_number INTEGER NOT NULL,'
+        '    test_id TEXT)',
+        'CREATE INDEX IF NOT EXISTS coverage_line'
+        '    ON coverage (filename, line_number)',
+        'CREATE TABLE IF NOT EXISTS kills ('
+        '    module TEXT NOT NULL,'
+        '    operator TEXT NOT NULL,'
+        '    line_number INTEGER NOT NULL,'
+        '    test_id TEXT NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS kills_line'
+        '    ON kills (module, line_number)',
+        'CREATE TABLE IF NOT EXISTS module_hashes ('
+        '    module TEXT PRIMARY KEY,'
+        '    hash TEXT NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS test_durations ('
+        '    test_id TEXT PRIMARY KEY,'
+        '    duration REAL NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS test_overhead (overhead REAL NOT NULL)',
+    )
+
+    def __init__(self, path, mode):
+        super().__init__(path, mode)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _row(work_item):
+        "The `(job_id, worker_outcome, work_item)` row for a WorkItem."
+        return (work_item.job_id,
+                work_item.worker_outcome,
+                json.dumps(work_item.as_dict()))
+
+    def set_config(self, config, timeout):
+        with self._conn:
+            self._conn.execute('DELETE FROM config')
+            self._conn.execute(
+                'INSERT INTO config (config, timeout) VALUES (?, ?)',
+                (kfg.yaml.serialize_config(config), timeout))
+
+    def get_config(self):
+        record = self._conn.execute(
+            'SELECT config, timeout FROM config').fetchone()
+        if record is None:
+            raise ValueError('work-db has no config')
+
+        return (kfg.yaml.load_config(StringIO(record[0]), config=Config()),
+                record[1])
+
+    def add_work_items(self, work_items):
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO work_items (job_id, worker_outcome, work_item) '
+                'VALUES (?, ?, ?)',
+                (self._row(work_item) for work_item in work_items))
+
+    def clear_work_items(self, modules=None):
+        if modules is None:
+            with self._conn:
+                self._conn.execute('DELETE FROM work_items')
+            return
+
+        modules = set(modules)
+        job_ids = [
+            (job_id,)
+            for job_id, data in self._conn.execute(
+                'SELECT job_id, work_item FROM work_items').fetchall()
+            if json.loads(data)['module'] in modules
+        ]
+        with self._conn:
+            self._conn.executemany(
+                'DELETE FROM work_items WHERE job_id = ?', job_ids)
+
+    @property
+    def work_items(self):
+        cursor = self._conn.execute(
+            'SELECT work_item FROM work_items ORDER BY rowid')
+        return (WorkItem(vals=json.loads(r[0])) for r in cursor)
+
+    @property
+    def num_work_items(self):
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM work_items').fetchone()[0]
+
+    def update_work_item(self, work_item):
+        job_id, worker_outcome, data = self._row(work_item)
+        with self._conn:
+            cursor = self._conn.execute(
+                'UPDATE work_items SET worker_outcome = ?, work_item = ? '
+                'WHERE job_id = ?',
+                (worker_outcome, data, job_id))
+        if cursor.rowcount == 0:
+            raise KeyError('No work item with job_id {}'.format(job_id))
+
+    def update_work_items(self, work_items):
+        rows = [self._row(work_item) for work_item in work_items]
+        with self._conn:
+            cursor = self._conn.executemany(
+                'UPDATE work_items SET worker_outcome = ?, work_item = ? '
+                'WHERE job_id = ?',
+                ((worker_outcome, data, job_id)
+                 for job_id, worker_outcome, data in rows))
+            if cursor.rowcount != len(rows):
+                # Raising here rolls back the whole update.
+                raise KeyError('No work items with some of job_ids {}'.format(
+                    sorted(row[0] for row in rows)))
+
+    @property
+    def pending_work_items(self):
+        # We fetch everything up front. Callers typically update items while
+        # iterating, and that would otherwise modify the index we're scanning.
+        rows = self._conn.execute(
+            'SELECT work_item FROM work_items '
+            'WHERE worker_outcome IS NULL ORDER BY rowid').fetchall()
+        return (WorkItem(vals=json.loads(r[0])) for r in rows)
+
+    @property
+    def num_pending_work_items(self):
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM work_items '
+            'WHERE worker_outcome IS NULL').fetchone()[0]
+
+    @property
+    def module_hashes(self):
+        return dict(self._conn.execute(
+            'SELECT module, hash FROM module_hashes'))
+
+    def set_module_hashes(self, module_hashes):
+        with self._conn:
+            self._conn.execute('DELETE FROM module_hashes')
+            self._conn.executemany(
+                'INSERT INTO module_hashes (module, hash) VALUES (?, ?)',
+                module_hashes.items())
+
+    def set_coverage(self, coverage):
+        with self._conn:
+            self._conn.execute('DELETE FROM coverage')
+            self._conn.executemany(
+                'INSERT INTO coverage (filename, line_number, test_id) '
+                'VALUES (?, ?, ?)',
+                ((filename, line_number, test_id)
+                 for (filename, line_number), test_ids in coverage.items()
+                 for test_id in test_ids))
+
+    def clear_coverage(self):
+        with self._conn:
+            self._conn.execute('DELETE FROM coverage')
+
+    @property
+    def coverage(self):
+        coverage = {}
+        for filename, line_number, test_id in self._conn.execute(
+                'SELECT filename, line_number, test_id FROM coverage'):
+            coverage.setdefault((filename, line_number), set()).add(test_id)
+        return coverage
+
+    @property
+    def has_coverage(self):
+        return self._conn.execute(
+            'SELECT EXISTS (SELECT 1 FROM coverage)').fetchone()[0] == 1
+
+    def set_test_durations(self, durations):
+        with self._conn:
+            self._conn.execute('DELETE FROM test_durations')
+            self._conn.executemany(
+                'INSERT INTO test_durations (test_id, duration) VALUES (?, ?)',
+                durations.items())
+
+    @property
+    def test_durations(self):
+        return dict(self._conn.execute(
+            'SELECT test_id, duration FROM test_durations'))
+
+    def set_test_overhead(self, overhead):
+        with self._conn:
+            self._conn.execute('DELETE FROM test_overhead')
+            self._conn.execute(
+                'INSERT INTO test_overhead (overhead) VALUES (?)', (overhead,))
+
+    @property
+    def test_overhead(self):
+        row = self._conn.execute(
+            'SELECT overhead FROM test_overhead').fetchone()
+        return 0 if row is None else row[0]
+
+    def add_kills(self, kills):
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO kills (module, operator, line_number, test_id) '
+                'VALUES (?, ?, ?, ?)',
+                kills)
+
+    @property
+    def kills(self):
+        return [tuple(row) for row in self._conn.execute(
+            'SELECT module, operator, line_number, test_id FROM kills '
+            'ORDER BY rowid')]
+
+    def _kills_near(self, module, first_line, last_line):
+        return self._conn.execute(
+            'SELECT operator, line_number, test_id FROM kills '
+            'WHERE module = ? AND line_number BETWEEN ? AND ?',
+            (module, first_line, last_line))
+
+    def covering_tests(self, filename, line_number):
+        if not self.has_coverage:
+            return None
+
+        test_ids = {
+            row[0] for row in self._conn.execute(
+                'SELECT test_id FROM coverage '
+                'WHERE filename = ? AND line_number = ?',
+                (os.path.abspath(filename), line_number))
+        }
+        if None in test_ids:
+            return None
+        return test_ids
+
+
+def _backend(path):
+    """Determine the WorkDB class to use for the session file `path`.
+
+    Sessions ending in ".json" use the legacy TinyDB backend. Everything else
+    is stored in SQLite.
+    """
+    if path.endswith('.json'):
+        return TinyWorkDB
+    return SQLiteWorkDB
+
 
 @contextlib.contextmanager
 def use_db(path, mode=WorkDB.Mode.create):
@@ -188,10 +798,34 @@ def use_db(path, mode=WorkDB.Mode.create):
       FileNotFoundError: If `mode` is `Mode.open` and `path` does not
         exist.
     """
-    database = WorkDB(path, mode)
+    database = _backend(path)(path, mode)
     try:
         yield database
     except Exception:
         raise
     finally:
         database.close()
+
+
+def copy_work_db(source, dest):
+    """Copy the config and all WorkItems from one WorkDB into another.
+
+    Any existing work (along with test coverage, test durations and overhead,
+    and module hashes) in `dest` is replaced, and the kill history of `source` is added to that of `dest`.
+    This is how sessions are migrated between storage backends.
+
+    Args:
+      source: The `WorkDB` to read from.
+      dest: The `WorkDB` to write to.
+    """
+    config, timeout = source.get_config()
+    dest.set_config(config, timeout)
+    dest.clear_work_items()
+    dest.add_work_items(source.work_items)
+    dest.set_module_hashes(source.module_hashes)
+    dest.clear_coverage()
+    if source.has_coverage:
+        dest.set_coverage(source.coverage)
+    dest.set_test_durations(source.test_durations)
+    dest.set_test_overhead(source.test_overhead)
+    dest.add_kills(source.kills)
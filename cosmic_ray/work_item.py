@@ -47,7 +47,39 @@ class WorkItem(MutableMapping):
 
         'command_line',
 
-        'job_id'
+        'job_id',
+
+        # The IDs of the tests to run for this mutation, or None to run all of
+        # them.
+        'test_ids',
+
+        # The IDs of the tests to run first, since they're the most likely to
+        # kill the mutant.
+        'priority_tests',
+
+        # The ID of the test which killed the mutant, if known.
+        'killing_test',
+
+        # The timeout (seconds) for this mutation's worker, or None to use the
+        # session's timeout.
+        'timeout',
+
+        # Where to find the mutation site without traversing the module's AST:
+        # a dict with the `path` to the mutated node (see
+        # `cosmic_ray.mutating.find_node_paths`), the `index` of the mutation
+        # among those at the node, and the `source_hash` of the module the
+        # path was found in.
+        'node_path',
+
+        # The edit of the module's source which makes the mutant, if the text
+        # mutation backend found one: a dict with the `start` and `end`
+        # offsets of the replaced text, its `replacement`, and the
+        # `source_hash` of the module (see `cosmic_ray.text_edits`).
+        'text_edit',
+
+        # True if the mutant was drawn in the session's random sample (see
+        # `cosmic_ray.sampling`).
+        'sampled',
     ]
 
     def __init__(self, vals=None, **kwargs):
@@ -4,21 +4,26 @@ A worker is intended to run as a process that imports a module, mutates it in
 one location with one operator, runs the tests, reports the results, and dies.
 """
 
-import difflib
+import functools
 import importlib
+import importlib.util
 import inspect
 import logging
 import multiprocessing.pool
 import sys
 import traceback
 
-import astunparse
-
 import cosmic_ray.compat.json
-from cosmic_ray.importing import preserve_modules, using_ast
+import cosmic_ray.plugins
+from cosmic_ray.ast_cache import get_ast_cache
+from cosmic_ray.importing import (preserve_modules, remove_modules,
+                                  using_ast, using_code)
+from cosmic_ray.modules import dependent_modules, import_graph
 from cosmic_ray.mutating import MutatingCore
-from cosmic_ray.parsing import get_ast
+from cosmic_ray.parsing import get_ast, get_source_hash
+from cosmic_ray.schemata import get_schemata_dir, load_schema, using_schema
 from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.text_edits import get_text_edits_dir, load_mutant_code
 from cosmic_ray.util import StrEnum
 from cosmic_ray.work_item import WorkItem
 
@@ -43,12 +48,24 @@ class WorkerOutcome(StrEnum):
     NO_TEST = 'no-test'     # The worker had no test to run
     TIMEOUT = 'timeout'     # The worker timed out
     SKIPPED = 'skipped'     # The job was skipped (worker was not executed)
+    # No test executes the mutated code, so the worker was not executed
+    NO_COVERAGE = 'no-coverage'
+    # The mutant compiles to the same bytecode as the original, so the worker
+    # was not executed
+    EQUIVALENT = 'equivalent'
 
 
 def worker(module_name,
            operator,
            occurrence,
-           test_runner):
+           test_runner,
+           test_ids=None,
+           priority_tests=None,
+           schemata_dir=None,
+           node_path=None,
+           text_edits_dir=None,
+           text_edit=None,
+           ast_cache=None):
     """Mutate the OCCURRENCE-th site for OPERATOR_CLASS in MODULE_NAME, run the
     tests, and report the results.
 
@@ -70,11 +87,36 @@ def worker(module_name,
     test. It will do so and report back the result - killed, survived, or
     incompetent - in a structured way.
 
+    If `schemata_dir` contains an up-to-date schema for the module which
+    includes the mutant, the tests are run against the schema rather than
+    against a freshly mutated AST.
+
+    If `text_edit` was found in the current source of the module and
+    `text_edits_dir` is given, the tests are run against the module's source
+    with the edit applied, and nothing is parsed at all. The compiled mutant is
+    cached in `text_edits_dir`.
+
+    If `node_path` was found in the current source of the module, the mutation
+    site is found by following it rather than by traversing the whole AST.
+
+    If `ast_cache` is given, the module's AST is loaded from it rather than
+    parsed, if it's there.
+
     Args:
         module_name: The name of the module to be mutated
         operator: The operator be applied
         occurrence: The occurrence of the operator to apply
         test_runner: The test runner plugin to use
+        test_ids: The IDs of the tests to run, or None to run all of them
+        priority_tests: The IDs of the tests to run first
+        schemata_dir: The directory containing the mutant schemata, or None to
+            always mutate the AST
+        node_path: The `node_path` of the WorkItem, or None
+        text_edits_dir: The directory in which compiled text edits are
+            cached, or None to never use text edits
+        text_edit: The `text_edit` of the WorkItem, or None
+        ast_cache: The `cosmic_ray.ast_cache.ASTCache` to parse the module
+            with, or None
 
     Returns: A WorkItem
 
@@ -86,38 +128,47 @@ def worker(module_name,
         # TODO: What should we be doing here? This feels too hacky.
         sys.path.insert(0, '')
 
+        if schemata_dir is not None:
+            item = _schema_worker(module_name, operator, occurrence,
+                                  test_runner, test_ids, priority_tests,
+                                  schemata_dir)
+            if item is not None:
+                return item
+
+        if text_edits_dir is not None and text_edit is not None:
+            item = _text_edit_worker(module_name, occurrence, test_runner,
+                                     test_ids, priority_tests,
+                                     text_edits_dir, text_edit)
+            if item is not None:
+                return item
+
         with preserve_modules():
             module = importlib.import_module(module_name)
             module_source_file = inspect.getsourcefile(module)
-            module_ast = get_ast(module)
-            module_source = astunparse.unparse(module_ast)
+            module_ast = get_ast(module, ast_cache)
 
-            core = MutatingCore(occurrence)
-            operator = operator(core)
-            # note: after this step module_ast and modified_ast
-            # appear to be the same
-            modified_ast = operator.visit(module_ast)
-            modified_source = astunparse.unparse(modified_ast)
+            core = None
+            if node_path is not None and \
+                    node_path['source_hash'] == get_source_hash(module_source_file):
+                core = MutatingCore(occurrence)
+                core.visit_path(module_ast,
+                                node_path['path'],
+                                node_path['index'],
+                                operator(core))
+
+            if core is None or not core.activation_record:
+                core = MutatingCore(occurrence)
+                operator(core).visit(module_ast)
 
             if not core.activation_record:
                 return WorkItem(
                     worker_outcome=WorkerOutcome.NO_TEST)
 
-            # generate a source diff to visualize how the mutation
-            # operator has changed the code
-            module_diff = ["--- mutation diff ---"]
-            for line in difflib.unified_diff(module_source.split('\n'),
-                                             modified_source.split('\n'),
-                                             fromfile="a" + module_source_file,
-                                             tofile="b" + module_source_file,
-                                             lineterm=""):
-                module_diff.append(line)
-
         with using_ast(module_name, module_ast):
-            item = test_runner()
+            item = test_runner(test_ids=test_ids,
+                               priority_tests=priority_tests)
 
         item.update({
-            'diff': module_diff,
             'worker_outcome': WorkerOutcome.NORMAL,
             'occurrence': core.activation_record['occurrence'],
             'line_number': core.activation_record['line_number'],
@@ -131,6 +182,73 @@ def worker(module_name,
             worker_outcome=WorkerOutcome.EXCEPTION)
 
 
+def _schema_worker(module_name,
+                   operator,
+                   occurrence,
+                   test_runner,
+                   test_ids,
+                   priority_tests,
+                   schemata_dir):
+    """Run the tests against a mutant from the module's schema.
+
+    Returns: A WorkItem, or None if there's no up-to-date schema including the
+        mutant.
+    """
+    with preserve_modules():
+        schema = load_schema(schemata_dir, module_name)
+    if schema is None:
+        return None
+
+    mutant = schema.mutant(operator, occurrence)
+    if mutant is None:
+        return None
+
+    mutant_id, line_number, diff = mutant
+    with using_schema(module_name, schema, mutant_id):
+        item = test_runner(test_ids=test_ids,
+                           priority_tests=priority_tests)
+
+    item.update({
+        'diff': list(diff),
+        'worker_outcome': WorkerOutcome.NORMAL,
+        'occurrence': occurrence,
+        'line_number': line_number,
+    })
+    return item
+
+
+def _text_edit_worker(module_name,
+                      occurrence,
+                      test_runner,
+                      test_ids,
+                      priority_tests,
+                      text_edits_dir,
+                      text_edit):
+    """Run the tests against the module's source with `text_edit` applied.
+
+    Returns: A WorkItem, or None if the module has changed since the edit was
+        found.
+    """
+    with preserve_modules():
+        spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None:
+        return None
+
+    code = load_mutant_code(text_edits_dir, spec.origin, text_edit)
+    if code is None:
+        return None
+
+    with using_code(module_name, code):
+        item = test_runner(test_ids=test_ids,
+                           priority_tests=priority_tests)
+
+    item.update({
+        'worker_outcome': WorkerOutcome.NORMAL,
+        'occurrence': occurrence,
+    })
+    return item
+
+
 def _worker_multiprocessing_wrapper(pipe, *args, **kwargs):
     """Wrapper for launching workers with multiprocessing.
 
@@ -141,6 +259,225 @@ def _worker_multiprocessing_wrapper(pipe, *args, **kwargs):
     pipe.send(item)
 
 
+def _fork_server_wrapper(pipe,
+                         evicted_modules,
+                         module_name,
+                         operator_name,
+                         occurrence,
+                         test_runner_name,
+                         test_runner_args,
+                         test_ids,
+                         priority_tests,
+                         schemata_dir,
+                         node_path,
+                         text_edits_dir,
+                         text_edit,
+                         ast_cache):
+    """Wrapper for launching workers from a fork server.
+
+    The fork server may already have imported the module under test, so we
+    evict it from `sys.modules` (and from its parent package), along with
+    every module which imports it, to make sure the tests see the mutant.
+    Everything else the server imported stays loaded.
+
+    Plugins are passed by name since operator classes can't necessarily be
+    pickled.
+
+    Args:
+        pipe: The `multiprocessing.Pipe` for sending results.
+        evicted_modules: The names of the modules to remove from `sys.modules`.
+    """
+    remove_modules(evicted_modules)
+
+    _worker_multiprocessing_wrapper(
+        pipe,
+        module_name,
+        cosmic_ray.plugins.get_operator(operator_name),
+        occurrence,
+        cosmic_ray.plugins.get_test_runner(test_runner_name, test_runner_args),
+        test_ids,
+        priority_tests,
+        schemata_dir,
+        node_path,
+        text_edits_dir,
+        text_edit,
+        ast_cache)
+
+
+@functools.lru_cache()
+def _package_import_graph(package_name):
+    "The (cached) import graph for a package."
+    # Workers import the code under test from the current directory, so we
+    # look for it there as well.
+    sys.path.insert(0, '')
+    try:
+        return import_graph(package_name)
+    finally:
+        sys.path.remove('')
+
+
+@functools.lru_cache()
+def _evicted_modules(package_name, module_name):
+    """The modules a fork server worker must evict to mutate `module_name`.
+
+    This is the mutated module along with everything in its top-level package
+    that imports it, directly or indirectly.
+    """
+    return frozenset(dependent_modules(
+        _package_import_graph(package_name), module_name))
+
+
+def _fork_server_context(config):
+    """Get a multiprocessing context which starts workers from a fork server.
+
+    The fork server preloads the test-runner plugin and the modules in the
+    top-level package under test, so they don't need to be imported again for
+    every mutant.
+
+    Returns: A multiprocessing context, or None if the platform doesn't support
+        fork servers.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        log.warning('Fork servers are not supported on this platform')
+        return None
+
+    test_runner = cosmic_ray.plugins.get_test_runner(
+        config['test-runner', 'name'],
+        config['test-runner', 'args'])
+    preload = [type(test_runner).__module__, __name__]
+    preload.extend(sorted(
+        _package_import_graph(config['module'].split('.')[0])))
+
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(preload)
+    return context
+
+
+class WorkerProcess:
+    """A subprocess executing the mutation and tests described by a `WorkItem`.
+
+    The process is started on construction. Its result can be received on
+    `connection`; when it's ready, call `complete()` to get the updated
+    WorkItem. If the worker takes too long, call `time_out()` instead.
+
+    If the `fork-server` option of the execution-engine config is true, the
+    process is forked from a warm fork server rather than started afresh.
+
+    Args:
+        work_item: The WorkItem describing the work to do.
+        config: The configuration for the run.
+    """
+
+    def __init__(self, work_item, config):
+        self._work_item = work_item
+
+        context = None
+        if config.get(('execution-engine', 'fork-server'), default=False):
+            context = _fork_server_context(config)
+
+        # We hold on to the child's end of the pipe for the lifetime of the
+        # worker. That means a worker that dies without sending a result is
+        # seen as having timed out, rather than as closing the connection.
+        if context is None:
+            self._connection, self._child_connection = multiprocessing.Pipe()
+            self._process = multiprocessing.Process(
+                target=_worker_multiprocessing_wrapper,
+                args=(self._child_connection,
+                      work_item.module,
+                      cosmic_ray.plugins.get_operator(work_item.operator),
+                      work_item.occurrence,
+                      cosmic_ray.plugins.get_test_runner(
+                          config['test-runner', 'name'],
+                          config['test-runner', 'args']),
+                      work_item.test_ids,
+                      work_item.priority_tests,
+                      get_schemata_dir(config),
+                      work_item.node_path,
+                      get_text_edits_dir(config),
+                      work_item.text_edit,
+                      get_ast_cache(config)))
+        else:
+            self._connection, self._child_connection = context.Pipe()
+            self._process = context.Process(
+                target=_fork_server_wrapper,
+                args=(self._child_connection,
+                      _evicted_modules(config['module'].split('.')[0],
+                                       work_item.module),
+                      work_item.module,
+                      work_item.operator,
+                      work_item.occurrence,
+                      config['test-runner', 'name'],
+                      config['test-runner', 'args'],
+                      work_item.test_ids,
+                      work_item.priority_tests,
+                      get_schemata_dir(config),
+                      work_item.node_path,
+                      get_text_edits_dir(config),
+                      work_item.text_edit,
+                      get_ast_cache(config)))
+        self._process.start()
+
+    @property
+    def connection(self):
+        """The connection on which the worker sends its results."""
+        return self._connection
+
+    def complete(self):
+        """Receive the results from the worker.
+
+        Returns: The updated WorkItem.
+        """
+        result = self._connection.recv()
+        self._work_item.update({
+            k: v
+            for k, v
+            in result.items()
+            if v is not None
+        })
+
+        self._process.join()
+        return self._finish()
+
+    def time_out(self, timeout):
+        """Terminate the worker, recording that it timed out.
+
+        Args:
+            timeout: The timeout (seconds) that the worker exceeded.
+
+        Returns: The updated WorkItem.
+        """
+        self._work_item.worker_outcome = WorkerOutcome.TIMEOUT
+        self._work_item.data = timeout
+        self.terminate()
+        return self._finish()
+
+    def terminate(self):
+        """Stop the worker process without recording any results."""
+        self._process.terminate()
+        self._process.join()
+
+    def _finish(self):
+        # TODO: This is in an awkward place now...we don't use the command any
+        # more. Where would be a better place? Or should we generate this
+        # another way? This command line is useful for debugging, but
+        # meaningless here.
+        command = 'cosmic-ray worker {module} {operator} {occurrence}'.format(
+            **self._work_item)
+        self._work_item.command_line = command
+        return self._work_item
+
+
+def work_item_timeout(work_item, timeout):
+    """The timeout (seconds) for the worker for `work_item`.
+
+    This is the WorkItem's own `timeout` if it has one, and otherwise the
+    session's `timeout`.
+    """
+    if work_item.timeout is None:
+        return timeout
+    return work_item.timeout
+
+
 def execute_work_item(work_item,
                       timeout,
                       config):
@@ -149,44 +486,16 @@ def execute_work_item(work_item,
     Args:
         work_item: The WorkItem describing the work to do.
         timeout: The maximum amount of time (seconds) to allow the subprocess
-            to run.
+            to run, unless the WorkItem has its own `timeout`.
         config: The configuration for the run.
 
     Returns: An updated `WorkItem` with the results of the tests.
 
     """
-    parent_conn, child_conn = multiprocessing.Pipe()
-    proc = multiprocessing.Process(
-        target=_worker_multiprocessing_wrapper,
-        args=(child_conn,
-              work_item.module,
-              cosmic_ray.plugins.get_operator(work_item.operator),
-              work_item.occurrence,
-              cosmic_ray.plugins.get_test_runner(
-                  config['test-runner', 'name'],
-                  config['test-runner', 'args'])))
-
-    proc.start()
-
-    if parent_conn.poll(timeout):
-        result = parent_conn.recv()
-        work_item.update({
-            k: v
-            for k, v
-            in result.items()
-            if v is not None
-        })
-    else:  # timeout
-        work_item.worker_outcome = WorkerOutcome.TIMEOUT
-        work_item.data = timeout
-        proc.terminate()
-
-    proc.join()
-
-    # TODO: This is in an awkward place now...we don't use the command any
-    # more. Where would be a better place? Or should we generate this another
-    # way? This command line is useful for debugging, but meaningless here.
-    command = 'cosmic-ray worker {module} {operator} {occurrence}'.format(
-        **work_item)
-    work_item.command_line = command
-    return work_item
+    timeout = work_item_timeout(work_item, timeout)
+    worker_process = WorkerProcess(work_item, config)
+
+    if worker_process.connection.poll(timeout):
+        return worker_process.complete()
+
+    return worker_process.time_out(timeout)
@@ -19,7 +19,13 @@ class CeleryExecutionEngine(ExecutionEngine):
                 config)
 
             result = job.apply_async()
-            result.get(callback=on_task_complete)
+            try:
+                result.get(callback=on_task_complete)
+            except BaseException:
+                # Don't leave workers running jobs whose results are unwanted,
+                # e.g. if on_task_complete raised StopExecution.
+                result.revoke(terminate=True)
+                raise
         finally:
             if purge_queue:
                 APP.control.purge()
@@ -30,10 +30,12 @@ class NoseRunner(TestRunner):  # pylint: disable=too-few-public-methods
     for a description of what arguments are accepted.
 
     NOTE: ``-s`` is not accepted here!
+
+    nose is always run with `--stop` so that it stops at the first failure.
     """
 
     def _run(self):
-        argv = ['', '--with-cosmic_ray']
+        argv = ['', '--with-cosmic_ray', '--stop']
         argv += self.test_args.split()
         collector = NoseResultsCollector()
 
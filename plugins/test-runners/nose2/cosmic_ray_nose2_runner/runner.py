@@ -10,14 +10,29 @@ from cosmic_ray.util import redirect_stdout, redirect_stderr
 
 
 class Nose2ResultsCollector(object):
-    "Nose plugin that collects results for later analysis."
+    """Nose plugin that collects results for later analysis.
 
-    def __init__(self):
+    It also reports the start and end of each test to the `Nose2Runner` using
+    it.
+    """
+
+    def __init__(self, test_runner):
         self.events = []
+        self._test_runner = test_runner
 
     def testOutcome(self, event):  # pylint: disable=invalid-name
         "Store result."
         self.events.append(event)
+        if event.outcome in ('failed', 'error'):
+            self._test_runner._test_failed(event.test.id())  # pylint: disable=protected-access
+
+    def startTest(self, event):  # pylint: disable=invalid-name
+        "Report the start of a test."
+        self._test_runner._test_started(event.test.id())  # pylint: disable=protected-access
+
+    def stopTest(self, event):  # pylint: disable=invalid-name
+        "Report the end of a test."
+        self._test_runner._test_finished(event.test.id())  # pylint: disable=protected-access
 
 
 class Nose2Runner(TestRunner):  # pylint: disable=too-few-public-methods
@@ -28,17 +43,26 @@ class Nose2Runner(TestRunner):  # pylint: disable=too-few-public-methods
     for a description of what arguments are accepted.
 
     NOTE: ``-s`` is not accepted here!
+
+    Tests are identified by their test names (e.g. "tests.test_foo.Foo.test_bar"),
+    which are passed on the command line to select tests.
+
+    nose2 is always run with `--fail-fast` so that it stops at the first
+    failure. It can't reorder tests, so `priority_tests` is ignored.
     """
 
     def _run(self):
-        argv = ['']
+        argv = ['', '--fail-fast']
         argv += self.test_args.split()
-        collector = Nose2ResultsCollector()
+        if self.test_ids is not None:
+            argv += sorted(self.test_ids)
+        collector = Nose2ResultsCollector(self)
 
+        hooks = [(hook, collector) for hook in ('testOutcome', 'startTest', 'stopTest')]
         with open(os.devnull, 'w') as devnull:
             with redirect_stdout(devnull):
                 with redirect_stderr(devnull):
-                    nose2.discover(argv=argv, extraHooks=[('testOutcome', collector)], exit=False)
+                    nose2.discover(argv=argv, extraHooks=hooks, exit=False)
         failures = [x for x in collector.events if x.outcome != 'passed']
 
         return (not failures, [(str(r.test), traceback.format_exception(*r.exc_info)) for r in failures])
@@ -9,13 +9,41 @@ from cosmic_ray.util import redirect_stdout
 
 
 class ResultCollector:
-    "Pytest plugin that collects results for later analysis."
-    def __init__(self):
+    """Pytest plugin that collects results for later analysis.
+
+    It also selects the tests to run and reports the start and end of each test
+    to the `PytestRunner` using it.
+    """
+    def __init__(self, test_runner):
         self.reports = []
+        self._test_runner = test_runner
 
     def pytest_runtest_logreport(self, report):
         "Collect logreports into a list."
         self.reports.append(report)
+        if report.failed:
+            self._test_runner._test_failed(report.nodeid)  # pylint: disable=protected-access
+
+    def pytest_collection_modifyitems(self, config, items):
+        """Deselect any tests not in the runner's `test_ids`, and move its
+        `priority_tests` to the front."""
+        test_ids = self._test_runner.test_ids
+        if test_ids is not None:
+            deselected = [item for item in items if item.nodeid not in test_ids]
+            if deselected:
+                items[:] = [item for item in items if item.nodeid in test_ids]
+                config.hook.pytest_deselected(items=deselected)
+
+        if self._test_runner.priority_tests:
+            sort_key = self._test_runner._sort_key  # pylint: disable=protected-access
+            items.sort(key=lambda item: sort_key(item.nodeid))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):  # pylint: disable=unused-argument
+        "Report the start and end of each test."
+        self._test_runner._test_started(item.nodeid)  # pylint: disable=protected-access
+        yield
+        self._test_runner._test_finished(item.nodeid)  # pylint: disable=protected-access
 
 
 class PytestRunner(TestRunner):
@@ -26,16 +54,21 @@ class PytestRunner(TestRunner):
     function, so see it's documentation for a description of how the arguments
     are used.
 
+    Tests are identified by their pytest node IDs.
+
+    pytest is always run with `-x` so that it stops at the first failure.
     """
 
     def _run(self):
-        collector = ResultCollector()
+        collector = ResultCollector(self)
 
         args = self.test_args
         if args:
             args = args.split()
         else:
             args = []
+        if not {'-x', '--exitfirst'} & set(args):
+            args.append('-x')
 
         with StringIO() as stdout:
             with redirect_stdout(stdout):
@@ -146,9 +146,15 @@ setup(
         ],
         'cosmic_ray.execution_engines': [
             'local = cosmic_ray.execution.local:LocalExecutionEngine',
+            'local-parallel = cosmic_ray.execution.local:LocalParallelExecutionEngine',
         ],
         'cosmic_ray.interceptors': [
-            'spor = cosmic_ray.interceptors.spor:intercept'
+            'coverage = cosmic_ray.interceptors.coverage:intercept',
+            'equivalence = cosmic_ray.interceptors.equivalence:intercept',
+            'git-diff = cosmic_ray.interceptors.git_diff:intercept',
+            'pragma = cosmic_ray.interceptors.pragma:intercept',
+            'sampling = cosmic_ray.interceptors.sampling:intercept',
+            'spor = cosmic_ray.interceptors.spor:intercept',
         ],
     },
     cmdclass={'build_sphinx': BuildDoc},
@@ -0,0 +1,79 @@
+import ast
+import os
+import types
+
+from cosmic_ray.ast_cache import ASTCache
+from cosmic_ray.parsing import get_ast
+
+SOURCE = 'x = 1 + 2\n'
+
+
+def _source_file(tmpdir, name='mod.py', source=SOURCE):
+    source_file = tmpdir.join(name)
+    source_file.write(source)
+    return str(source_file)
+
+
+def test_get_returns_stored_ast(tmpdir):
+    filename = _source_file(tmpdir)
+    cache = ASTCache(str(tmpdir.join('cache')))
+    assert cache.get(filename) is None
+
+    cache.put(filename, SOURCE, ast.parse(SOURCE))
+    source, module_ast = cache.get(filename)
+    assert source == SOURCE
+    assert ast.dump(module_ast) == ast.dump(ast.parse(SOURCE))
+
+
+def test_changed_file_is_not_found(tmpdir):
+    filename = _source_file(tmpdir)
+    cache = ASTCache(str(tmpdir.join('cache')))
+    cache.put(filename, SOURCE, ast.parse(SOURCE))
+
+    _source_file(tmpdir, source='x = 3\n')
+    assert cache.get(filename) is None
+
+
+def test_touched_file_is_found(tmpdir):
+    filename = _source_file(tmpdir)
+    cache = ASTCache(str(tmpdir.join('cache')))
+    cache.put(filename, SOURCE, ast.parse(SOURCE))
+
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.get(filename) is not None
+
+
+def test_least_recently_used_entries_are_evicted(tmpdir):
+    cache = ASTCache(str(tmpdir.join('cache')))
+    filenames = [_source_file(tmpdir, name) for name in ('a.py', 'b.py')]
+    for filename in filenames:
+        cache.put(filename, SOURCE, ast.parse(SOURCE))
+    entry_size = cache.size // 2
+
+    # Use a.py, so b.py is the least recently used.
+    for entry in os.listdir(cache.directory):
+        os.utime(os.path.join(cache.directory, entry), (1, 1))
+    assert cache.get(filenames[0]) is not None
+
+    cache.max_size = entry_size
+    cache.put(filenames[0], SOURCE, ast.parse(SOURCE))
+    assert cache.get(filenames[0]) is not None
+    assert cache.get(filenames[1]) is None
+
+    cache.clear()
+    assert cache.size == 0
+
+
+def test_get_ast_uses_cache(tmpdir):
+    module = types.ModuleType('mod')
+    module.__file__ = _source_file(tmpdir)
+    cache = ASTCache(str(tmpdir.join('cache')))
+
+    first = get_ast(module, cache)
+    assert cache.get(module.__file__) is not None
+
+    # Each caller gets its own copy of the AST.
+    first.body = []
+    second = get_ast(module, cache)
+    assert ast.dump(second) == ast.dump(ast.parse(SOURCE))
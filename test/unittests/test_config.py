@@ -55,3 +55,15 @@ def test_load_from_non_utf8_file_raises_ConfigError(tmpdir):
         handle.write('{key: value}'.encode('utf-16'))
     with pytest.raises(ConfigError):
         load_config(str(config_path))
+
+
+def test_execution_engine_workers_must_be_positive(mocker):
+    temp_stdin = io.StringIO()
+    temp_stdin.name = 'stringio'
+    temp_stdin.write('{execution-engine: {name: local-parallel, workers: 0}}')
+    temp_stdin.seek(0)
+    mocker.patch('sys.stdin', temp_stdin)
+
+    config = load_config()
+    with pytest.raises(ValueError):
+        config['execution-engine', 'workers']
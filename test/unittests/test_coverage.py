@@ -0,0 +1,172 @@
+import sys
+
+import pytest
+
+from cosmic_ray.commands.init import _module_work_items
+from cosmic_ray.coverage import CoverageCollector
+from cosmic_ray.interceptors.coverage import intercept
+from cosmic_ray.reporting import survival_rate
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.testing.unittest_runner import UnittestRunner
+from cosmic_ray.modules import find_modules
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+from path_utils import excursion, extend_path
+
+MODULE = '''\
+LIMIT = 10
+
+
+def clamp(x):
+    if x > LIMIT:
+        return LIMIT
+    return x
+
+
+def double(x):
+    return x * 2
+'''
+
+TESTS = '''\
+import unittest
+
+from covered import clamp, double
+
+
+class Tests(unittest.TestCase):
+    def test_clamp(self):
+        self.assertEqual(clamp(20), 10)
+
+    def test_double(self):
+        self.assertEqual(double(2), 4)
+'''
+
+
+class Recorder:
+    "Listener which records the tests which are run."
+    def __init__(self):
+        self.test_ids = []
+
+    def test_started(self, test_id):
+        self.test_ids.append(test_id)
+
+    def test_finished(self, test_id):
+        pass
+
+
+@pytest.fixture
+def project(tmpdir):
+    tmpdir.join('covered.py').write(MODULE)
+    tmpdir.ensure('tests', '__init__.py')
+    tmpdir.join('tests', 'test_covered.py').write(TESTS)
+    with extend_path(tmpdir), excursion(tmpdir):
+        yield tmpdir
+    for name in ('covered', 'test_covered'):
+        sys.modules.pop(name, None)
+
+
+def test_collector_records_tests_for_each_line(project):
+    filename = str(project.join('covered.py'))
+    collector = CoverageCollector([filename])
+    with collector:
+        result = UnittestRunner('tests')(listener=collector)
+    assert result.test_outcome == TestOutcome.SURVIVED
+
+    clamp_test = 'test_covered.Tests.test_clamp'
+    double_test = 'test_covered.Tests.test_double'
+    assert collector.coverage[(filename, 1)] == {None}
+    assert collector.coverage[(filename, 5)] == {clamp_test}
+    assert collector.coverage[(filename, 6)] == {clamp_test}
+    assert (filename, 7) not in collector.coverage
+    assert collector.coverage[(filename, 11)] == {double_test}
+
+
+def test_unittest_runner_only_runs_selected_tests(project):
+    recorder = Recorder()
+    test_id = 'test_covered.Tests.test_double'
+    result = UnittestRunner('tests')(test_ids=[test_id], listener=recorder)
+    assert result.test_outcome == TestOutcome.SURVIVED
+    assert recorder.test_ids == [test_id]
+
+
+def test_interceptor_marks_uncovered_work_items(tmpdir):
+    items = [WorkItem(job_id=str(line), filename='/foo.py', line_number=line)
+             for line in (1, 2, 3)]
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.add_work_items(items)
+        work_db.set_coverage({('/foo.py', 1): {None}, ('/foo.py', 2): {'test_a'}})
+
+        intercept(work_db)
+
+        outcomes = {item.line_number: item.worker_outcome
+                    for item in work_db.work_items}
+    assert outcomes == {1: None, 2: None, 3: WorkerOutcome.NO_COVERAGE}
+
+
+def test_uncovered_work_items_survive():
+    items = [WorkItem(worker_outcome=WorkerOutcome.NO_COVERAGE),
+             WorkItem(worker_outcome=WorkerOutcome.NORMAL,
+                      test_outcome=TestOutcome.KILLED)]
+    assert survival_rate(items) == 50
+
+
+def test_unittest_runner_runs_priority_tests_first(project):
+    recorder = Recorder()
+    runner = UnittestRunner('tests')
+    runner(listener=recorder, priority_tests=['test_covered.Tests.test_double'])
+    assert recorder.test_ids == ['test_covered.Tests.test_double',
+                                 'test_covered.Tests.test_clamp']
+
+
+def test_unittest_runner_reports_killing_test(project):
+    project.join('covered.py').write(MODULE.replace('x * 2', 'x * 3'))
+    result = UnittestRunner('tests')()
+    assert result.test_outcome == TestOutcome.KILLED
+    assert result.killing_test == 'test_covered.Tests.test_double'
+
+
+FOLDED_MODULE = '''\
+def f(x):
+    return (x +
+            3 *
+            4)
+'''
+
+FOLDED_TESTS = '''\
+import unittest
+
+from folded import f
+
+
+class Tests(unittest.TestCase):
+    def test_f(self):
+        self.assertEqual(f(1), 13)
+'''
+
+
+def test_interceptor_counts_lines_of_whole_statement(tmpdir):
+    # `3 * 4` is folded into a constant, so lines 3 and 4 are never traced.
+    filename = str(tmpdir.join('folded.py'))
+    tmpdir.join('folded.py').write(FOLDED_MODULE)
+    tmpdir.ensure('tests', '__init__.py')
+    tmpdir.join('tests', 'test_folded.py').write(FOLDED_TESTS)
+    with extend_path(tmpdir), excursion(tmpdir):
+        try:
+            collector = CoverageCollector([filename])
+            with collector:
+                UnittestRunner('tests')(listener=collector)
+            module, = find_modules('folded')
+            items = list(_module_work_items(module, ['core/NumberReplacer']))
+        finally:
+            for name in ('folded', 'test_folded'):
+                sys.modules.pop(name, None)
+    assert (filename, 4) not in collector.coverage
+
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.add_work_items(items)
+        work_db.set_coverage(collector.coverage)
+        intercept(work_db)
+
+        lines = [item.line_number for item in work_db.pending_work_items]
+    assert sorted(lines) == [3, 3, 4, 4]
@@ -0,0 +1,53 @@
+import types
+
+from cosmic_ray.commands.init import _module_work_items
+from cosmic_ray.diffs import DIFF_HEADER, mutation_diff
+
+SOURCE = '''
+import os
+
+
+def f(x):
+    y = x + 1
+    return y
+
+
+def g():
+    return os.sep
+'''
+
+
+def _work_item(tmpdir, operator):
+    source_file = tmpdir.join('mod.py')
+    source_file.write(SOURCE)
+    module = types.ModuleType('mod')
+    module.__file__ = str(source_file)
+    return next(item for item in _module_work_items(module, [operator]))
+
+
+def _changes(diff):
+    return [line for line in diff[3:] if line.startswith(('-', '+'))]
+
+
+def test_diff_only_covers_enclosing_statement(tmpdir):
+    item = _work_item(tmpdir, 'core/ReplaceBinaryOperator_Add_Sub')
+
+    diff = mutation_diff(item)
+    assert diff[0] == DIFF_HEADER
+    assert _changes(diff) == ['-y = (x + 1)', '+y = (x - 1)']
+    assert not any('os.sep' in line for line in diff)
+
+
+def test_diff_without_node_path_covers_module(tmpdir):
+    item = _work_item(tmpdir, 'core/ReplaceBinaryOperator_Add_Sub')
+    item.node_path = None
+
+    # The statement is indented since it's unparsed as part of the module.
+    diff = mutation_diff(item)
+    assert _changes(diff) == ['-    y = (x + 1)', '+    y = (x - 1)']
+
+
+def test_recorded_diffs_are_used(tmpdir):
+    item = _work_item(tmpdir, 'core/ReplaceBinaryOperator_Add_Sub')
+    item.diff = [DIFF_HEADER, 'recorded']
+    assert mutation_diff(item) == [DIFF_HEADER, 'recorded']
@@ -0,0 +1,68 @@
+import ast
+
+from cosmic_ray.dispatching import dispatch
+from cosmic_ray.operators.provider import OperatorProvider
+
+SOURCE = '''
+import functools
+
+@functools.lru_cache()
+def f(x, y=-1):
+    if x > 0 and (y < 2 or not x):
+        while x != y:
+            x = x + (y * 3) - (+x if x else ~y)
+            if x is None:
+                break
+    for i in [1, 2.5, True]:
+        try:
+            continue
+        except ValueError:
+            assert i == False
+    return x ** 2 // 3 % 4
+'''
+
+
+class RecordingCore:
+    "Records each mutation site an operator visits."
+    def __init__(self):
+        self.sites = []
+
+    def visit_mutation_site(self, node, _, count):
+        self.sites.append((type(node).__name__, node.lineno, node.col_offset, count))
+        return node
+
+    @staticmethod
+    def repr_args():
+        return []
+
+
+def _separate_sites(provider):
+    sites = {}
+    for name in provider:
+        core = RecordingCore()
+        provider[name](core).visit(ast.parse(SOURCE))
+        sites[name] = core.sites
+    return sites
+
+
+def test_dispatch_matches_separate_traversals():
+    provider = OperatorProvider()
+    cores = {name: RecordingCore() for name in provider}
+
+    dispatch(ast.parse(SOURCE),
+             [provider[name](core) for name, core in cores.items()])
+
+    dispatched = {name: core.sites for name, core in cores.items()}
+    assert dispatched == _separate_sites(provider)
+    assert any(dispatched.values())
+
+
+def test_operators_with_custom_traversal_are_visited_separately():
+    class Recursive(OperatorProvider()['NumberReplacer']):
+        "An operator which visits inside the nodes it handles."
+        def generic_visit(self, node):
+            return super().generic_visit(node)
+
+    core = RecordingCore()
+    dispatch(ast.parse('x = 1 + 2'), [Recursive(core)])
+    assert len(core.sites) == 2
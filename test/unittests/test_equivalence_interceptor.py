@@ -0,0 +1,101 @@
+import ast
+
+import pytest
+
+from cosmic_ray.config import Config
+from cosmic_ray.interceptors.equivalence import intercept
+from cosmic_ray.mutating import find_node_paths
+from cosmic_ray.parsing import get_source_hash
+from cosmic_ray.reporting import is_killed
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+SOURCE = '''\
+def f():
+    1
+    return 2
+'''
+
+
+def _items(filename):
+    # Occurrences 0 and 1 mutate the discarded constant, 2 and 3 the returned one.
+    return [WorkItem(job_id=str(occurrence),
+                     filename=filename,
+                     operator='core/NumberReplacer',
+                     occurrence=occurrence)
+            for occurrence in range(4)]
+
+
+def _add_node_paths(items, filename):
+    "Set the `node_path` of each of `_items()`, as `init` would."
+    with open(filename) as handle:
+        tree = ast.parse(handle.read())
+    paths = find_node_paths(tree)
+    numbers = sorted((node for node in ast.walk(tree)
+                      if isinstance(node, ast.Constant)
+                      and isinstance(node.value, int)),
+                     key=lambda node: node.lineno)
+    for item in items:
+        item.node_path = {'path': paths[id(numbers[item.occurrence // 2])],
+                          'index': item.occurrence % 2,
+                          'source_hash': get_source_hash(filename)}
+
+
+@pytest.mark.parametrize('prefix', ['', '"""Docstring."""\n"not a docstring"\n'])
+@pytest.mark.parametrize('node_paths', [False, True])
+def test_equivalent_mutants_are_marked(tmpdir, prefix, node_paths):
+    source = tmpdir.join('a.py')
+    source.write(prefix + SOURCE)
+    items = _items(str(source))
+    if node_paths:
+        _add_node_paths(items, str(source))
+
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(Config({'bytecode-equivalence': True}), 10)
+        work_db.add_work_items(items)
+        intercept(work_db)
+
+        outcomes = {item.job_id: item.worker_outcome
+                    for item in work_db.work_items}
+    assert outcomes == {'0': WorkerOutcome.EQUIVALENT,
+                        '1': WorkerOutcome.EQUIVALENT,
+                        '2': None,
+                        '3': None}
+
+
+def test_stale_node_paths_are_ignored(tmpdir):
+    source = tmpdir.join('a.py')
+    source.write(SOURCE)
+    items = _items(str(source))
+    _add_node_paths(items, str(source))
+    # Swap the two statements, so that the recorded paths point at the wrong
+    # constants.
+    source.write('def f():\n    return 2\n    1\n')
+
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(Config({'bytecode-equivalence': True}), 10)
+        work_db.add_work_items(items)
+        intercept(work_db)
+
+        outcomes = {item.job_id: item.worker_outcome
+                    for item in work_db.work_items}
+    assert outcomes == {'0': None,
+                        '1': None,
+                        '2': WorkerOutcome.EQUIVALENT,
+                        '3': WorkerOutcome.EQUIVALENT}
+
+
+def test_intercept_does_nothing_unless_enabled(tmpdir):
+    source = tmpdir.join('a.py')
+    source.write(SOURCE)
+
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(Config({'module': 'a'}), 10)
+        work_db.add_work_items(_items(str(source)))
+        intercept(work_db)
+        assert work_db.num_pending_work_items == 4
+
+
+def test_equivalent_mutants_are_not_survivors():
+    assert is_killed(WorkItem(worker_outcome=WorkerOutcome.EQUIVALENT))
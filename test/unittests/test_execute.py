@@ -0,0 +1,74 @@
+import importlib
+
+import pytest
+
+from cosmic_ray.commands import SurvivorLimitExceeded, execute
+from cosmic_ray.commands.execute import _assign_timeouts
+from cosmic_ray.config import Config
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+def _surviving_engine(timeout, pending_work_items, config, on_task_complete):
+    "An execution engine for which every mutant survives."
+    for work_item in pending_work_items:
+        work_item.worker_outcome = WorkerOutcome.NORMAL
+        work_item.test_outcome = TestOutcome.SURVIVED
+        on_task_complete(work_item.job_id, work_item)
+
+
+@pytest.fixture
+def session(tmpdir, monkeypatch):
+    # The module is shadowed by the function of the same name.
+    module = importlib.import_module('cosmic_ray.commands.execute')
+    monkeypatch.setattr(module, 'get_execution_engine',
+                        lambda name: _surviving_engine)
+    db_path = str(tmpdir.join('session.sqlite'))
+    with use_db(db_path) as work_db:
+        work_db.set_config(Config({'execution-engine': {'name': 'fake'},
+                                   'max-survivors': 2}), 10)
+        work_db.add_work_items(
+            WorkItem(job_id=str(index), module='a') for index in range(5))
+    return db_path
+
+
+def test_execution_stops_when_too_many_mutants_survive(session):
+    with pytest.raises(SurvivorLimitExceeded):
+        execute(session)
+
+    with use_db(session) as work_db:
+        assert work_db.num_pending_work_items == 2
+
+
+def test_earlier_survivors_count_towards_limit(session):
+    with use_db(session) as work_db:
+        items = list(work_db.work_items)[:3]
+        for item in items:
+            item.worker_outcome = WorkerOutcome.NO_COVERAGE
+        work_db.update_work_items(items)
+
+    with pytest.raises(SurvivorLimitExceeded):
+        execute(session)
+
+    with use_db(session) as work_db:
+        assert work_db.num_pending_work_items == 2
+
+
+def test_timeouts_are_based_on_durations_of_tests_to_run():
+    durations = {'test_a': 1, 'test_b': 2, 'test_c': 30}
+    items = [WorkItem(test_ids=['test_a', 'test_b']),
+             WorkItem(test_ids=['test_a', 'test_unknown']),
+             WorkItem(test_ids=None)]
+
+    items = list(_assign_timeouts(items, durations, timeout=100, factor=5,
+                                  minimum=1))
+    assert [item.timeout for item in items] == [16, None, 100]
+
+
+def test_timeouts_include_baseline_overhead():
+    items = list(_assign_timeouts([WorkItem(test_ids=['test_a'])],
+                                  {'test_a': 1}, timeout=100, factor=5,
+                                  minimum=1, overhead=2.5))
+    assert items[0].timeout == 8.5
@@ -1,6 +1,9 @@
+import sys
 from pathlib import Path
 
-from cosmic_ray.modules import find_modules, fixup_module_name
+from cosmic_ray.modules import (dependent_modules, find_module_paths, find_modules,
+                                find_static_modules, fixup_module_name,
+                                import_graph)
 from path_utils import DATA_DIR, excursion, extend_path
 
 
@@ -79,3 +82,82 @@ def test_finding_modules_py_dot_py_using_slashes_with_full_filename():
             in find_modules(module_name))
     # a/py.py is a module and it is loaded
     assert expected == results
+
+
+def test_find_module_paths():
+    datadir = DATA_DIR
+    paths = (('a', '__init__.py'),
+             ('a', 'b.py'),
+             ('a', 'py.py'),
+             ('a', 'c', '__init__.py'),
+             ('a', 'c', 'd.py'))
+    expected = sorted(str(datadir / Path(*path)) for path in paths)
+    with extend_path(datadir):
+        results = dict(find_module_paths('a'))
+    assert sorted(results.values()) == expected
+    assert results['a.c.d'] == str(datadir / 'a' / 'c' / 'd.py')
+
+
+def test_find_static_modules_finds_the_same_modules():
+    with extend_path(DATA_DIR):
+        for name, excludes in (('a', None), ('a', [r'a\.c$']), ('a.c', None)):
+            expected = sorted((m.__name__, m.__file__)
+                              for m in find_modules(name, excludes))
+            results = sorted((m.__name__, m.__file__)
+                             for m in find_static_modules(name, excludes))
+            assert expected == results
+
+
+def test_find_static_modules_does_not_import(tmpdir):
+    _make_package(tmpdir, {
+        'broken/__init__.py': 'raise RuntimeError()\n',
+        'broken/sub/__init__.py': '',
+        'broken/sub/mod.py': 'raise RuntimeError()\n',
+    })
+    with extend_path(tmpdir):
+        modules = {m.__name__: m for m in find_static_modules('broken.sub')}
+
+    assert sorted(modules) == ['broken.sub', 'broken.sub.mod']
+    assert modules['broken.sub.mod'].__file__ == str(
+        tmpdir.join('broken', 'sub', 'mod.py'))
+    assert 'broken' not in sys.modules
+
+
+def _make_package(root, files):
+    for name, source in files.items():
+        path = root.join(*name.split('/'))
+        path.dirpath().ensure(dir=True)
+        path.write(source)
+
+
+def test_import_graph_resolves_absolute_and_relative_imports(tmpdir):
+    _make_package(tmpdir, {
+        'pkg/__init__.py': 'from . import core\n',
+        'pkg/core.py': 'import os\n',
+        'pkg/util.py': 'from .core import base\n',
+        'pkg/sub/__init__.py': '',
+        'pkg/sub/leaf.py': 'from .. import util\nimport pkg.core\n',
+    })
+    with extend_path(tmpdir):
+        graph = import_graph('pkg')
+
+    assert graph == {
+        'pkg': {'pkg.core'},
+        'pkg.core': {'pkg'},
+        'pkg.util': {'pkg', 'pkg.core'},
+        'pkg.sub': {'pkg'},
+        'pkg.sub.leaf': {'pkg', 'pkg.sub', 'pkg.util', 'pkg.core'},
+    }
+
+
+def test_dependent_modules_is_transitive():
+    graph = {
+        'pkg': set(),
+        'pkg.core': {'pkg'},
+        'pkg.util': {'pkg', 'pkg.core'},
+        'pkg.other': {'pkg'},
+        'pkg.leaf': {'pkg', 'pkg.util'},
+    }
+    assert dependent_modules(graph, 'pkg.core') == {
+        'pkg.core', 'pkg.util', 'pkg.leaf'}
+    assert dependent_modules(graph, 'pkg.other') == {'pkg.other'}
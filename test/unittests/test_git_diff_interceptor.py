@@ -0,0 +1,115 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from cosmic_ray.config import Config
+from cosmic_ray.interceptors.git_diff import _parse_diff, intercept
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+DIFF = '''\
+diff --git a/pkg/a.py b/pkg/a.py
+index 1111111..2222222 100644
+--- a/pkg/a.py
++++ b/pkg/a.py
+@@ -3 +3 @@ def f():
+-    return 1
++    return 2
+@@ -10,0 +11,2 @@ def g():
++    x = 1
++    y = 2
+@@ -20,3 +22,0 @@ def h():
+-    pass
+-    pass
+-    pass
+diff --git a/pkg/b.py b/pkg/b.py
+deleted file mode 100644
+--- a/pkg/b.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+'''
+
+
+def test_parse_diff():
+    changed = _parse_diff(DIFF, '/repo')
+    assert changed == {os.path.realpath('/repo/pkg/a.py'): {3, 11, 12}}
+
+
+def test_parse_diff_with_unusual_paths():
+    diff = ('+++ b/pkg/a b.py\t\n'
+            '@@ -1 +1 @@\n'
+            '+++ "b/pkg/\\"q\\"\\303\\251.py"\n'
+            '@@ -2 +2 @@\n')
+    changed = _parse_diff(diff, '/repo')
+    assert changed == {
+        os.path.realpath('/repo/pkg/a b.py'): {1},
+        os.path.realpath('/repo/pkg/"q"\u00e9.py'): {2},
+    }
+
+
+def _intercept_changed_file(tmpdir, monkeypatch, name='a.py', git_config=()):
+    """Commit a file, change its second line and apply the interceptor.
+
+    Returns: A dict mapping line numbers to the outcomes of their WorkItems.
+    """
+    monkeypatch.chdir(tmpdir)
+    source = tmpdir.join(name)
+    source.write('x = 1\ny = 2\nz = 3\n')
+
+    def git(*args):
+        subprocess.check_call(
+            ('git', '-c', 'user.name=test', '-c', 'user.email=test@example.com')
+            + args)
+
+    git('init', '-q')
+    for key, value in git_config:
+        git('config', key, value)
+    git('add', name)
+    git('commit', '-q', '-m', 'initial')
+    source.write('x = 1\ny = 20\nz = 3\n')
+
+    items = [WorkItem(job_id=str(line), filename=str(source), line_number=line)
+             for line in (1, 2, 3)]
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(Config({'git-diff': {'base': 'HEAD'}}), 10)
+        work_db.add_work_items(items)
+        intercept(work_db)
+
+        return {item.line_number: item.worker_outcome
+                for item in work_db.work_items}
+
+
+UNCHANGED_SKIPPED = {1: WorkerOutcome.SKIPPED,
+                     2: None,
+                     3: WorkerOutcome.SKIPPED}
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+def test_intercept_skips_unchanged_lines(tmpdir, monkeypatch):
+    assert _intercept_changed_file(tmpdir, monkeypatch) == UNCHANGED_SKIPPED
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+def test_intercept_with_space_in_path(tmpdir, monkeypatch):
+    assert _intercept_changed_file(
+        tmpdir, monkeypatch, name='a b.py') == UNCHANGED_SKIPPED
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+@pytest.mark.parametrize('key', ['diff.mnemonicPrefix', 'diff.noprefix'])
+def test_intercept_ignores_configured_prefixes(tmpdir, monkeypatch, key):
+    assert _intercept_changed_file(
+        tmpdir, monkeypatch, git_config=[(key, 'true')]) == UNCHANGED_SKIPPED
+
+
+def test_intercept_does_nothing_without_base(tmpdir):
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(Config({'module': 'a'}), 10)
+        work_db.add_work_items([WorkItem(job_id='1', filename='a.py',
+                                         line_number=1)])
+        intercept(work_db)
+        assert work_db.num_pending_work_items == 1
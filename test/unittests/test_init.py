@@ -0,0 +1,151 @@
+import sys
+
+import pytest
+
+from cosmic_ray.commands import init
+from cosmic_ray.commands.init import _module_work_items, apply_interceptors
+from cosmic_ray.config import Config
+from cosmic_ray.modules import find_modules, find_static_modules
+from cosmic_ray.plugins import operator_names
+from cosmic_ray.work_db import use_db
+from cosmic_ray.worker import WorkerOutcome
+
+CONFIG = {
+    'module': 'pkg',
+    'timeout': 10,
+    'test-runner': {'name': 'unittest', 'args': 'tests'},
+    'execution-engine': {'name': 'local'},
+}
+
+
+@pytest.fixture
+def package(tmpdir, monkeypatch):
+    tmpdir.join('pkg', '__init__.py').ensure()
+    tmpdir.join('pkg', 'a.py').write('x = 1\n')
+    tmpdir.join('pkg', 'b.py').write('y = 2\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    yield tmpdir
+    for name in ('pkg', 'pkg.a', 'pkg.b'):
+        sys.modules.pop(name, None)
+
+
+def _init(db_path, config=CONFIG, incremental=False):
+    with use_db(db_path) as work_db:
+        init(find_modules('pkg'), work_db, Config(config), 10,
+             incremental=incremental)
+
+
+def _complete_all(db_path):
+    with use_db(db_path) as work_db:
+        items = list(work_db.work_items)
+        for item in items:
+            item.worker_outcome = WorkerOutcome.NORMAL
+        work_db.update_work_items(items)
+        return {item.job_id for item in items if item.module == 'pkg.a'}
+
+
+def test_incremental_init_only_replaces_changed_modules(package, tmpdir):
+    db_path = str(tmpdir.join('session.sqlite'))
+    _init(db_path)
+    unchanged_jobs = _complete_all(db_path)
+
+    package.join('pkg', 'b.py').write('y = 2 + 3\n')
+    _init(db_path, incremental=True)
+
+    with use_db(db_path) as work_db:
+        pending = list(work_db.pending_work_items)
+        assert pending
+        assert {item.module for item in pending} == {'pkg.b'}
+        completed = {item.job_id for item in work_db.work_items
+                     if item.worker_outcome is not None}
+        assert completed == unchanged_jobs
+
+
+def test_incremental_init_with_changed_config_replaces_everything(package, tmpdir):
+    db_path = str(tmpdir.join('session.sqlite'))
+    _init(db_path)
+    _complete_all(db_path)
+
+    _init(db_path, config=dict(CONFIG, timeout=20), incremental=True)
+
+    with use_db(db_path) as work_db:
+        assert work_db.num_pending_work_items == work_db.num_work_items
+
+
+def test_parallel_init_with_static_discovery(package, tmpdir):
+    config = dict(CONFIG, **{'module-discovery': 'static'})
+    db_path = str(tmpdir.join('static.sqlite'))
+    with use_db(db_path) as work_db:
+        init(find_static_modules('pkg'), work_db, Config(config), 10, jobs=2)
+        static_items = sorted((item.module, item.operator, item.occurrence)
+                              for item in work_db.work_items)
+    assert 'pkg' not in sys.modules
+
+    _init(str(tmpdir.join('session.sqlite')))
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        items = sorted((item.module, item.operator, item.occurrence)
+                       for item in work_db.work_items)
+
+    assert static_items
+    assert static_items == items
+
+
+def test_late_interceptors_are_applied_last(monkeypatch):
+    init_module = sys.modules['cosmic_ray.commands.init']
+    applied = []
+    monkeypatch.setattr(
+        init_module, 'interceptor_names',
+        lambda: ['equivalence', 'spor', 'sampling', 'coverage', 'git-diff'])
+    monkeypatch.setattr(init_module, 'get_interceptor',
+                        lambda name: lambda work_db: applied.append(name))
+
+    apply_interceptors(None)
+    assert applied == ['coverage', 'git-diff', 'spor', 'sampling',
+                       'equivalence']
+
+
+def test_init_adds_all_work_items_in_one_call(package, tmpdir, monkeypatch):
+    expected = sorted(
+        (item.module, item.operator, item.occurrence, item.line_number)
+        for module in find_modules('pkg')
+        for item in _module_work_items(module, operator_names()))
+
+    calls = []
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        add_work_items = work_db.add_work_items
+
+        def record_call(work_items):
+            work_items = list(work_items)
+            calls.append(work_items)
+            add_work_items(work_items)
+
+        monkeypatch.setattr(work_db, 'add_work_items', record_call)
+        init(find_modules('pkg'), work_db, Config(CONFIG), 10)
+
+    assert len(calls) == 1
+    assert expected
+    assert sorted((item.module, item.operator, item.occurrence,
+                   item.line_number) for item in calls[0]) == expected
+
+
+def _contents(work_db):
+    "The WorkItems in `work_db`, without their job IDs, in order."
+    contents = []
+    for item in work_db.work_items:
+        item = item.as_dict()
+        del item['job_id']
+        contents.append(item)
+    return contents
+
+
+def test_parallel_init_matches_serial_init(package, tmpdir):
+    _init(str(tmpdir.join('serial.sqlite')))
+    with use_db(str(tmpdir.join('serial.sqlite'))) as work_db:
+        serial_items = _contents(work_db)
+
+    with use_db(str(tmpdir.join('parallel.sqlite'))) as work_db:
+        init(find_modules('pkg'), work_db, Config(CONFIG), 10, jobs=3)
+        parallel_items = _contents(work_db)
+
+    assert serial_items
+    assert parallel_items == serial_items
@@ -0,0 +1,68 @@
+import sys
+import time
+
+import pytest
+
+from cosmic_ray.commands import execute
+from cosmic_ray.config import Config
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import DATA_DIR
+
+PROJECT_DIR = DATA_DIR.parent.parent / 'test_project'
+
+TIMEOUT = 3
+
+
+@pytest.fixture
+def project(monkeypatch):
+    monkeypatch.syspath_prepend(str(PROJECT_DIR))
+    monkeypatch.chdir(str(PROJECT_DIR))
+    yield
+    for name in list(sys.modules):
+        if name == 'adam' or name == 'tests' or name.startswith('tests.'):
+            del sys.modules[name]
+
+
+def _work_item(job_id, operator, occurrence):
+    return WorkItem(job_id=job_id, module='adam', operator=operator,
+                    occurrence=occurrence)
+
+
+def test_local_parallel_engine(project, tmpdir):
+    config = Config({
+        'module': 'adam',
+        'test-runner': {'name': 'unittest', 'args': 'tests'},
+        'execution-engine': {'name': 'local-parallel', 'workers': 4},
+    })
+    db_path = str(tmpdir.join('session.sqlite'))
+    with use_db(db_path) as work_db:
+        work_db.set_config(config, TIMEOUT)
+        work_db.add_work_items([
+            # `break` -> `continue` in trigger_infinite_loop never finishes.
+            _work_item('loop-1', 'core/ReplaceBreakWithContinue', 1),
+            _work_item('loop-2', 'core/ReplaceBreakWithContinue', 1),
+            _work_item('killed-1', 'core/ReplaceBreakWithContinue', 0),
+            _work_item('killed-2', 'core/ReplaceContinueWithBreak', 0),
+        ])
+
+    start = time.monotonic()
+    execute(db_path)
+    elapsed = time.monotonic() - start
+
+    with use_db(db_path) as work_db:
+        assert work_db.num_pending_work_items == 0
+        results = {item.job_id: item for item in work_db.work_items}
+
+    for job_id in ('loop-1', 'loop-2'):
+        assert results[job_id].worker_outcome == WorkerOutcome.TIMEOUT
+        assert results[job_id].data == TIMEOUT
+    for job_id in ('killed-1', 'killed-2'):
+        assert results[job_id].worker_outcome == WorkerOutcome.NORMAL
+        assert results[job_id].test_outcome == TestOutcome.KILLED
+
+    # The workers run at once, so the timeouts overlap.
+    assert elapsed < 2 * TIMEOUT
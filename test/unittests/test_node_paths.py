@@ -0,0 +1,42 @@
+import ast
+import types
+
+from cosmic_ray.commands.init import _module_work_items
+from cosmic_ray.mutating import MutatingCore
+from cosmic_ray.plugins import get_operator, operator_names
+
+SOURCE = '''
+def f(x, y=-1):
+    if x > 0 and (y < 2 or not x):
+        x = x + (y * 3) - (+x if x else ~y)
+    for i in [1, 0, 2.5, True]:
+        if x is None or i > 2:
+            break
+        del x
+    assert x != y
+    return x ** 2 % 7
+'''
+
+
+def test_node_paths_find_the_same_mutants_as_traversal(tmpdir):
+    source_file = tmpdir.join('mod.py')
+    source_file.write(SOURCE)
+    module = types.ModuleType('mod')
+    module.__file__ = str(source_file)
+
+    work_items = list(_module_work_items(module, operator_names()))
+    assert work_items
+    for item in work_items:
+        operator = get_operator(item.operator)
+        assert item.node_path is not None
+
+        core = MutatingCore(item.occurrence)
+        mutant = core.visit_path(ast.parse(SOURCE),
+                                 item.node_path['path'],
+                                 item.node_path['index'],
+                                 operator(core))
+        assert core.activation_record is not None
+
+        expected = operator(MutatingCore(item.occurrence)).visit(
+            ast.parse(SOURCE))
+        assert ast.dump(mutant) == ast.dump(expected), item
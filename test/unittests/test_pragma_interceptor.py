@@ -0,0 +1,45 @@
+from cosmic_ray.interceptors.pragma import _pragma_lines, intercept
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+SOURCE = '''\
+x = 1  # pragma: no mutate
+y = 2
+z = x + y  # pragma: no mutate: core/NumberReplacer, core/ReplaceBinaryOperator_*
+s = "# pragma: no mutate"
+'''
+
+
+def test_pragma_lines(tmpdir):
+    source = tmpdir.join('a.py')
+    source.write(SOURCE)
+    assert _pragma_lines(str(source)) == {
+        1: None,
+        3: ['core/NumberReplacer', 'core/ReplaceBinaryOperator_*'],
+    }
+
+
+def test_intercept(tmpdir):
+    source = tmpdir.join('a.py')
+    source.write(SOURCE)
+
+    items = [
+        WorkItem(job_id='1', filename=str(source), line_number=1,
+                 operator='core/NumberReplacer'),
+        WorkItem(job_id='2', filename=str(source), line_number=2,
+                 operator='core/NumberReplacer'),
+        WorkItem(job_id='3', filename=str(source), line_number=3,
+                 operator='core/ReplaceBinaryOperator_Add_Sub'),
+        WorkItem(job_id='4', filename=str(source), line_number=3,
+                 operator='core/AddNot'),
+        WorkItem(job_id='5', filename=str(source), line_number=4,
+                 operator='core/NumberReplacer'),
+    ]
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.add_work_items(items)
+        intercept(work_db)
+
+        skipped = {item.job_id for item in work_db.work_items
+                   if item.worker_outcome == WorkerOutcome.SKIPPED}
+    assert skipped == {'1', '3'}
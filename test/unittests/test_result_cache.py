@@ -0,0 +1,113 @@
+import pytest
+
+from cosmic_ray.config import Config
+from cosmic_ray.result_cache import ResultKeys, use_result_cache
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+def _result(**kwargs):
+    return WorkItem(worker_outcome=WorkerOutcome.NORMAL,
+                    test_outcome=TestOutcome.KILLED,
+                    killing_test='test_a',
+                    **kwargs)
+
+
+@pytest.fixture
+def result_cache(tmpdir):
+    with use_result_cache(str(tmpdir.join('cache', 'results.sqlite'))) as cache:
+        yield cache
+
+
+def test_get_returns_stored_result(result_cache):
+    result_cache.put('key', _result(job_id='job', data=['output']))
+
+    result = result_cache.get('key')
+    assert result['test_outcome'] == TestOutcome.KILLED
+    assert result['killing_test'] == 'test_a'
+    assert result['data'] == ['output']
+    assert 'job_id' not in result
+
+    assert result_cache.get('other') is None
+
+
+def test_abnormal_results_are_not_stored(result_cache):
+    result_cache.put('key', WorkItem(worker_outcome=WorkerOutcome.TIMEOUT,
+                                     data=10))
+    assert result_cache.get('key') is None
+    assert len(result_cache) == 0
+
+
+def test_prune_evicts_least_recently_used(result_cache):
+    for key in ('a', 'b', 'c'):
+        result_cache.put(key, _result())
+    result_cache.get('a')
+
+    result_cache.prune(result_cache.size - 1)
+    assert result_cache.get('b') is None
+    assert result_cache.get('a') is not None
+    assert result_cache.get('c') is not None
+
+    result_cache.prune(0)
+    assert len(result_cache) == 0
+
+
+def test_cache_is_limited_to_max_size_when_closed(tmpdir):
+    path = str(tmpdir.join('results.sqlite'))
+    with use_result_cache(path, 1) as cache:
+        cache.put('a', _result())
+
+    with use_result_cache(path, 1) as cache:
+        assert len(cache) == 0
+
+
+@pytest.fixture
+def project(tmpdir, monkeypatch):
+    tmpdir.join('pkg', '__init__.py').ensure()
+    tmpdir.join('pkg', 'a.py').write('from . import b\n')
+    tmpdir.join('pkg', 'b.py').write('x = 1\n')
+    tmpdir.join('pkg', 'c.py').write('y = 2\n')
+    tmpdir.join('tests', 'test_a.py').write('import pkg.a\n', ensure=True)
+    monkeypatch.chdir(tmpdir)
+    return tmpdir
+
+
+def _key(module='pkg.a', **config):
+    config = Config(dict({'module': 'pkg',
+                          'test-runner': {'name': 'unittest', 'args': 'tests'}},
+                         **config))
+    return ResultKeys(config)(WorkItem(module=module,
+                                       operator='core/NumberReplacer',
+                                       occurrence=0,
+                                       filename=module.replace('.', '/') + '.py'))
+
+
+def test_key_depends_on_imported_modules(project):
+    key = _key()
+    project.join('pkg', 'c.py').write('y = 3\n')
+    assert _key() == key
+
+    project.join('pkg', 'b.py').write('x = 2\n')
+    assert _key() != key
+
+
+def test_key_depends_on_importing_modules(project):
+    key = _key(module='pkg.b')
+    project.join('pkg', 'c.py').write('y = 3\n')
+    assert _key(module='pkg.b') == key
+
+    # The tests may only reach pkg.b through pkg.a.
+    project.join('pkg', 'a.py').write('from . import b  # changed\n')
+    assert _key(module='pkg.b') != key
+
+
+def test_key_depends_on_tests(project):
+    key = _key()
+    project.join('tests', 'test_a.py').write('import pkg.a  # changed\n')
+    assert _key() != key
+
+
+def test_key_depends_on_test_runner_config(project):
+    key = _key()
+    assert _key(**{'test-runner': {'name': 'unittest', 'args': 'other'}}) != key
@@ -0,0 +1,175 @@
+import math
+
+import pytest
+
+from cosmic_ray.config import Config
+from cosmic_ray.interceptors.sampling import intercept
+from cosmic_ray.reporting import (_normal_quantile, estimate_survival_rate,
+                                  survival_rate)
+from cosmic_ray.sampling import SAMPLED_OUT, is_sampled_out, sample
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+def _items():
+    return [WorkItem(job_id='{}-{}'.format(module, occurrence),
+                     module=module,
+                     operator='core/NumberReplacer',
+                     occurrence=occurrence)
+            for module, count in (('a', 90), ('b', 10))
+            for occurrence in range(count)]
+
+
+def test_sample_is_stratified_and_seeded():
+    sampled, sampled_out = sample(_items(), 0.1, seed=1, stratify=['module'])
+    assert len(sampled) + len(sampled_out) == 100
+    assert sorted(item.module for item in sampled) == ['a'] * 9 + ['b']
+
+    again, _ = sample(reversed(_items()), 0.1, seed=1, stratify=['module'])
+    assert {item.job_id for item in again} == {item.job_id for item in sampled}
+
+    other, _ = sample(_items(), 0.1, seed=2, stratify=['module'])
+    assert {item.job_id for item in other} != {item.job_id for item in sampled}
+
+
+def _record(module, survived=False, sampled_out=False):
+    if sampled_out:
+        return WorkItem(module=module,
+                        worker_outcome=WorkerOutcome.SKIPPED,
+                        data={SAMPLED_OUT: ['module']})
+    return WorkItem(module=module,
+                    worker_outcome=WorkerOutcome.NORMAL,
+                    test_outcome=(TestOutcome.SURVIVED if survived
+                                  else TestOutcome.KILLED),
+                    sampled=True)
+
+
+def test_estimate_weights_strata_by_size():
+    # Module a has 80 mutants, of which 4 are sampled and half survive. Module
+    # b has 20 mutants, of which 2 are sampled and none survive.
+    records = ([_record('a', survived=True)] * 2 + [_record('a')] * 2
+               + [_record('a', sampled_out=True)] * 76
+               + [_record('b')] * 2 + [_record('b', sampled_out=True)] * 18)
+
+    estimate = estimate_survival_rate(records)
+    assert estimate.rate == pytest.approx(40)
+    lower, upper = estimate.interval
+    assert 0 <= lower < 40 < upper <= 100
+    assert survival_rate(records) == estimate.rate
+
+
+def _mixed_session(tmpdir, survives):
+    """A session whose module has 400 mutants skipped by a pragma, 100 with no
+    coverage and 500 which are sampled. `survives(occurrence)` determines
+    which of the sampled mutants survive once they've been executed.
+    """
+    items = [WorkItem(job_id=str(occurrence),
+                      module='a',
+                      operator='core/NumberReplacer',
+                      occurrence=occurrence)
+             for occurrence in range(1000)]
+    for item in items[:400]:
+        item.worker_outcome = WorkerOutcome.SKIPPED
+    for item in items[400:500]:
+        item.worker_outcome = WorkerOutcome.NO_COVERAGE
+
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(
+            Config({'sampling': {'fraction': 0.1, 'stratify': 'module'}}), 10)
+        work_db.add_work_items(items)
+        intercept(work_db)
+
+        executed = list(work_db.pending_work_items)
+        for item in executed:
+            item.worker_outcome = WorkerOutcome.NORMAL
+            item.test_outcome = (TestOutcome.SURVIVED
+                                 if survives(item.occurrence)
+                                 else TestOutcome.KILLED)
+        work_db.update_work_items(executed)
+        return list(work_db.work_items)
+
+
+def test_estimate_counts_unsampled_outcomes_as_they_are(tmpdir):
+    records = _mixed_session(tmpdir, lambda occurrence: True)
+    assert sum(1 for item in records if item.sampled) == 50
+
+    # All of the mutants in the sample survive, and so would all 500 in the
+    # sampling frame, along with the 100 with no coverage.
+    estimate = estimate_survival_rate(records)
+    assert estimate.rate == pytest.approx(60)
+    assert estimate.interval == pytest.approx((60, 60))
+
+
+def test_estimate_of_mixed_session_only_extrapolates_the_sample(tmpdir):
+    records = _mixed_session(tmpdir, lambda occurrence: occurrence % 2 == 0)
+    sampled = [item for item in records if item.sampled]
+    proportion = sum(item.test_outcome == TestOutcome.SURVIVED
+                     for item in sampled) / len(sampled)
+
+    estimate = estimate_survival_rate(records)
+    assert estimate.rate == pytest.approx((100 + 500 * proportion) / 10)
+    lower, upper = estimate.interval
+    assert lower < estimate.rate < upper
+    assert (upper - lower) / 2 == pytest.approx(
+        1.959964 * 500 / 1000 * math.sqrt(
+            (1 - 50 / 500) * proportion * (1 - proportion) / 49) * 100,
+        rel=1e-5)
+
+
+@pytest.mark.parametrize('p, quantile', [
+    (0.001, -3.090232306),
+    (0.02, -2.053748911),
+    (0.5, 0),
+    (0.9, 1.281551566),
+    (0.975, 1.959963985),
+])
+def test_normal_quantile(p, quantile):
+    assert _normal_quantile(p) == pytest.approx(quantile, abs=1e-8)
+
+
+def test_estimate_without_sampling_is_exact():
+    records = [_record('a', survived=True), _record('a'), WorkItem(module='a')]
+    assert estimate_survival_rate(records) == (50, None)
+
+
+def test_intercept_marks_unsampled_items(tmpdir):
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(
+            Config({'sampling': {'fraction': 0.5, 'stratify': 'operator'}}), 10)
+        work_db.add_work_items(_items())
+        intercept(work_db)
+
+        assert work_db.num_pending_work_items == 50
+        assert all(is_sampled_out(item) for item in work_db.work_items
+                   if item.worker_outcome is not None)
+
+
+def test_intercept_only_samples_pending_items_of_new_modules(tmpdir):
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.set_config(Config({'sampling': {'fraction': 0.5}}), 10)
+        work_db.add_work_items(_items())
+        intercept(work_db)
+
+        # Give module 'a' results, as if they were kept by an incremental init.
+        completed = [item for item in work_db.pending_work_items
+                     if item.module == 'a']
+        for item in completed:
+            item.worker_outcome = WorkerOutcome.NORMAL
+            item.test_outcome = TestOutcome.KILLED
+        work_db.update_work_items(completed)
+        before = {item.job_id: item for item in work_db.work_items}
+
+        work_db.add_work_items(
+            [WorkItem(job_id='c-{}'.format(occurrence),
+                      module='c',
+                      operator='core/NumberReplacer',
+                      occurrence=occurrence)
+             for occurrence in range(10)])
+        intercept(work_db)
+
+        after = {item.job_id: item for item in work_db.work_items}
+        assert all(after[job_id] == item for job_id, item in before.items())
+        assert sum(is_sampled_out(item) for item in after.values()
+                   if item.module == 'c') == 5
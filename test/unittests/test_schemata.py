@@ -0,0 +1,90 @@
+import ast
+import itertools
+
+from cosmic_ray.mutating import MutatingCore
+from cosmic_ray.operators.provider import OperatorProvider
+from cosmic_ray.plugins import operator_names
+from cosmic_ray.schemata import (build_schema, load_schema, using_schema,
+                                 write_schema)
+
+SOURCE = '''
+def twice(func):
+    return lambda *args: 2 * func(*args)
+
+@twice
+def f(x, y=-1):
+    if x > 0 and (y < 2 or not x):
+        x = x + (y * 3) - (+x if x else ~y)
+    for i in [1, 0, 2.5, True]:
+        if x is None or i > 2:
+            break
+        try:
+            x = x // i
+        except ZeroDivisionError:
+            continue
+        except:
+            return None
+    assert x != y
+    return x ** 2 % 7
+'''
+
+ARGS = [(0,), (1, 5), (3, 1), (-2, 4), (4, 4)]
+
+
+def _results(code):
+    namespace = {}
+    exec(code, namespace)
+    results = []
+    for args in ARGS:
+        try:
+            results.append(namespace['f'](*args))
+        except Exception as exc:  # pylint: disable=broad-except
+            results.append(type(exc))
+    return results
+
+
+def _mutants(provider):
+    "Generate `(operator, occurrence, code)` for every mutant of SOURCE."
+    for name in provider:
+        for occurrence in itertools.count():
+            core = MutatingCore(occurrence)
+            mutant = provider[name](core).visit(ast.parse(SOURCE))
+            if not core.activation_record:
+                break
+            yield provider[name], occurrence, compile(mutant, 'mutant', 'exec')
+
+
+def test_schema_mutants_behave_like_mutated_modules(tmpdir):
+    source_file = tmpdir.join('mod.py')
+    source_file.write(SOURCE)
+    schema = build_schema(ast.parse(SOURCE), str(source_file), operator_names())
+
+    mutants = list(_mutants(OperatorProvider()))
+    assert len(schema.mutants) == len(mutants)
+
+    for operator, occurrence, code in mutants:
+        mutant_id, _, diff = schema.mutant(operator, occurrence)
+        assert diff[0] == '--- mutation diff ---'
+        with using_schema('mod', schema, mutant_id):
+            assert _results(schema.code) == _results(code), (operator, occurrence)
+
+    with using_schema('mod', schema, -1):
+        assert _results(schema.code) == _results(SOURCE)
+
+
+def test_stale_schema_is_ignored(tmpdir, monkeypatch):
+    source_file = tmpdir.join('mod.py')
+    source_file.write(SOURCE)
+    monkeypatch.syspath_prepend(str(tmpdir))
+    schemata_dir = str(tmpdir.join('schemata'))
+
+    write_schema(schemata_dir, 'mod', ast.parse(SOURCE), str(source_file),
+                 operator_names())
+    assert load_schema(schemata_dir, 'mod') is not None
+
+    source_file.write(SOURCE + 'x = 1\n')
+    assert load_schema(schemata_dir, 'mod') is None
+
+
+def test_missing_schema():
+    assert load_schema('no-such-dir', 'mod') is None
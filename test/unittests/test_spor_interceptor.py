@@ -0,0 +1,54 @@
+import pytest
+
+from cosmic_ray.testing.test_runner import TestOutcome
+from cosmic_ray.work_db import use_db
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+from path_utils import DATA_DIR
+
+pytest.importorskip('spor.repo')
+
+from cosmic_ray.interceptors.spor import _skipped_lines, intercept  # noqa: E402
+
+# The test project has spor anchors with `{mutate: false}` on lines 151 and
+# 152 of adam.py.
+ADAM = str(DATA_DIR.parent.parent / 'test_project' / 'adam.py')
+
+
+def test_skipped_lines():
+    assert _skipped_lines(ADAM) == {151, 152}
+
+
+def test_no_skipped_lines_without_repository(tmpdir):
+    source = tmpdir.join('a.py')
+    source.write('x = 1\n')
+    assert _skipped_lines(str(source)) is None
+
+
+def test_intercept(tmpdir):
+    other = tmpdir.join('a.py')
+    other.write('x = 1\n')
+
+    items = [
+        WorkItem(job_id='1', filename=ADAM, line_number=151),
+        WorkItem(job_id='2', filename=ADAM, line_number=152),
+        WorkItem(job_id='3', filename=ADAM, line_number=152,
+                 worker_outcome=WorkerOutcome.NORMAL,
+                 test_outcome=TestOutcome.KILLED),
+        WorkItem(job_id='4', filename=ADAM, line_number=10),
+        WorkItem(job_id='5', filename=str(other), line_number=151),
+    ]
+    with use_db(str(tmpdir.join('session.sqlite'))) as work_db:
+        work_db.add_work_items(items)
+        intercept(work_db)
+
+        outcomes = {item.job_id: item.worker_outcome
+                    for item in work_db.work_items}
+    assert outcomes == {
+        '1': WorkerOutcome.SKIPPED,
+        '2': WorkerOutcome.SKIPPED,
+        '3': WorkerOutcome.NORMAL,
+        '4': None,
+        '5': None,
+    }
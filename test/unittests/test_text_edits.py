@@ -0,0 +1,92 @@
+import ast
+import os
+import types
+
+from cosmic_ray.commands.init import _module_work_items
+from cosmic_ray.diffs import DIFF_HEADER, mutation_diff
+from cosmic_ray.mutating import MutatingCore
+from cosmic_ray.plugins import get_operator, operator_names
+from cosmic_ray.text_edits import (apply_edit, find_text_edits,
+                                   load_mutant_code)
+
+SOURCE = '''
+import functools
+
+
+@functools.lru_cache()
+def f(x, y=-1):
+    "Ünïcode ✓"
+    if x > 0 and (y < 2 or not x):
+        x = x+(y * 3 - (+x if x else ~y))  # a comment
+    for i in [1, 0, 2.5, True]:
+        if x is None or i > 2:
+            break
+        del x
+    if x < y:
+        x = 1
+    elif x is y:
+        while y: y -= 1
+    assert x != y
+    return x ** 2 % 7
+'''
+
+
+def _work_items(tmpdir, operators):
+    source_file = tmpdir.join('mod.py')
+    source_file.write_text(SOURCE, encoding='utf-8')
+    module = types.ModuleType('mod')
+    module.__file__ = str(source_file)
+    work_items = list(_module_work_items(module, operators))
+    find_text_edits(module.__file__,
+                    work_items,
+                    {name: get_operator(name) for name in operators})
+    return work_items
+
+
+def test_edits_make_the_same_mutants_as_the_ast(tmpdir):
+    work_items = _work_items(tmpdir, operator_names())
+
+    with_edits = [item for item in work_items if item.text_edit is not None]
+    assert len(with_edits) > 0.9 * len(work_items)
+    for item in with_edits:
+        mutant = ast.parse(apply_edit(SOURCE, item.text_edit))
+        expected = get_operator(item.operator)(
+            MutatingCore(item.occurrence)).visit(ast.parse(SOURCE))
+        assert ast.dump(mutant) == ast.dump(expected), item
+
+
+def test_edit_only_replaces_changed_tokens(tmpdir):
+    item, = _work_items(tmpdir, ['core/ReplaceBinaryOperator_Add_Sub'])
+
+    assert item.text_edit['replacement'] == '-'
+    assert SOURCE[item.text_edit['start']:item.text_edit['end']] == '+'
+
+
+def test_diff_of_edit_is_exact(tmpdir):
+    item, = _work_items(tmpdir, ['core/ReplaceBinaryOperator_Add_Sub'])
+
+    diff = mutation_diff(item)
+    assert diff[0] == DIFF_HEADER
+    assert diff[3:] == [
+        '@@ -9,1 +9,1 @@',
+        '-        x = x+(y * 3 - (+x if x else ~y))  # a comment',
+        '+        x = x-(y * 3 - (+x if x else ~y))  # a comment',
+    ]
+
+
+def test_mutant_code_is_cached(tmpdir):
+    item, = _work_items(tmpdir, ['core/ReplaceBinaryOperator_Add_Sub'])
+    cache_dir = str(tmpdir.join('cache'))
+
+    code = load_mutant_code(cache_dir, item.filename, item.text_edit)
+    assert code.co_filename == item.filename
+    assert len(os.listdir(cache_dir)) == 1
+    assert load_mutant_code(cache_dir, item.filename, item.text_edit) == code
+
+
+def test_no_code_for_changed_module(tmpdir):
+    item, = _work_items(tmpdir, ['core/ReplaceBinaryOperator_Add_Sub'])
+    tmpdir.join('mod.py').write('x = 1\n')
+
+    assert load_mutant_code(str(tmpdir.join('cache')), item.filename,
+                            item.text_edit) is None
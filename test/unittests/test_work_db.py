@@ -0,0 +1,219 @@
+import pytest
+
+from cosmic_ray.config import Config, get_db_name
+from cosmic_ray.work_db import copy_work_db, use_db, WorkDB
+from cosmic_ray.work_item import WorkItem
+from cosmic_ray.worker import WorkerOutcome
+
+
+@pytest.fixture(params=['session.json', 'session.sqlite'])
+def db_path(request, tmpdir):
+    return str(tmpdir.join(request.param))
+
+
+def _work_items(count):
+    return [WorkItem(job_id=str(idx),
+                     module='foo',
+                     operator='core/NumberReplacer',
+                     occurrence=idx,
+                     line_number=idx + 1)
+            for idx in range(count)]
+
+
+def test_opening_missing_db_in_open_mode_raises_file_not_found(db_path):
+    with pytest.raises(FileNotFoundError):
+        with use_db(db_path, WorkDB.Mode.open):
+            pass
+
+
+def test_get_config_with_no_config_raises_value_error(db_path):
+    with use_db(db_path) as work_db:
+        with pytest.raises(ValueError):
+            work_db.get_config()
+
+
+def test_config_round_trip(db_path):
+    with use_db(db_path) as work_db:
+        work_db.set_config(Config({'module': 'foo'}), 12.5)
+
+    with use_db(db_path, WorkDB.Mode.open) as work_db:
+        config, timeout = work_db.get_config()
+
+    assert config['module'] == 'foo'
+    assert timeout == 12.5
+
+
+def test_work_items_are_returned_in_insertion_order(db_path):
+    items = _work_items(10)
+    with use_db(db_path) as work_db:
+        work_db.add_work_items(items)
+        assert work_db.num_work_items == 10
+        assert [item.job_id for item in work_db.work_items] == [item.job_id for item in items]
+
+
+def test_updated_work_items_are_no_longer_pending(db_path):
+    with use_db(db_path) as work_db:
+        work_db.add_work_items(_work_items(5))
+
+        item = next(work_db.pending_work_items)
+        item.worker_outcome = WorkerOutcome.NORMAL
+        work_db.update_work_item(item)
+
+        assert work_db.num_pending_work_items == 4
+        assert item.job_id not in {i.job_id for i in work_db.pending_work_items}
+        updated = next(i for i in work_db.work_items if i.job_id == item.job_id)
+        assert updated.worker_outcome == WorkerOutcome.NORMAL
+
+
+def test_updating_unknown_work_item_raises_key_error(db_path):
+    with use_db(db_path) as work_db:
+        with pytest.raises(KeyError):
+            work_db.update_work_item(WorkItem(job_id='missing'))
+
+
+def test_clear_work_items(db_path):
+    with use_db(db_path) as work_db:
+        work_db.add_work_items(_work_items(3))
+        work_db.clear_work_items()
+        assert work_db.num_work_items == 0
+
+
+def test_clear_work_items_for_modules(db_path):
+    items = _work_items(3)
+    items[1].module = 'bar'
+    items[2].module = 'baz'
+    with use_db(db_path) as work_db:
+        work_db.add_work_items(items)
+        work_db.clear_work_items({'foo', 'baz', 'missing'})
+        assert list(work_db.work_items) == [items[1]]
+
+
+def test_module_hashes_round_trip(db_path):
+    with use_db(db_path) as work_db:
+        assert work_db.module_hashes == {}
+        work_db.set_module_hashes({'foo': 'a', 'bar': 'b'})
+        work_db.set_module_hashes({'foo': 'c'})
+
+    with use_db(db_path, WorkDB.Mode.open) as work_db:
+        assert work_db.module_hashes == {'foo': 'c'}
+
+
+def test_test_durations_round_trip(db_path):
+    with use_db(db_path) as work_db:
+        assert work_db.test_durations == {}
+        work_db.set_test_durations({'test_a': 0.5, 'test_b': 2.0})
+        work_db.set_test_durations({'test_a': 1.5})
+
+    with use_db(db_path, WorkDB.Mode.open) as work_db:
+        assert work_db.test_durations == {'test_a': 1.5}
+
+
+def test_test_overhead_round_trip(db_path):
+    with use_db(db_path) as work_db:
+        assert work_db.test_overhead == 0
+        work_db.set_test_overhead(0.5)
+        work_db.set_test_overhead(1.5)
+
+    with use_db(db_path, WorkDB.Mode.open) as work_db:
+        assert work_db.test_overhead == 1.5
+
+
+def test_copy_work_db_from_json_to_sqlite(tmpdir):
+    items = _work_items(3)
+    items[0].worker_outcome = WorkerOutcome.SKIPPED
+    with use_db(str(tmpdir.join('old.json'))) as source, \
+            use_db(str(tmpdir.join('new.sqlite'))) as dest:
+        source.set_config(Config({'module': 'foo'}), 3)
+        source.add_work_items(items)
+
+        copy_work_db(source, dest)
+
+        assert dest.get_config()[1] == 3
+        assert list(dest.work_items) == items
+        assert dest.num_pending_work_items == 2
+
+
+def test_get_db_name_keeps_known_extensions():
+    assert get_db_name('foo.json') == 'foo.json'
+    assert get_db_name('foo.sqlite') == 'foo.sqlite'
+
+
+def test_get_db_name_defaults_to_sqlite(tmpdir):
+    assert get_db_name(str(tmpdir.join('foo'))) == str(tmpdir.join('foo.sqlite'))
+
+
+def test_get_db_name_finds_legacy_json_sessions(tmpdir):
+    tmpdir.ensure('foo.json')
+    assert get_db_name(str(tmpdir.join('foo'))) == str(tmpdir.join('foo.json'))
+
+
+def test_covering_tests_without_coverage_is_none(db_path):
+    with use_db(db_path) as work_db:
+        assert not work_db.has_coverage
+        assert work_db.covering_tests('/foo.py', 1) is None
+
+
+def test_covering_tests(db_path):
+    with use_db(db_path) as work_db:
+        work_db.set_coverage({
+            ('/foo.py', 1): {None, 'test_a'},
+            ('/foo.py', 2): {'test_a', 'test_b'},
+        })
+        assert work_db.has_coverage
+        assert work_db.covering_tests('/foo.py', 1) is None
+        assert work_db.covering_tests('/foo.py', 2) == {'test_a', 'test_b'}
+        assert work_db.covering_tests('/foo.py', 3) == set()
+
+        work_db.clear_coverage()
+        assert not work_db.has_coverage
+
+
+def test_copy_work_db_copies_coverage(tmpdir):
+    coverage = {('/foo.py', 1): {None}, ('/foo.py', 2): {'test_a'}}
+    with use_db(str(tmpdir.join('old.json'))) as source, \
+            use_db(str(tmpdir.join('new.sqlite'))) as dest:
+        source.set_config(Config({'module': 'foo'}), 3)
+        source.set_coverage(coverage)
+
+        copy_work_db(source, dest)
+
+        assert dest.coverage == coverage
+
+
+def test_update_work_items(db_path):
+    with use_db(db_path) as work_db:
+        work_db.add_work_items(_work_items(5))
+
+        items = list(work_db.pending_work_items)[:3]
+        for item in items:
+            item.worker_outcome = WorkerOutcome.SKIPPED
+        work_db.update_work_items(items)
+
+        assert work_db.num_pending_work_items == 2
+
+
+def test_update_work_items_with_unknown_work_item_raises_key_error(db_path):
+    with use_db(db_path) as work_db:
+        work_db.add_work_items(_work_items(1))
+        with pytest.raises(KeyError):
+            work_db.update_work_items(_work_items(2))
+
+
+def test_kill_history_survives_clearing_work_items(db_path):
+    with use_db(db_path) as work_db:
+        work_db.add_kills([('foo', 'core/NumberReplacer', 3, 'test_a')])
+        work_db.clear_work_items()
+        assert work_db.kills == [('foo', 'core/NumberReplacer', 3, 'test_a')]
+
+
+def test_likely_killers_prefers_nearby_kills_by_the_same_operator(db_path):
+    with use_db(db_path) as work_db:
+        work_db.add_kills([
+            ('foo', 'core/NumberReplacer', 10, 'test_same_line'),
+            ('foo', 'core/AddNot', 10, 'test_other_operator'),
+            ('foo', 'core/NumberReplacer', 13, 'test_nearby'),
+            ('foo', 'core/NumberReplacer', 100, 'test_far_away'),
+            ('bar', 'core/NumberReplacer', 10, 'test_other_module'),
+        ])
+        assert work_db.likely_killers('foo', 'core/NumberReplacer', 10) == [
+            'test_same_line', 'test_other_operator', 'test_nearby']
@@ -1,7 +1,14 @@
+import importlib
+import multiprocessing
+import sys
+
+from cosmic_ray.config import Config
 from cosmic_ray.operators import zero_iteration_loop
 from cosmic_ray.plugins import get_test_runner
+from cosmic_ray.testing.test_runner import TestOutcome
 from cosmic_ray.work_item import WorkItem
-from cosmic_ray.worker import worker, WorkerOutcome
+from cosmic_ray.worker import (_fork_server_wrapper, execute_work_item, worker,
+                               WorkerOutcome)
 
 from path_utils import DATA_DIR, excursion, extend_path
 
@@ -24,3 +31,50 @@ def test_no_test_return_value():
             job_id=None)
 
         assert result == expected
+
+
+def test_fork_server_worker_process():
+    config = Config({
+        'module': 'a',
+        'test-runner': {'name': 'unittest', 'args': '.'},
+        'execution-engine': {'name': 'local', 'fork-server': True},
+    })
+    work_item = WorkItem(job_id='job', module='a.b',
+                         operator='core/ZeroIterationLoop', occurrence=100)
+    with extend_path(DATA_DIR), excursion(DATA_DIR):
+        result = execute_work_item(work_item, 60, config)
+
+    assert result.worker_outcome == WorkerOutcome.NO_TEST
+
+
+def test_fork_server_wrapper_evicts_submodules_from_parent_packages(
+        tmpdir, monkeypatch):
+    # The package is imported up front, as the fork server's preload would.
+    tmpdir.join('fspkg', '__init__.py').ensure()
+    tmpdir.join('fspkg', 'sub', '__init__.py').ensure()
+    tmpdir.join('fspkg', 'sub', 'mod.py').write(
+        'def value():\n'
+        '    return 1\n')
+    tmpdir.join('test_fspkg.py').write(
+        'import unittest\n'
+        'from fspkg.sub import mod\n'
+        '\n'
+        'class Test(unittest.TestCase):\n'
+        '    def test_value(self):\n'
+        '        self.assertEqual(mod.value(), 1)\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    monkeypatch.chdir(tmpdir)
+    importlib.import_module('fspkg.sub.mod')
+
+    parent, child = multiprocessing.Pipe()
+    try:
+        _fork_server_wrapper(child, ['fspkg.sub.mod'], 'fspkg.sub.mod',
+                             'core/NumberReplacer', 0, 'unittest', '.',
+                             None, None, None, None, None, None, None)
+        result = parent.recv()
+    finally:
+        for name in ('fspkg', 'fspkg.sub', 'fspkg.sub.mod', 'test_fspkg'):
+            sys.modules.pop(name, None)
+
+    assert result.worker_outcome == WorkerOutcome.NORMAL
+    assert result.test_outcome == TestOutcome.KILLED